@@ -1,11 +1,7 @@
 # Makes app a Python package
-from app.data_sources import (
-    fetch_arena_scores,
-    fetch_hf_downloads,
-    fetch_github_stats,
-    fetch_citations,
-    get_mock_all_data
-)
+# Re-exports resolve on first access so `import app.config` (and the CLI)
+# does not pull in pandas and every fetcher.
+import importlib
 
 __all__ = [
     'fetch_arena_scores',
@@ -14,3 +10,9 @@ __all__ = [
     'fetch_citations',
     'get_mock_all_data'
 ]
+
+
+def __getattr__(name):
+    if name in __all__:
+        return getattr(importlib.import_module("app.data_sources"), name)
+    raise AttributeError(f"module 'app' has no attribute '{name}'")
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Integrity audit of the published epochs.
+
+Every snapshot, variant and raw archive file is read once, streaming, in a
+pool of worker processes. The read computes the file's SHA-256 and the
+CID `ipfs add` would give it, and for raw records also the SHA-256 of the
+decompressed payload. Results are checked against:
+
+- the manifest: snapshot CID, the snapshot sha256 (hash of the canonical
+  encoding) and the root CID pinned for the snapshot plus its raw archive;
+- each raw archive index: the content hash of every recorded payload;
+- AUDIT_DIGESTS_PATH: file digests from earlier audits, so a file that
+  changed since it was last verified is reported even without a manifest.
+
+Parsing JSON is the only CPU-heavy step. It runs only for files without
+a matching stored digest (or with --deep), to compare the dataset hash
+with the manifest and to flag non-canonical encodings: bytes that are
+none of the forms the engine writes (canonical, indented, minified).
+Once a file is verified its digest is stored, so later audits only hash
+bytes and stay I/O-bound.
+
+    python -m app.audit
+    python -m app.audit --deep --workers 8 --json
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import zlib
+import hashlib
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import SNAPSHOT_DIR, RAW_DATA_ARCHIVE_DIR, MANIFEST_PATH, AUDIT_DIGESTS_PATH, AUDIT_WORKERS
+from app.data_sources.archive import INDEX_FILE
+from app.serving.store import NON_SNAPSHOT_FILES
+from app.utils.ipfs import hash_file, directory_cid
+from app.utils.manifest import load_manifest
+from app.utils.snapshot import atomic_write
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Problems that fail the audit; the rest are reported as warnings
+FAILURES = ("missing", "sha256 mismatch", "cid mismatch", "root cid mismatch",
+            "content mismatch", "changed since last audit", "unreadable")
+
+
+def digest_file(path: str, gunzip: bool = False) -> dict:
+    """File digests from one streaming read; gunzip also hashes the decompressed content."""
+    if not gunzip:
+        return hash_file(path)
+    content = hashlib.sha256()
+    decompressor = zlib.decompressobj(31)
+    result = hash_file(path, lambda chunk: content.update(decompressor.decompress(chunk)))
+    content.update(decompressor.flush())
+    result["content_sha256"] = content.hexdigest()
+    return result
+
+
+def _digest_task(task):
+    path, gunzip = task
+    try:
+        return path, digest_file(path, gunzip)
+    except FileNotFoundError:
+        return path, None
+    except (OSError, zlib.error) as e:
+        return path, {"error": f"{type(e).__name__}: {e}"}
+
+
+def encoding_of(body: bytes, data, canonical: bytes = None) -> str:
+    """Which of the engine's encodings body is: canonical, indented, minified or non-canonical."""
+    # hash_dataset and streamed snapshots
+    if body == (canonical or json.dumps(data, sort_keys=True, default=str).encode("utf-8")):
+        return "canonical"
+    forms = {
+        "indented": dict(indent=2),                        # save_snapshot
+        "minified": dict(separators=(",", ":")),           # write_variants min/gzip/zstd
+    }
+    for name, options in forms.items():
+        if body == json.dumps(data, default=str, **options).encode("utf-8"):
+            return name
+    return "non-canonical"
+
+
+def read_json_body(path: str) -> bytes:
+    with open(path, "rb") as f:
+        body = f.read()
+    if path.endswith(".gz"):
+        return gzip.decompress(body)
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("zstandard not installed")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(body)
+    return body
+
+
+def _parse_task(path):
+    try:
+        body = read_json_body(path)
+        data = json.loads(body)
+        # The encoding hash_dataset hashes
+        canonical = json.dumps(data, sort_keys=True, default=str).encode("utf-8")
+        return path, {"dataset_sha256": hashlib.sha256(canonical).hexdigest(),
+                      "encoding": encoding_of(body, data, canonical)}
+    except Exception as e:
+        return path, {"error": f"{type(e).__name__}: {e}"}
+
+
+def load_digests(path: str = AUDIT_DIGESTS_PATH) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f).get("files", {})
+
+
+def save_digests(files: dict, path: str = AUDIT_DIGESTS_PATH):
+    body = {"updated": datetime.utcnow().isoformat() + "Z", "files": dict(sorted(files.items()))}
+    atomic_write(path, json.dumps(body, indent=2).encode("utf-8"))
+
+
+def _raw_files(raw_dir: str) -> list:
+    """Every file under an epoch's raw archive, as _path_root would include it."""
+    found = []
+    for root, _, names in os.walk(raw_dir):
+        found.extend(os.path.join(root, name) for name in names)
+    return sorted(found)
+
+
+def _tree_cid(path: str, digests: dict):
+    """(CID, tsize) of a file or directory from per-file digests, without rereading."""
+    if not os.path.isdir(path):
+        digest = digests.get(path)
+        return (digest["cid"], digest["tsize"]) if digest and "cid" in digest else None
+    links = []
+    for name in os.listdir(path):
+        child = _tree_cid(os.path.join(path, name), digests)
+        if child is None:
+            return None
+        links.append((name, *child))
+    return directory_cid(links)
+
+
+class Audit:
+    """Collects what to check, runs the digest and parse phases, and the findings."""
+
+    def __init__(self, snapshot_dir: str = SNAPSHOT_DIR, raw_dir: str = RAW_DATA_ARCHIVE_DIR,
+                 manifest_path: str = None, digests_path: str = None, workers: int = AUDIT_WORKERS,
+                 deep: bool = False):
+        self.snapshot_dir = snapshot_dir
+        self.raw_dir = raw_dir
+        self.manifest = load_manifest(manifest_path or os.path.join(snapshot_dir, os.path.basename(MANIFEST_PATH)))
+        self.digests_path = digests_path or os.path.join(snapshot_dir, os.path.basename(AUDIT_DIGESTS_PATH))
+        self.stored = load_digests(self.digests_path)
+        self.workers = workers or os.cpu_count() or 1
+        self.deep = deep
+        self.findings = []
+        self.digests = {}
+        self.parsed = {}
+
+    def _rel(self, path: str) -> str:
+        return os.path.relpath(path, self.snapshot_dir)
+
+    def report(self, path: str, problem: str, detail: str = ""):
+        self.findings.append({"path": self._rel(path), "problem": problem, "detail": detail})
+
+    def _map(self, func, items: list) -> dict:
+        if not items:
+            return {}
+        if self.workers <= 1:
+            return dict(map(func, items))
+        # Many small files per task keeps scheduling overhead below the I/O
+        chunksize = max(1, min(64, len(items) // (self.workers * 4)))
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(items))) as pool:
+            return dict(pool.map(func, items, chunksize=chunksize))
+
+    def plan(self) -> tuple:
+        """(snapshot paths, variant paths by snapshot, raw archive epoch dirs)."""
+        snapshots = {}
+        for name in sorted(os.listdir(self.snapshot_dir)) if os.path.isdir(self.snapshot_dir) else []:
+            path = os.path.join(self.snapshot_dir, name)
+            if (name.endswith(".json") and not name.startswith(".") and os.path.isfile(path)
+                    and name not in NON_SNAPSHOT_FILES):
+                snapshots[path] = None
+        variants = {}
+        for epoch_id, entry in self.manifest.items():
+            if not entry.get("snapshot"):
+                continue
+            path = os.path.join(self.snapshot_dir, entry["snapshot"])
+            snapshots[path] = epoch_id
+            variants[path] = {name: os.path.join(self.snapshot_dir, rel)
+                              for name, rel in (entry.get("variants") or {}).items()}
+        raw_epochs = sorted(
+            name for name in (os.listdir(self.raw_dir) if os.path.isdir(self.raw_dir) else [])
+            if os.path.isfile(os.path.join(self.raw_dir, name, INDEX_FILE)))
+        return snapshots, variants, raw_epochs
+
+    def run(self) -> dict:
+        started = time.perf_counter()
+        snapshots, variants, raw_epochs = self.plan()
+        raw_records = {}
+        tasks = [(path, False) for path in snapshots]
+        tasks += [(path, False) for by_name in variants.values() for path in by_name.values()]
+        for epoch_id in raw_epochs:
+            epoch_dir = os.path.join(self.raw_dir, epoch_id)
+            with open(os.path.join(epoch_dir, INDEX_FILE), "r") as f:
+                sources = json.load(f).get("sources", {})
+            records = {os.path.join(epoch_dir, e["file"]): e["sha256"] for e in sources.values()}
+            raw_records.update(records)
+            tasks += [(path, path in records) for path in _raw_files(epoch_dir)]
+            tasks += [(path, False) for path in records if not os.path.exists(path)]
+
+        # Phase one: stream every file once
+        self.digests = self._map(_digest_task, sorted(set(tasks)))
+
+        # Phase two: parse only files no earlier audit vouches for
+        published = {}
+        for path, epoch_id in snapshots.items():
+            sha256 = self.manifest.get(epoch_id, {}).get("sha256") if epoch_id else None
+            published[path] = sha256
+            published.update((variant, sha256) for variant in variants.get(path, {}).values())
+        to_parse = [path for path, sha256 in published.items() if self._needs_parse(path, sha256)]
+        self.parsed = self._map(_parse_task, to_parse)
+
+        for path, epoch_id in snapshots.items():
+            self._check_snapshot(path, epoch_id, variants.get(path, {}))
+        for path, expected in raw_records.items():
+            self._check_record(path, expected)
+        for path, digest in self.digests.items():
+            if digest and "error" in digest:
+                self.report(path, "unreadable", digest["error"])
+
+        self._store_verified()
+        seconds = time.perf_counter() - started
+        failed = [f for f in self.findings if f["problem"] in FAILURES]
+        total = sum(d["bytes"] for d in self.digests.values() if d and "bytes" in d)
+        return {
+            "files": sum(1 for d in self.digests.values() if d and "bytes" in d),
+            "bytes": total,
+            "parsed": len(self.parsed),
+            "epochs": len(self.manifest),
+            "raw_epochs": len(raw_epochs),
+            "workers": self.workers,
+            "seconds": round(seconds, 3),
+            "mb_per_second": round(total / 1e6 / seconds, 1) if seconds else None,
+            "findings": self.findings,
+            "ok": not failed,
+        }
+
+    def _stored_match(self, path: str) -> bool:
+        digest, stored = self.digests.get(path), self.stored.get(self._rel(path))
+        return bool(digest and stored and stored.get("sha256") == digest.get("sha256"))
+
+    def _needs_parse(self, path: str, published_sha256: str = None) -> bool:
+        digest = self.digests.get(path)
+        if not digest or "error" in digest:
+            return False
+        if self.deep:
+            return True
+        # A canonical file already hashes to its published sha256
+        return not self._stored_match(path) and digest["sha256"] != published_sha256
+
+    def _check_changed(self, path: str) -> bool:
+        """Report a file whose bytes differ from the last audit; True when unchanged or new."""
+        stored = self.stored.get(self._rel(path))
+        if stored and not self._stored_match(path):
+            self.report(path, "changed since last audit",
+                        f"sha256 {self.digests[path]['sha256']}, was {stored['sha256']}")
+            return False
+        return True
+
+    def _check_content(self, path: str, expected_sha256: str):
+        parsed = self.parsed.get(path)
+        if parsed is None:
+            # Verified before; keep reporting an encoding it was flagged for
+            if self.stored.get(self._rel(path), {}).get("encoding") == "non-canonical":
+                self.report(path, "non-canonical encoding", "not an encoding the engine writes")
+            return
+        if "error" in parsed:
+            self.report(path, "unreadable", parsed["error"])
+            return
+        if expected_sha256 and parsed["dataset_sha256"] != expected_sha256:
+            self.report(path, "sha256 mismatch", f"{parsed['dataset_sha256']}, published {expected_sha256}")
+        if parsed["encoding"] == "non-canonical":
+            self.report(path, "non-canonical encoding", "not an encoding the engine writes")
+
+    def _check_snapshot(self, path: str, epoch_id: str, variants: dict):
+        entry = self.manifest.get(epoch_id, {}) if epoch_id else {}
+        digest = self.digests.get(path)
+        if digest is None:
+            self.report(path, "missing", f"snapshot of {epoch_id}")
+            return
+        if "error" in digest:
+            return
+        self._check_changed(path)
+        if entry.get("cid") and digest["cid"] != entry["cid"]:
+            self.report(path, "cid mismatch", f"{digest['cid']}, published {entry['cid']}")
+        # A canonical file's bytes hash to the published sha256 without parsing
+        if digest["sha256"] != entry.get("sha256"):
+            self._check_content(path, entry.get("sha256"))
+        elif path in self.parsed:
+            self._check_content(path, None)
+
+        for name, variant in variants.items():
+            variant_digest = self.digests.get(variant)
+            if variant_digest is None:
+                self.report(variant, "missing", f"{name} variant of {epoch_id}")
+            elif "error" not in variant_digest:
+                self._check_changed(variant)
+                self._check_content(variant, entry.get("sha256"))
+
+        if entry.get("root_cid"):
+            raw = os.path.join(self.raw_dir, epoch_id)
+            snapshot_link = (os.path.basename(path), digest["cid"], digest["tsize"])
+            raw_link = _tree_cid(raw, self.digests) if os.path.isdir(raw) else None
+            if raw_link is None:
+                self.report(raw, "missing", f"raw archive of {epoch_id} (root CID {entry['root_cid']})")
+            else:
+                root, _ = directory_cid([snapshot_link, (os.path.basename(os.path.normpath(raw)), *raw_link)])
+                if root != entry["root_cid"]:
+                    self.report(path, "root cid mismatch", f"{root}, published {entry['root_cid']}")
+
+    def _check_record(self, path: str, expected: str):
+        digest = self.digests.get(path)
+        if digest is None:
+            self.report(path, "missing", "raw archive record")
+        elif "error" not in digest:
+            if digest["content_sha256"] != expected:
+                self.report(path, "content mismatch", f"{digest['content_sha256']}, indexed {expected}")
+            else:
+                self._check_changed(path)
+
+    def _store_verified(self):
+        """Remember the digests of files that passed, so the next audit can skip parsing them."""
+        flagged = {f["path"] for f in self.findings if f["problem"] in FAILURES}
+        files = dict(self.stored)
+        for path, digest in self.digests.items():
+            rel = self._rel(path)
+            if not digest or "error" in digest or rel in flagged:
+                continue
+            entry = {"sha256": digest["sha256"], "cid": digest["cid"], "bytes": digest["bytes"]}
+            encoding = (self.parsed.get(path) or {}).get("encoding") or files.get(rel, {}).get("encoding")
+            if encoding:
+                entry["encoding"] = encoding
+            files[rel] = entry
+        if files != self.stored:
+            save_digests(files, self.digests_path)
+
+
+def audit(snapshot_dir: str = SNAPSHOT_DIR, raw_dir: str = RAW_DATA_ARCHIVE_DIR,
+          workers: int = AUDIT_WORKERS, deep: bool = False) -> dict:
+    return Audit(snapshot_dir, raw_dir, workers=workers, deep=deep).run()
+
+
+def print_report(report: dict):
+    for finding in report["findings"]:
+        marker = "❌" if finding["problem"] in FAILURES else "⚠️"
+        detail = f": {finding['detail']}" if finding["detail"] else ""
+        print(f"{marker} {finding['path']} {finding['problem']}{detail}")
+    failed = sum(1 for f in report["findings"] if f["problem"] in FAILURES)
+    print(f"\n{'✅' if report['ok'] else '❌'} Audited {report['files']:,} files "
+          f"({report['bytes'] / 1e6:,.1f} MB, {report['parsed']} parsed) for {report['epochs']} published "
+          f"and {report['raw_epochs']} archived epochs in {report['seconds']:.2f}s "
+          f"on {report['workers']} workers: {failed} failures, "
+          f"{len(report['findings']) - failed} warnings")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Audit published snapshots and raw archives")
+    parser.add_argument("--dir", default=SNAPSHOT_DIR, help="Snapshot directory")
+    parser.add_argument("--raw-dir", default=RAW_DATA_ARCHIVE_DIR, help="Raw archive directory")
+    parser.add_argument("--workers", type=int, default=AUDIT_WORKERS, help="Worker processes (default all cores)")
+    parser.add_argument("--deep", action="store_true", help="Parse every file, even if verified before")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = audit(args.dir, args.raw_dir, args.workers, args.deep)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    if not report["ok"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
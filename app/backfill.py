@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Recompute historical epochs from their raw archives.
+
+Each epoch in the range is replayed from RAW_DATA_ARCHIVE_DIR/<epoch_id>/
+(merge, normalize, score, CIS, snapshot) in its own worker process, with
+network access disabled. Snapshots are written to a side-by-side output
+tree using the original file names, together with summary.json comparing
+old and new CIS.
+
+    python -m app.backfill --all
+    python -m app.backfill --from 2026-03 --to 2026-08 --output epochs-backfill
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import contextlib
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import RAW_DATA_ARCHIVE_DIR, SNAPSHOT_DIR
+from app.data_sources import archive, http_client
+from app.utils.hashing import hash_dataset
+from app.utils.manifest import load_manifest
+from app.utils.snapshot import save_snapshot
+
+
+def archived_epochs(archive_dir: str = None) -> list:
+    """Epoch ids with a raw archive index, ordered by snapshot timestamp."""
+    archive_dir = archive_dir or RAW_DATA_ARCHIVE_DIR
+    if not os.path.isdir(archive_dir):
+        return []
+    epochs = []
+    for name in os.listdir(archive_dir):
+        try:
+            index = archive.load_index(name, archive_dir)
+        except (FileNotFoundError, ValueError):
+            continue
+        epochs.append((index.get("timestamp") or "", name))
+    return [name for _, name in sorted(epochs)]
+
+
+def select_epochs(epochs: list, start: str = None, end: str = None, only: list = None) -> list:
+    """Inclusive [start, end] slice of the ordered epoch list, or an explicit subset."""
+    if only:
+        missing = [e for e in only if e not in epochs]
+        if missing:
+            raise ValueError(f"No raw archive for epochs: {', '.join(missing)}")
+        return [e for e in epochs if e in only]
+    for bound in (start, end):
+        if bound and bound not in epochs:
+            raise ValueError(f"No raw archive for epoch {bound}")
+    lo = epochs.index(start) if start else 0
+    hi = epochs.index(end) + 1 if end else len(epochs)
+    return epochs[lo:hi]
+
+
+def _init_worker():
+    # Workers only ever read archives
+    http_client.set_offline(True)
+
+
+def recompute_epoch(epoch_id: str, archive_dir: str, output_dir: str) -> dict:
+    """Replay one epoch from its archive and write the new snapshot."""
+    # Imported here so worker start-up stays cheap under spawn
+    from app.main import load_model_registry, fetch_all_data, compute_snapshot
+    from app.sharding import run_sharded
+
+    start = time.perf_counter()
+    index = archive.load_index(epoch_id, archive_dir)
+    archive.set_mode("replay", epoch_id, archive_dir)
+    # Pipeline stages print per-source progress; keep the backfill log readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        registry = load_model_registry()
+        if index.get("shards"):
+            # Epochs are already spread across the pool; score the shards in turn
+            snapshot = run_sharded(registry, index["epoch_id"], index["timestamp"],
+                                   index["shards"], workers=1)
+        else:
+            current, previous = fetch_all_data()
+            snapshot = compute_snapshot(registry, current, previous,
+                                        index["epoch_id"], index["timestamp"])
+        filepath = save_snapshot(snapshot, index["epoch_id"], index["timestamp"], output_dir)
+    return {
+        "epoch_id": epoch_id,
+        "timestamp": index["timestamp"],
+        "snapshot": os.path.basename(filepath),
+        "models": len(snapshot["models"]),
+        "cis": snapshot["cis"],
+        "sha256": hash_dataset(snapshot),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def _previous_result(epoch_id: str, manifest: dict, archive_dir: str) -> dict:
+    """CIS and hash of the published epoch, from the manifest or the snapshot file."""
+    entry = manifest.get(epoch_id, {})
+    cis = entry.get("cis")
+    sha256 = entry.get("sha256") or archive.load_index(epoch_id, archive_dir).get("snapshot_sha256")
+    if cis is None and entry.get("snapshot"):
+        path = os.path.join(SNAPSHOT_DIR, entry["snapshot"])
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                cis = json.load(f).get("cis")
+    return {"cis": cis, "sha256": sha256}
+
+
+def backfill(epochs: list, output_dir: str, archive_dir: str = None, workers: int = None) -> dict:
+    """Recompute epochs in parallel; returns and writes the summary."""
+    archive_dir = archive_dir or RAW_DATA_ARCHIVE_DIR
+    workers = workers or os.cpu_count() or 1
+    manifest = load_manifest()
+    os.makedirs(output_dir, exist_ok=True)
+
+    print(f"🔁 Backfilling {len(epochs)} epochs with {workers} workers -> {output_dir}")
+    started = time.perf_counter()
+    results, failures = {}, {}
+    with ProcessPoolExecutor(max_workers=min(workers, max(len(epochs), 1)),
+                             initializer=_init_worker) as pool:
+        futures = {pool.submit(recompute_epoch, e, archive_dir, output_dir): e for e in epochs}
+        for future in as_completed(futures):
+            epoch_id = futures[future]
+            try:
+                results[epoch_id] = future.result()
+                print(f"  ✅ {epoch_id} ({results[epoch_id]['seconds']:.2f}s)")
+            except Exception as e:
+                failures[epoch_id] = f"{type(e).__name__}: {e}"
+                print(f"  ❌ {epoch_id}: {failures[epoch_id]}")
+
+    rows = []
+    for epoch_id in epochs:
+        if epoch_id not in results:
+            continue
+        new = dict(results[epoch_id])
+        new_cis = new.pop("cis")
+        old = _previous_result(epoch_id, manifest, archive_dir)
+        rows.append({
+            **new,
+            "old_cis": old["cis"],
+            "new_cis": new_cis,
+            "cis_delta": new_cis - old["cis"] if old["cis"] is not None else None,
+            "old_sha256": old["sha256"],
+            "unchanged": old["sha256"] == new["sha256"],
+        })
+
+    summary = {
+        "created": datetime.utcnow().isoformat() + "Z",
+        "archive_dir": archive_dir,
+        "workers": workers,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+        "epochs": rows,
+        "failed": failures,
+    }
+    with open(os.path.join(output_dir, "summary.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+def print_summary(summary: dict):
+    print(f"\n{'epoch':<24} {'old CIS':>10} {'new CIS':>10} {'delta':>10}")
+    for row in summary["epochs"]:
+        old = f"{row['old_cis']:.4f}" if row["old_cis"] is not None else "-"
+        delta = f"{row['cis_delta']:+.4f}" if row["cis_delta"] is not None else "-"
+        marker = "" if row["unchanged"] else "  *"
+        print(f"{row['epoch_id']:<24} {old:>10} {row['new_cis']:>10.4f} {delta:>10}{marker}")
+    changed = sum(1 for row in summary["epochs"] if not row["unchanged"])
+    print(f"\n{len(summary['epochs'])} recomputed, {changed} changed, "
+          f"{len(summary['failed'])} failed in {summary['elapsed_seconds']:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute archived epochs in parallel")
+    parser.add_argument("--from", dest="start", default=None, help="First epoch id (inclusive)")
+    parser.add_argument("--to", dest="end", default=None, help="Last epoch id (inclusive)")
+    parser.add_argument("--epochs", default=None, help="Comma-separated epoch ids")
+    parser.add_argument("--all", action="store_true", help="Every archived epoch")
+    parser.add_argument("--archive-dir", default=RAW_DATA_ARCHIVE_DIR)
+    parser.add_argument("--output", default=None, help="Output tree (default epochs-backfill/<timestamp>)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default all cores)")
+    args = parser.parse_args()
+
+    available = archived_epochs(args.archive_dir)
+    if not (args.all or args.start or args.end or args.epochs):
+        parser.error("give an epoch range (--from/--to), --epochs or --all")
+    only = [e for e in args.epochs.split(",") if e] if args.epochs else None
+    try:
+        epochs = select_epochs(available, args.start, args.end, only)
+    except ValueError as e:
+        parser.error(str(e))
+    if not epochs:
+        print(f"No archived epochs found in {args.archive_dir}")
+        sys.exit(1)
+
+    output = args.output or os.path.join(
+        "epochs-backfill", datetime.utcnow().strftime("%Y-%m-%dT%H-%M-%SZ"))
+    summary = backfill(epochs, output, args.archive_dir, args.workers)
+    print_summary(summary)
+    if summary["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
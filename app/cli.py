@@ -0,0 +1,378 @@
+"""
+Command line interface.
+
+    aigi run                  full epoch: fetch, score, publish (same as python -m app.main)
+    aigi fetch [--epoch ID]   fetch every source into the raw archive
+    aigi score [--epoch ID]   score an epoch from its raw archive and save the snapshot
+    aigi publish [--epoch ID] pin, write variants and the latest pointer, record the manifest
+    aigi latest [--model M]   print the latest pointer (or one model) from epochs/
+    aigi verify [SNAPSHOT]    check a snapshot against its published hash, CID and variants
+    aigi report               build the HTML dashboard of the epoch history
+    aigi ranks [--tier T]     top models, rank ranges, percentiles and movers of the latest epoch
+    aigi serve                run the read API
+    aigi audit [--deep]       check snapshots, variants and raw archives against the manifest
+    aigi papers ACTION        seed, list or invalidate the model -> paper resolution cache
+    aigi schedule             refresh sources on their cadences, cut epochs on schedule
+    aigi provisional          print the scheduler's provisional CIS
+
+Subcommands import only what they use; `aigi latest` never loads pandas,
+requests or the fetchers.
+"""
+
+import os
+import sys
+import json
+import argparse
+
+
+def _config():
+    from . import config
+    return config
+
+
+def _print_json(value):
+    print(json.dumps(value, indent=2, default=str))
+
+
+def cmd_run(args):
+    from . import main
+    main.main()
+
+
+def cmd_fetch(args):
+    from .main import fetch_epoch
+    from .utils import tracing
+    epoch_id = args.epoch or _config().EPOCH_ID
+    try:
+        path = fetch_epoch(epoch_id, args.timestamp or _config().SNAPSHOT_TIMESTAMP)
+    finally:
+        tracing.export()
+    print(f"\n✅ Raw archive indexed at {path}")
+
+
+def cmd_score(args):
+    from .main import score_epoch
+    from .utils import tracing
+    try:
+        snapshot, filepath, snapshot_hash, _ = score_epoch(args.epoch or _config().EPOCH_ID)
+    finally:
+        tracing.export()
+    print(f"\n✅ Scored {snapshot['epoch_id']}: CIS {snapshot['cis']:.4f} -> {filepath}")
+
+
+def cmd_publish(args):
+    import hashlib
+    from .data_sources import archive
+    from .main import publish_epoch
+    from .utils import tracing
+    from .utils.hashing import hash_dataset
+
+    config = _config()
+    epoch_id = args.epoch or config.EPOCH_ID
+    index = archive.load_index(epoch_id)
+    filepath = args.snapshot or os.path.join(
+        config.SNAPSHOT_DIR, f"{epoch_id}_{index['timestamp'].replace(':', '-')}.json")
+    if not os.path.exists(filepath):
+        sys.exit(f"❌ No snapshot at {filepath}; run `aigi score` first")
+
+    with open(filepath, "rb") as f:
+        body = f.read()
+    snapshot = json.loads(body)
+    snapshot_hash = hash_dataset(snapshot)
+    expected = index.get("snapshot_sha256")
+    if expected and expected != snapshot_hash:
+        sys.exit(f"❌ {filepath} hashes to {snapshot_hash}, archive index expects {expected}")
+    # A streamed snapshot is canonical JSON; its variants are compressed as-is
+    streamed = hashlib.sha256(body).hexdigest() == snapshot_hash
+    try:
+        publish_epoch(snapshot, filepath, snapshot_hash, epoch_id, streamed)
+    finally:
+        tracing.export()
+    print(f"\n✅ Published {epoch_id}")
+
+
+def cmd_latest(args):
+    config = _config()
+    snapshot_dir = args.dir or config.SNAPSHOT_DIR
+    pointer_path = os.path.join(snapshot_dir, os.path.basename(config.LATEST_POINTER_PATH))
+    if not os.path.exists(pointer_path):
+        sys.exit(f"❌ No latest pointer at {pointer_path}")
+    with open(pointer_path, "r") as f:
+        pointer = json.load(f)
+
+    if "snapshot" not in pointer:
+        # Legacy latest.json holding the full snapshot
+        snapshot, pointer = pointer, {k: pointer.get(k) for k in ("epoch_id", "timestamp", "cis")}
+    elif args.model or args.full:
+        with open(os.path.join(snapshot_dir, pointer["snapshot"]), "r") as f:
+            snapshot = json.load(f)
+
+    if args.full:
+        _print_json(snapshot)
+    elif args.model:
+        model = next((m for m in snapshot.get("models", []) if str(m.get("name")) == args.model), None)
+        if model is None:
+            sys.exit(f"❌ Model {args.model} not in epoch {pointer.get('epoch_id')}")
+        _print_json(model)
+    else:
+        _print_json(pointer)
+
+
+def cmd_verify(args):
+    import gzip
+    from .utils.hashing import hash_dataset
+    from .utils.ipfs import compute_file_cid
+    from .utils.manifest import load_manifest
+
+    config = _config()
+    snapshot_dir = args.dir or config.SNAPSHOT_DIR
+    pointer = {}
+    pointer_path = os.path.join(snapshot_dir, os.path.basename(config.LATEST_POINTER_PATH))
+    if os.path.exists(pointer_path):
+        with open(pointer_path, "r") as f:
+            pointer = json.load(f)
+    path = args.snapshot or (os.path.join(snapshot_dir, pointer["snapshot"]) if "snapshot" in pointer else None)
+    if path is None:
+        sys.exit("❌ Nothing to verify: give a snapshot path or publish an epoch first")
+
+    with open(path, "r") as f:
+        snapshot = json.load(f)
+    entry = load_manifest(os.path.join(snapshot_dir, os.path.basename(config.MANIFEST_PATH))).get(
+        snapshot.get("epoch_id"), {})
+    if pointer.get("epoch_id") == snapshot.get("epoch_id"):
+        entry = {**pointer, **entry}
+
+    failures = 0
+
+    def check(label, ok, detail=""):
+        nonlocal failures
+        failures += 0 if ok else 1
+        print(f"{'✅' if ok else '❌'} {label}{': ' + detail if detail else ''}")
+
+    sha256 = hash_dataset(snapshot)
+    if entry.get("sha256"):
+        check("sha256", sha256 == entry["sha256"], sha256)
+    else:
+        print(f"⚠️ No published sha256 for {snapshot.get('epoch_id')} ({sha256})")
+    if entry.get("cid"):
+        cid = compute_file_cid(path)
+        check("cid", cid == entry["cid"], cid)
+
+    for name, variant in (entry.get("variants") or {}).items():
+        variant_path = os.path.join(snapshot_dir, variant)
+        if not os.path.exists(variant_path):
+            check(f"variant {name}", False, "missing")
+            continue
+        with open(variant_path, "rb") as f:
+            body = f.read()
+        if name == "gzip":
+            body = gzip.decompress(body)
+        elif name == "zstd":
+            try:
+                import zstandard
+            except ImportError:
+                print(f"⚠️ variant {name}: zstandard not installed, skipped")
+                continue
+            body = zstandard.ZstdDecompressor().decompressobj().decompress(body)
+        check(f"variant {name}", json.loads(body) == snapshot, variant)
+
+    if failures:
+        sys.exit(1)
+
+
+def cmd_audit(args):
+    from .audit import audit, print_report
+
+    config = _config()
+    report = audit(args.dir or config.SNAPSHOT_DIR, args.raw_dir or config.RAW_DATA_ARCHIVE_DIR,
+                   args.workers or config.AUDIT_WORKERS, args.deep)
+    if args.json:
+        _print_json(report)
+    else:
+        print_report(report)
+    if not report["ok"]:
+        sys.exit(1)
+
+
+def cmd_ranks(args):
+    from .scoring.ranks import load_or_build, previous_snapshot
+
+    config = _config()
+    snapshot_dir = args.dir or config.SNAPSHOT_DIR
+    pointer_path = os.path.join(snapshot_dir, os.path.basename(config.LATEST_POINTER_PATH))
+    if not os.path.exists(pointer_path):
+        sys.exit(f"❌ No latest pointer at {pointer_path}")
+    with open(pointer_path, "r") as f:
+        pointer = json.load(f)
+    if "snapshot" not in pointer:
+        sys.exit("❌ Legacy latest.json without a snapshot file; publish an epoch first")
+    path = os.path.join(snapshot_dir, pointer["snapshot"])
+    previous = previous_snapshot(snapshot_dir, pointer.get("epoch_id"), pointer.get("timestamp"),
+                                 os.path.join(snapshot_dir, os.path.basename(config.MANIFEST_PATH)))
+    ranks = load_or_build(path, previous=previous)
+
+    if args.model:
+        result = ranks.lookup(args.model)
+        if result is None:
+            sys.exit(f"❌ Model {args.model} not in epoch {pointer.get('epoch_id')}")
+    elif args.range:
+        start, _, end = args.range.partition("-")
+        result = ranks.rank_range(int(start), int(end or start), args.tier)
+    elif args.movers is not None:
+        result = ranks.movers(args.movers, args.down)
+    else:
+        result = ranks.top(args.top, args.tier)
+    _print_json(result)
+
+
+def cmd_report(args):
+    from .report import run
+    run(args.dir, args.output, args.cdn)
+
+
+def cmd_serve(args):
+    from .serving.server import serve
+    serve(args.host, args.port, args.dir, args.reload_interval, args.access_log)
+
+
+def cmd_papers(args):
+    from .data_sources import papers
+
+    config = _config()
+    if args.action == "seed":
+        with open(args.registry or config.MODELS_REGISTRY_PATH, "r") as f:
+            registry = json.load(f)
+        count = papers.seed_from_registry(registry)
+        print(f"✅ Seeded {count} paper ids from the registry into {config.PAPER_CACHE_PATH}")
+    elif args.action == "invalidate":
+        if not args.models and args.below is None and not args.all:
+            sys.exit("❌ Name models to invalidate, or pass --below CONFIDENCE or --all")
+        removed = papers.invalidate(args.models, args.below)
+        print(f"✅ Invalidated {len(removed)} resolution(s); they are searched again on the next fetch")
+    else:
+        cache = papers.load_cache()
+        if args.below is not None:
+            cache = {k: v for k, v in cache.items() if v.get("confidence", 0.0) < args.below}
+        _print_json(cache)
+
+
+def cmd_schedule(args):
+    from .scheduler import run_scheduler, parse_cadences
+    cadences = parse_cadences(",".join(args.cadence)) if args.cadence else None
+    run_scheduler(cadences, args.epochs, args.jitter, args.cut_now)
+
+
+def cmd_provisional(args):
+    path = args.path or _config().PROVISIONAL_PATH
+    if not os.path.exists(path):
+        sys.exit(f"❌ No provisional snapshot at {path}; is `aigi schedule` running?")
+    with open(path, "r") as f:
+        snapshot = json.load(f)
+    if args.full:
+        _print_json(snapshot)
+    elif args.model:
+        model = next((m for m in snapshot.get("models", []) if str(m.get("name")) == args.model), None)
+        if model is None:
+            sys.exit(f"❌ Model {args.model} not in the provisional snapshot")
+        _print_json(model)
+    else:
+        _print_json({k: snapshot.get(k) for k in ("epoch_id", "timestamp", "cis", "refreshed", "stale_sources")
+                     if k in snapshot})
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="aigi", description="AIGI Index Engine")
+    sub = parser.add_subparsers(dest="command", metavar="command")
+    sub.required = True
+
+    p = sub.add_parser("run", help="Fetch, score and publish an epoch")
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser("fetch", help="Fetch all sources into the raw archive")
+    p.add_argument("--epoch", default=None, help="Epoch id (default EPOCH_ID)")
+    p.add_argument("--timestamp", default=None, help="Snapshot timestamp (default now)")
+    p.set_defaults(func=cmd_fetch)
+
+    p = sub.add_parser("score", help="Score an epoch from its raw archive")
+    p.add_argument("--epoch", default=None, help="Epoch id (default EPOCH_ID)")
+    p.set_defaults(func=cmd_score)
+
+    p = sub.add_parser("publish", help="Pin and publish a scored epoch")
+    p.add_argument("--epoch", default=None, help="Epoch id (default EPOCH_ID)")
+    p.add_argument("--snapshot", default=None, help="Snapshot file (default from the archive index)")
+    p.set_defaults(func=cmd_publish)
+
+    p = sub.add_parser("latest", help="Show the latest published epoch")
+    p.add_argument("--dir", default=None, help="Snapshot directory")
+    p.add_argument("--model", default=None, help="Print one model's scores")
+    p.add_argument("--full", action="store_true", help="Print the whole snapshot")
+    p.set_defaults(func=cmd_latest)
+
+    p = sub.add_parser("verify", help="Verify a snapshot against its hash, CID and variants")
+    p.add_argument("snapshot", nargs="?", default=None, help="Snapshot file (default latest)")
+    p.add_argument("--dir", default=None, help="Snapshot directory")
+    p.set_defaults(func=cmd_verify)
+
+    p = sub.add_parser("audit", help="Check every snapshot and raw archive against the manifest")
+    p.add_argument("--dir", default=None, help="Snapshot directory")
+    p.add_argument("--raw-dir", default=None, help="Raw archive directory")
+    p.add_argument("--workers", type=int, default=None, help="Worker processes (default all cores)")
+    p.add_argument("--deep", action="store_true", help="Parse every file, even if verified before")
+    p.add_argument("--json", action="store_true", help="Print the report as JSON")
+    p.set_defaults(func=cmd_audit)
+
+    p = sub.add_parser("ranks", help="Top models, rank ranges, percentiles and movers of the latest epoch")
+    p.add_argument("--dir", default=None, help="Snapshot directory")
+    p.add_argument("--tier", default=None, help="Rank within one tier")
+    p.add_argument("--top", type=int, default=10, help="Number of top models (default 10)")
+    p.add_argument("--range", default=None, metavar="START-END", help="Models ranked START to END")
+    p.add_argument("--model", default=None, help="Rank, change and percentiles of one model")
+    p.add_argument("--movers", type=int, default=None, metavar="K", help="K biggest rank gainers")
+    p.add_argument("--down", action="store_true", help="With --movers, the biggest losers")
+    p.set_defaults(func=cmd_ranks)
+
+    p = sub.add_parser("report", help="Build the HTML dashboard of the epoch history")
+    p.add_argument("--dir", default=None, help="Snapshot directory")
+    p.add_argument("--output", default=None, help="HTML file (default REPORT_PATH)")
+    p.add_argument("--cdn", action="store_true", help="Load plotly.js from the CDN instead of embedding it")
+    p.set_defaults(func=cmd_report)
+
+    p = sub.add_parser("serve", help="Run the read API")
+    p.add_argument("--host", default=None)
+    p.add_argument("--port", type=int, default=None)
+    p.add_argument("--dir", default=None, help="Snapshot directory")
+    p.add_argument("--reload-interval", type=float, default=None)
+    p.add_argument("--access-log", action="store_true")
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser("papers", help="Manage the model -> Semantic Scholar paper resolution cache")
+    p.add_argument("action", choices=["list", "seed", "invalidate"])
+    p.add_argument("models", nargs="*", help="Models to invalidate")
+    p.add_argument("--below", type=float, default=None, help="Only entries under this confidence")
+    p.add_argument("--all", action="store_true", help="Invalidate every entry")
+    p.add_argument("--registry", default=None, help="Registry to seed from (default MODELS_REGISTRY_PATH)")
+    p.set_defaults(func=cmd_papers)
+
+    p = sub.add_parser("schedule", help="Run the refresh scheduler daemon")
+    p.add_argument("--cadence", action="append", default=[], metavar="SOURCE=DURATION",
+                   help="Override a source cadence, e.g. github=15m (repeatable)")
+    p.add_argument("--epochs", default=None, help="monthly | weekly | daily | a duration (default SCHEDULE_EPOCHS)")
+    p.add_argument("--jitter", type=float, default=None, help="Cadence jitter as a fraction (default SCHEDULE_JITTER)")
+    p.add_argument("--cut-now", action="store_true", help="Also cut the current epoch after the first fetch")
+    p.set_defaults(func=cmd_schedule)
+
+    p = sub.add_parser("provisional", help="Show the scheduler's provisional CIS")
+    p.add_argument("--path", default=None, help="Provisional snapshot (default PROVISIONAL_PATH)")
+    p.add_argument("--model", default=None, help="Print one model's scores")
+    p.add_argument("--full", action="store_true", help="Print the whole snapshot")
+    p.set_defaults(func=cmd_provisional)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Client for consumers of published AIGI snapshots.
+
+Resolves the latest epoch either through the read API (/latest) or the
+published file layout (epochs/latest.json pointer), keeps verified
+snapshots in an on-disk cache keyed by SHA-256, and revalidates with
+conditional requests so an unchanged epoch costs a single 304.
+"""
+
+import os
+import gzip
+import json
+import time
+import threading
+import requests
+from .config import ORACLE_BASE_URL, ORACLE_CACHE_DIR, ORACLE_MAX_AGE
+from .utils.hashing import hash_dataset
+from .utils.snapshot import atomic_write
+
+
+class VerificationError(Exception):
+    """Downloaded snapshot does not match its published hash."""
+
+
+class Snapshot:
+    """A verified snapshot with a by-name model index."""
+
+    __slots__ = ("data", "sha256", "models")
+
+    def __init__(self, data: dict, sha256: str):
+        self.data = data
+        self.sha256 = sha256
+        self.models = {str(m.get("name")): m for m in data.get("models", [])}
+
+    @property
+    def epoch_id(self):
+        return self.data.get("epoch_id")
+
+    @property
+    def timestamp(self):
+        return self.data.get("timestamp")
+
+    @property
+    def cis(self):
+        return self.data.get("cis")
+
+    def model(self, name: str):
+        return self.models.get(name)
+
+
+class OracleClient:
+    """
+    layout="api" talks to app.serving (GET /latest, /epochs/{id});
+    layout="files" reads epochs/latest.json and snapshot files from a
+    static host such as raw.githubusercontent.com.
+    """
+
+    def __init__(self, base_url: str = None, cache_dir: str = None, layout: str = None,
+                 max_age: float = None, timeout: float = 10, session=None):
+        self.base_url = (base_url or ORACLE_BASE_URL).rstrip("/")
+        self.cache_dir = cache_dir or ORACLE_CACHE_DIR
+        if layout is None:
+            layout = "files" if "raw.githubusercontent.com" in self.base_url else "api"
+        if layout not in ("api", "files"):
+            raise ValueError(f"Unknown layout: {layout}")
+        self.layout = layout
+        self.max_age = ORACLE_MAX_AGE if max_age is None else max_age
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self._memory = {}
+        self._current = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._validators_path = os.path.join(self.cache_dir, "validators.json")
+        self._validators = self._load_validators()
+
+    # -- on-disk cache ------------------------------------------------
+
+    def _load_validators(self) -> dict:
+        try:
+            with open(self._validators_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_validators(self):
+        atomic_write(self._validators_path, json.dumps(self._validators, indent=2).encode("utf-8"))
+
+    def _snapshot_path(self, sha256: str) -> str:
+        return os.path.join(self.cache_dir, "snapshots", f"{sha256}.json")
+
+    def _cached(self, sha256: str):
+        if not sha256:
+            return None
+        if sha256 in self._memory:
+            return self._memory[sha256]
+        path = self._snapshot_path(sha256)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            data = json.load(f)
+        # Cache files are verified again on load; a corrupt entry is refetched
+        if hash_dataset(data) != sha256:
+            os.unlink(path)
+            return None
+        snapshot = Snapshot(data, sha256)
+        self._memory[sha256] = snapshot
+        return snapshot
+
+    def _store(self, data: dict, expected_sha256: str = None) -> Snapshot:
+        sha256 = hash_dataset(data)
+        if expected_sha256 and sha256 != expected_sha256:
+            raise VerificationError(f"Snapshot hash {sha256} does not match published {expected_sha256}")
+        atomic_write(self._snapshot_path(sha256),
+                     json.dumps(data, separators=(",", ":")).encode("utf-8"))
+        snapshot = Snapshot(data, sha256)
+        self._memory[sha256] = snapshot
+        return snapshot
+
+    # -- HTTP ---------------------------------------------------------
+
+    def _get(self, path: str):
+        """Conditional GET; returns (url, response, stored validators)."""
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        entry = self._validators.get(url, {})
+        headers = {"Accept-Encoding": "gzip"}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code not in (200, 304):
+            response.raise_for_status()
+            raise requests.HTTPError(f"Unexpected status {response.status_code} for {url}")
+        return url, response, entry
+
+    def _remember(self, url: str, response, **fields):
+        self._validators[url] = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            **fields,
+        }
+        self._save_validators()
+
+    def _fetch_api(self, path: str) -> Snapshot:
+        url, response, entry = self._get(path)
+        if response.status_code == 304:
+            snapshot = self._cached(entry.get("sha256"))
+            if snapshot is not None:
+                return snapshot
+            # Validators survived but the body did not; fetch unconditionally
+            self._validators.pop(url, None)
+            url, response, entry = self._get(path)
+        expected = response.headers.get("X-Dataset-SHA256")
+        snapshot = self._cached(expected) or self._store(response.json(), expected)
+        self._remember(url, response, sha256=snapshot.sha256)
+        return snapshot
+
+    def _fetch_file(self, path: str, expected: str) -> Snapshot:
+        snapshot = self._cached(expected)
+        if snapshot is not None:
+            return snapshot
+        url, response, _ = self._get(path)
+        body = response.content
+        # .gz variants may or may not be sent with Content-Encoding
+        if body[:2] == b"\x1f\x8b":
+            body = gzip.decompress(body)
+        return self._store(json.loads(body), expected)
+
+    def _fetch_latest_files(self) -> Snapshot:
+        url, response, entry = self._get("epochs/latest.json")
+        if response.status_code == 304:
+            snapshot = self._cached(entry.get("sha256"))
+            if snapshot is not None:
+                return snapshot
+            self._validators.pop(url, None)
+            url, response, entry = self._get("epochs/latest.json")
+
+        pointer = response.json()
+        if "snapshot" not in pointer:
+            # Legacy latest.json holding the full snapshot; nothing to verify against
+            snapshot = self._store(pointer)
+        else:
+            variants = pointer.get("variants", {})
+            path = variants.get("gzip") or pointer["snapshot"]
+            snapshot = self._fetch_file(f"epochs/{path}", pointer.get("sha256"))
+        self._remember(url, response, sha256=snapshot.sha256)
+        return snapshot
+
+    # -- public API ---------------------------------------------------
+
+    def refresh(self) -> Snapshot:
+        """Revalidate the latest epoch against the server."""
+        with self._lock:
+            if self.layout == "api":
+                snapshot = self._fetch_api("latest")
+            else:
+                snapshot = self._fetch_latest_files()
+            self._current = snapshot
+            self._checked_at = time.monotonic()
+            return snapshot
+
+    def latest(self) -> Snapshot:
+        """Latest snapshot, revalidated at most every max_age seconds."""
+        if self._current is None or time.monotonic() - self._checked_at > self.max_age:
+            return self.refresh()
+        return self._current
+
+    def epoch(self, epoch_id: str, sha256: str = None) -> Snapshot:
+        """A specific epoch (read API layout only unless already cached)."""
+        cached = self._cached(sha256)
+        if cached is not None:
+            return cached
+        if self.layout != "api":
+            raise ValueError("Fetching epochs by id requires the read API layout")
+        with self._lock:
+            return self._fetch_api(f"epochs/{epoch_id}")
+
+    def cis(self) -> float:
+        return self.latest().cis
+
+    def model(self, name: str):
+        """Score record for one model in the latest epoch, or None."""
+        return self.latest().model(name)
@@ -1,8 +1,24 @@
 import os
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+
+def _find_dotenv():
+    """The .env load_dotenv() would pick: nearest one from this package upwards."""
+    path = os.path.dirname(os.path.abspath(__file__))
+    while True:
+        candidate = os.path.join(path, ".env")
+        if os.path.isfile(candidate):
+            return candidate
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+# Load environment variables (python-dotenv is only imported when there is a .env)
+_dotenv_path = _find_dotenv()
+if _dotenv_path:
+    from dotenv import load_dotenv
+    load_dotenv(_dotenv_path)
 
 # Epoch info
 EPOCH_ID = os.getenv("EPOCH_ID", "2026-04")
@@ -13,9 +29,96 @@ GITHUB_TOKEN = os.getenv("GITHUB_TOKEN", "")
 SEMANTIC_SCHOLAR_KEY = os.getenv("SEMANTIC_SCHOLAR_KEY", "")
 HUGGINGFACE_TOKEN = os.getenv("HUGGINGFACE_TOKEN", "")
 
+# IPFS node used for pinning (HTTP API); CIDs are computed locally
+IPFS_API_URL = os.getenv("IPFS_API_URL", "http://127.0.0.1:5001")
+IPFS_PUBLISH_TIMEOUT = float(os.getenv("IPFS_PUBLISH_TIMEOUT", "120"))
+
+# Read API server
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("API_PORT", "8080"))
+API_RELOAD_INTERVAL = float(os.getenv("API_RELOAD_INTERVAL", "5"))
+# /events (server-sent events): buffered events for reconnects, keep-alive period,
+# smallest model_score change reported
+SSE_BUFFER_SIZE = int(os.getenv("SSE_BUFFER_SIZE", "256"))
+SSE_KEEPALIVE = float(os.getenv("SSE_KEEPALIVE", "15"))
+SSE_THRESHOLD = float(os.getenv("SSE_THRESHOLD", "0.01"))
+
+# Oracle client
+ORACLE_BASE_URL = os.getenv("ORACLE_BASE_URL", "https://raw.githubusercontent.com/KudzayiKing/aigi-index-engine/main")
+ORACLE_CACHE_DIR = os.getenv("ORACLE_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "aigi"))
+ORACLE_MAX_AGE = float(os.getenv("ORACLE_MAX_AGE", "60"))
+
+# Upstream API base URLs; point them at app.data_sources.mock_server for offline runs
+HF_BASE_URL = os.getenv("HF_BASE_URL", "https://huggingface.co").rstrip("/")
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+SEMANTIC_SCHOLAR_API_URL = os.getenv("SEMANTIC_SCHOLAR_API_URL", "https://api.semanticscholar.org").rstrip("/")
+PWC_BASE_URL = os.getenv("PWC_BASE_URL", "https://paperswithcode.com").rstrip("/")
+
+# Tracing: output path prefix for <path>.jsonl and <path>.trace.json (empty disables)
+TRACE_PATH = os.getenv("AIGI_TRACE", "")
+
+# Sharded execution: split the registry across SHARDS worker processes (0/1 = single process)
+SHARDS = int(os.getenv("AIGI_SHARDS", "0"))
+SHARD_WORKERS = int(os.getenv("AIGI_SHARD_WORKERS", "0")) or None
+
+# Streaming mode: score in chunks of STREAM_CHUNK_SIZE rows and write the snapshot incrementally
+STREAMING = os.getenv("AIGI_STREAMING", "").lower() in ("1", "true", "yes")
+STREAM_CHUNK_SIZE = int(os.getenv("AIGI_STREAM_CHUNK_SIZE", "10000"))
+
+# Shared fetch cache (app/utils/cache.py); defaults to cache/ next to the app package, whatever the CWD
+CACHE_DIR = os.path.abspath(os.getenv(
+    "AIGI_CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache")))
+CACHE_LOCK_TIMEOUT = float(os.getenv("AIGI_CACHE_LOCK_TIMEOUT", "600"))
+ARENA_CACHE_MAX_AGE = float(os.getenv("ARENA_CACHE_MAX_AGE", str(6 * 3600)))
+
+# Scheduler daemon (aigi schedule): per-source refresh cadences (s/m/h/d suffixes), +/- jitter
+# as a fraction of the cadence, when to cut official epochs (monthly | weekly | daily | a duration)
+SCHEDULE_CADENCES = os.getenv("AIGI_SCHEDULE_CADENCES", "arena=1d,benchmarks=7d,downloads=1d,github=1h,citations=7d")
+SCHEDULE_JITTER = float(os.getenv("AIGI_SCHEDULE_JITTER", "0.1"))
+SCHEDULE_EPOCHS = os.getenv("AIGI_SCHEDULE_EPOCHS", "monthly")
+PROVISIONAL_PATH = os.getenv("AIGI_PROVISIONAL_PATH", "epochs/provisional.json")
+
 # Rate limiting (1 request per second as specified)
 RATE_LIMIT = int(os.getenv("RATE_LIMIT", "1"))
 
+# Adaptive per-host concurrency (AIMD) for the fetchers, split between sharded workers;
+# see app/data_sources/http_client.py
+HTTP_MAX_CONCURRENCY = int(os.getenv("HTTP_MAX_CONCURRENCY", "16"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_QUOTA_RESERVE = float(os.getenv("HTTP_QUOTA_RESERVE", "0.1"))
+HTTP_MAX_WAIT = float(os.getenv("HTTP_MAX_WAIT", "900"))
+
+# Per-host circuit breaker: skip a host for CIRCUIT_COOLDOWN seconds after CIRCUIT_FAILURES consecutive failures
+CIRCUIT_FAILURES = int(os.getenv("CIRCUIT_FAILURES", "5"))
+CIRCUIT_COOLDOWN = float(os.getenv("CIRCUIT_COOLDOWN", "300"))
+
+# Deadlines: per source, and a hard bound for the whole epoch run (0 = unbounded)
+SOURCE_DEADLINE = float(os.getenv("AIGI_SOURCE_DEADLINE", "300"))
+EPOCH_DEADLINE = float(os.getenv("AIGI_EPOCH_DEADLINE", "0"))
+EPOCH_RESERVE = float(os.getenv("AIGI_EPOCH_RESERVE", "60"))  # kept back from fetching for scoring/publishing
+LAST_GOOD_DIR = os.getenv("LAST_GOOD_DIR", os.path.join(CACHE_DIR, "last-good"))
+
+# Semantic Scholar: model -> paperId resolutions (re-searched below PAPER_MIN_CONFIDENCE), ids per /paper/batch call
+PAPER_CACHE_PATH = os.getenv("PAPER_CACHE_PATH", os.path.join(CACHE_DIR, "paper_resolutions.json"))
+PAPER_MIN_CONFIDENCE = float(os.getenv("PAPER_MIN_CONFIDENCE", "0.8"))
+# A search that found no paper is trusted this long (seconds) before the model is searched again
+PAPER_NEGATIVE_MAX_AGE = float(os.getenv("PAPER_NEGATIVE_MAX_AGE", str(30 * 24 * 3600)))
+S2_BATCH_SIZE = int(os.getenv("S2_BATCH_SIZE", "500"))
+
+# Bulk benchmarks from leaderboard dataset files (comma-separated Parquet/CSV paths or URLs),
+# with <metric>=<column> names for the model column and each benchmark; downloads are reused for MAX_AGE
+BENCHMARK_FILES = os.getenv("BENCHMARK_FILES", "")
+BENCHMARK_FILE_COLUMNS = os.getenv("BENCHMARK_FILE_COLUMNS", "model=fullname,mmlu=MMLU,gsm8k=GSM8K,humaneval=HumanEval")
+BENCHMARK_FILE_MAX_AGE = float(os.getenv("BENCHMARK_FILE_MAX_AGE", str(24 * 3600)))
+
+# Hugging Face downloads: page through /api/models per organization instead of one call per repo
+HF_BULK = os.getenv("HF_BULK", "true").lower() in ("1", "true", "yes")
+HF_PAGE_SIZE = int(os.getenv("HF_PAGE_SIZE", "1000"))
+
+# Sub-indices published under "indices" in each snapshot (JSON definitions, see app/scoring/indices.py);
+# empty publishes none, e.g. AIGI_INDICES_PATH=app/indices.json
+INDICES_PATH = os.getenv("AIGI_INDICES_PATH", "")
+
 # Weights for intelligence sub-scores
 INTELLIGENCE_WEIGHTS = {
     "arena": 0.30,
@@ -59,4 +162,25 @@ MODEL_SCORE_WEIGHTS = {
 # Paths
 RAW_DATA_ARCHIVE_DIR = "epochs/raw"
 SNAPSHOT_DIR = "epochs"
-MODELS_REGISTRY_PATH = "app/models_registry.json"
+MANIFEST_PATH = "epochs/manifest.jsonl"
+DIST_DIR = "epochs/dist"
+LATEST_POINTER_PATH = "epochs/latest.json"
+# File digests recorded by `aigi audit` for files it has verified
+AUDIT_DIGESTS_PATH = "epochs/digests.json"
+AUDIT_WORKERS = int(os.getenv("AIGI_AUDIT_WORKERS", "0")) or None
+# Per-epoch summaries (scores, ranks, tier contributions) behind `aigi report`
+HISTORY_DIR = "epochs/history"
+REPORT_PATH = os.getenv("AIGI_REPORT_PATH", "epochs/report.html")
+# Series longer than this are downsampled (LTTB) in the report
+REPORT_MAX_POINTS = int(os.getenv("AIGI_REPORT_MAX_POINTS", "1000"))
+REPORT_TRAJECTORY_POINTS = int(os.getenv("AIGI_REPORT_TRAJECTORY_POINTS", "120"))
+# Models drawn as their own trace (the rest share one background trace)
+REPORT_TOP_MODELS = int(os.getenv("AIGI_REPORT_TOP_MODELS", "15"))
+MODELS_REGISTRY_PATH = os.getenv("MODELS_REGISTRY_PATH", "app/models_registry.json")
+
+# Raw fetch archive of a full run (aigi run / python -m app.main): "record"
+# stores every fetched payload, "replay" recomputes REPLAY_EPOCH_ID from its
+# archive without network, "off" disables. Imported fetchers never record
+# unless a run (or the scheduler's epoch cut) switches the archive on.
+RAW_ARCHIVE_MODE = os.getenv("RAW_ARCHIVE_MODE", "record")
+REPLAY_EPOCH_ID = os.getenv("REPLAY_EPOCH_ID", EPOCH_ID)
@@ -1,9 +1,14 @@
-from .lmarena import fetch_arena_scores
-from .huggingface import fetch_hf_downloads
-from .github import fetch_github_stats
-from .citations import fetch_citations
-from .benchmarks import fetch_all_benchmarks
-from .mock_data import get_mock_all_data
+# Fetchers are imported on first access; each pulls in pandas/requests/bs4
+import importlib
+
+_EXPORTS = {
+    'fetch_arena_scores': '.lmarena',
+    'fetch_hf_downloads': '.huggingface',
+    'fetch_github_stats': '.github',
+    'fetch_citations': '.citations',
+    'fetch_all_benchmarks': '.benchmarks',
+    'get_mock_all_data': '.mock_data',
+}
 
 __all__ = [
     'fetch_arena_scores',
@@ -13,3 +18,12 @@ __all__ = [
     'fetch_all_benchmarks',
     'get_mock_all_data'
 ]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,218 @@
+"""
+Record/replay of fetched payloads.
+
+In record mode every fetch_* result is written under
+RAW_DATA_ARCHIVE_DIR/<epoch_id>/ as a gzip-compressed JSON record named
+by the SHA-256 of its contents. In replay mode the same calls are served
+from the archive without touching the network.
+"""
+
+import os
+import gzip
+import json
+import hashlib
+import functools
+import threading
+import pandas as pd
+from ..config import RAW_DATA_ARCHIVE_DIR, EPOCH_ID
+
+INDEX_FILE = "index.json"
+
+# Off until a run, fetch or replay selects a mode (set_mode)
+_state = {
+    "mode": "off",
+    "epoch_id": EPOCH_ID,
+    "archive_dir": RAW_DATA_ARCHIVE_DIR,
+    "shard": None,
+}
+_recorded = {}
+_index_cache = {}
+_lock = threading.Lock()
+
+
+def set_mode(mode: str, epoch_id: str, archive_dir: str = None):
+    """Switch between 'record', 'replay' and 'off' for the given epoch."""
+    if mode not in ("record", "replay", "off"):
+        raise ValueError(f"Unknown archive mode: {mode}")
+    with _lock:
+        _state["mode"] = mode
+        _state["epoch_id"] = epoch_id
+        _state["archive_dir"] = archive_dir or RAW_DATA_ARCHIVE_DIR
+        _recorded.clear()
+
+
+def get_mode() -> str:
+    return _state["mode"]
+
+
+def get_settings() -> tuple:
+    """(mode, epoch_id, archive_dir), e.g. to pass on to worker processes."""
+    return _state["mode"], _state["epoch_id"], _state["archive_dir"]
+
+
+def set_shard(shard: str = None):
+    """Suffix record keys (e.g. downloads.shard-0001-of-0008) for per-shard fetches."""
+    _state["shard"] = shard
+
+
+def source_key(source: str) -> str:
+    """Record key for a source in the current shard."""
+    return f"{source}.{_state['shard']}" if _state["shard"] else source
+
+
+def recorded() -> dict:
+    """Records written by this process since set_mode, keyed by source."""
+    with _lock:
+        return dict(_recorded)
+
+
+def add_recorded(entries: dict):
+    """Include records written by worker processes in the next index."""
+    with _lock:
+        _recorded.update(entries)
+
+
+def epoch_archive_dir(epoch_id: str = None, archive_dir: str = None) -> str:
+    return os.path.join(archive_dir or _state["archive_dir"], epoch_id or _state["epoch_id"])
+
+
+def _encode_frame(df: pd.DataFrame) -> dict:
+    split = df.to_dict(orient="split", index=False)
+    return {
+        "columns": split["columns"],
+        "dtypes": [str(t) for t in df.dtypes],
+        "data": split["data"],
+    }
+
+
+def _decode_frame(payload: dict) -> pd.DataFrame:
+    df = pd.DataFrame(payload["data"], columns=payload["columns"])
+    if len(df.columns):
+        df = df.astype(dict(zip(df.columns, payload["dtypes"])))
+    return df
+
+
+def encode_payload(value) -> dict:
+    if isinstance(value, pd.DataFrame):
+        return {"kind": "frame", "frame": _encode_frame(value)}
+    if isinstance(value, dict) and value and all(isinstance(v, pd.DataFrame) for v in value.values()):
+        return {"kind": "frames", "frames": {k: _encode_frame(v) for k, v in value.items()}}
+    return {"kind": "json", "value": value}
+
+
+def decode_payload(payload: dict):
+    if payload["kind"] == "frame":
+        return _decode_frame(payload["frame"])
+    if payload["kind"] == "frames":
+        return {k: _decode_frame(v) for k, v in payload["frames"].items()}
+    return payload["value"]
+
+
+def _canonical(payload: dict) -> bytes:
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def record(source: str, value) -> str:
+    """Write a fetched payload to the current epoch's archive. Returns its hash."""
+    body = _canonical(encode_payload(value))
+    digest = hashlib.sha256(body).hexdigest()
+    filename = f"{digest}.json.gz"
+    target_dir = epoch_archive_dir()
+    os.makedirs(target_dir, exist_ok=True)
+    path = os.path.join(target_dir, filename)
+    if not os.path.exists(path):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        # mtime=0 keeps the compressed bytes stable for identical payloads
+        with open(tmp, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+            f.write(body)
+        os.replace(tmp, path)
+    with _lock:
+        _recorded[source] = {"sha256": digest, "file": filename, "bytes": len(body)}
+    return digest
+
+
+def write_index(epoch_id: str, timestamp: str, **fields) -> str:
+    """Write the epoch's archive index mapping sources to record files."""
+    index = {
+        "epoch_id": epoch_id,
+        "timestamp": timestamp,
+        "sources": dict(sorted(_recorded.items())),
+        **fields,
+    }
+    target_dir = epoch_archive_dir(epoch_id)
+    os.makedirs(target_dir, exist_ok=True)
+    path = os.path.join(target_dir, INDEX_FILE)
+    with open(path, "w") as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+    return path
+
+
+def update_index(epoch_id: str, **fields) -> str:
+    """Add fields (e.g. snapshot_sha256) to an existing index."""
+    index = load_index(epoch_id)
+    index.update(fields)
+    path = os.path.join(epoch_archive_dir(epoch_id), INDEX_FILE)
+    with open(path, "w") as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+    _index_cache.pop(epoch_archive_dir(epoch_id), None)
+    return path
+
+
+def load_index(epoch_id: str = None, archive_dir: str = None) -> dict:
+    path = os.path.join(epoch_archive_dir(epoch_id, archive_dir), INDEX_FILE)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No raw archive index at {path}")
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def read_record(path: str, expected_sha256: str = None):
+    """Read and verify one archived record."""
+    with gzip.open(path, "rb") as f:
+        body = f.read()
+    digest = hashlib.sha256(body).hexdigest()
+    if expected_sha256 and digest != expected_sha256:
+        raise ValueError(f"Archived record {path} is corrupt (sha256 {digest})")
+    return decode_payload(json.loads(body))
+
+
+def load_record(source: str, epoch_id: str = None, archive_dir: str = None):
+    """Return the archived payload for a source."""
+    target_dir = epoch_archive_dir(epoch_id, archive_dir)
+    if target_dir not in _index_cache:
+        _index_cache[target_dir] = load_index(epoch_id, archive_dir)
+    sources = _index_cache[target_dir]["sources"]
+    if source not in sources:
+        raise KeyError(f"Source '{source}' not recorded in {target_dir}")
+    entry = sources[source]
+    return read_record(os.path.join(target_dir, entry["file"]), entry["sha256"])
+
+
+def archived(source: str, optional: bool = False):
+    """
+    Decorator routing a fetch_* call through the raw archive. An optional
+    source replays as None for epochs recorded before it existed.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            mode = _state["mode"]
+            key = source_key(source)
+            if mode == "replay":
+                print(f"📼 Replaying {key} from {epoch_archive_dir()}")
+                try:
+                    return load_record(key)
+                except KeyError:
+                    if not optional:
+                        raise
+                    print(f"  {key} was not recorded for this epoch")
+                    return None
+            result = func(*args, **kwargs)
+            if mode == "record":
+                try:
+                    record(key, result)
+                except Exception as e:
+                    print(f"⚠️ Could not archive {key}: {e}")
+            return result
+        return wrapper
+    return decorator
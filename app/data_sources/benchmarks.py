@@ -1,25 +1,41 @@
-import requests
 import pandas as pd
 import json
 import time
 from bs4 import BeautifulSoup
 import re
-from ..config import RATE_LIMIT
+from ..config import RATE_LIMIT, PWC_BASE_URL, MODELS_REGISTRY_PATH, BENCHMARK_FILES
+from .archive import archived
+from .resilience import guarded
+from .schemas import typed
+from .leaderboards import fetch_leaderboard_benchmarks
+from . import http_client
 
-def fetch_all_benchmarks():
+@archived("benchmarks")
+@typed("benchmarks", parts=("mmlu", "gsm8k", "humaneval"))
+@guarded("benchmarks", parts=("mmlu", "gsm8k", "humaneval"))
+def fetch_all_benchmarks(registry=None):
     """
     Fetch real benchmark data from various sources.
     Returns separate dataframes for MMLU, GSM8K, and HumanEval.
+
+    With BENCHMARK_FILES, scores come from the leaderboard dataset files
+    for every registry model they cover; Papers with Code is only scraped
+    for benchmarks the files have no column for. A scrape that fails is
+    None, so @guarded falls back for that benchmark alone.
     """
-    mmlu_df = fetch_mmlu_scores()
-    gsm8k_df = fetch_gsm8k_scores()
-    humaneval_df = fetch_humaneval_scores()
-    
-    return {
-        'mmlu': mmlu_df,
-        'gsm8k': gsm8k_df,
-        'humaneval': humaneval_df
+    bulk = {}
+    if BENCHMARK_FILES:
+        if registry is None:
+            with open(MODELS_REGISTRY_PATH, 'r') as f:
+                registry = json.load(f)
+        bulk = fetch_leaderboard_benchmarks(registry)
+
+    scrapers = {
+        'mmlu': fetch_mmlu_scores,
+        'gsm8k': fetch_gsm8k_scores,
+        'humaneval': fetch_humaneval_scores,
     }
+    return {metric: bulk[metric] if metric in bulk else scrape() for metric, scrape in scrapers.items()}
 
 def fetch_mmlu_scores():
     """
@@ -27,10 +43,13 @@ def fetch_mmlu_scores():
     Source: Papers with Code
     """
     try:
-        url = "https://paperswithcode.com/sota/multi-task-language-understanding-on-mmlu"
+        url = f"{PWC_BASE_URL}/sota/multi-task-language-understanding-on-mmlu"
         headers = {'User-Agent': 'Mozilla/5.0'}
         
-        response = requests.get(url, headers=headers, timeout=10)
+        response = http_client.get(url, headers=headers, timeout=10)
+        if response.status_code != 200:
+            print(f"  ⚠️ Got status {response.status_code} fetching MMLU")
+            return None
         soup = BeautifulSoup(response.text, 'html.parser')
         
         # Find the table
@@ -60,17 +79,20 @@ def fetch_mmlu_scores():
         
     except Exception as e:
         print(f"Error fetching MMLU: {e}")
-        return pd.DataFrame(columns=['model', 'mmlu'])
+        return None
 
 def fetch_gsm8k_scores():
     """
     Fetch GSM8K (math reasoning) scores.
     """
     try:
-        url = "https://paperswithcode.com/sota/arithmetic-reasoning-on-gsm8k"
+        url = f"{PWC_BASE_URL}/sota/arithmetic-reasoning-on-gsm8k"
         headers = {'User-Agent': 'Mozilla/5.0'}
         
-        response = requests.get(url, headers=headers, timeout=10)
+        response = http_client.get(url, headers=headers, timeout=10)
+        if response.status_code != 200:
+            print(f"  ⚠️ Got status {response.status_code} fetching GSM8K")
+            return None
         soup = BeautifulSoup(response.text, 'html.parser')
         
         table = soup.find('table', {'class': 'table'})
@@ -97,17 +119,20 @@ def fetch_gsm8k_scores():
         
     except Exception as e:
         print(f"Error fetching GSM8K: {e}")
-        return pd.DataFrame(columns=['model', 'gsm8k'])
+        return None
 
 def fetch_humaneval_scores():
     """
     Fetch HumanEval (code generation) scores.
     """
     try:
-        url = "https://paperswithcode.com/sota/code-generation-on-humaneval"
+        url = f"{PWC_BASE_URL}/sota/code-generation-on-humaneval"
         headers = {'User-Agent': 'Mozilla/5.0'}
         
-        response = requests.get(url, headers=headers, timeout=10)
+        response = http_client.get(url, headers=headers, timeout=10)
+        if response.status_code != 200:
+            print(f"  ⚠️ Got status {response.status_code} fetching HumanEval")
+            return None
         soup = BeautifulSoup(response.text, 'html.parser')
         
         table = soup.find('table', {'class': 'table'})
@@ -134,4 +159,4 @@ def fetch_humaneval_scores():
         
     except Exception as e:
         print(f"Error fetching HumanEval: {e}")
-        return pd.DataFrame(columns=['model', 'humaneval'])
+        return None
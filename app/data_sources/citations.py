@@ -1,117 +1,194 @@
-import requests
 import pandas as pd
 import json
-import time
 from typing import Optional
-from ..config import SEMANTIC_SCHOLAR_KEY, RATE_LIMIT
+from ..config import SEMANTIC_SCHOLAR_KEY, SEMANTIC_SCHOLAR_API_URL, MODELS_REGISTRY_PATH, S2_BATCH_SIZE
+from .archive import archived
+from .resilience import guarded
+from .schemas import typed
+from . import http_client, papers
 
-def fetch_citations():
+@archived("citations")
+@typed("citations")
+@guarded("citations")
+def fetch_citations(registry=None):
     """
     Fetch real citation counts from Semantic Scholar.
     Uses your authenticated API key for higher rate limits.
+
+    Each model is mapped to a paper id (registry arXiv id, else the paper
+    resolution cache, else a search whose result is cached), then counts
+    are read for all ids at once from /paper/batch.
     """
-    with open('app/models_registry.json', 'r') as f:
-        registry = json.load(f)
-    
+    if registry is None:
+        with open(MODELS_REGISTRY_PATH, 'r') as f:
+            registry = json.load(f)
+
     headers = {}
     if SEMANTIC_SCHOLAR_KEY:
         headers['x-api-key'] = SEMANTIC_SCHOLAR_KEY
         print("📚 Using authenticated Semantic Scholar API (1 req/sec)")
     else:
         print("⚠️ No Semantic Scholar key - using unauthenticated (slower)")
-    
+
+    paper_ids = resolve_papers(registry, headers)
+    counts = fetch_citation_counts([p for p in dict.fromkeys(paper_ids.values()) if p], headers)
+
     data = []
     for model in registry:
-        paper_id = model.get('paper_id')
-        model_name = model['name']
-        
-        if paper_id and paper_id.startswith('arxiv:'):
-            arxiv_id = paper_id.replace('arxiv:', '')
-            citations = fetch_arxiv_citations(arxiv_id, headers)
+        name = model['name']
+        if name not in paper_ids:
+            # No paper: no citations
+            count = 0
         else:
-            # Try searching by model name
-            citations = search_semantic_scholar(model_name, headers)
-        
+            count = counts.get(paper_ids[name])
+            if count is None:
+                # The search or the count failed: missing, not zero
+                continue
         data.append({
-            'model': model_name,
-            'citation_velocity': citations
+            'model': name,
+            'citation_velocity': count
         })
-        
-        # Rate limiting - 1 request per second as specified
-        time.sleep(1.0 / RATE_LIMIT)
-    
-    return pd.DataFrame(data)
 
-def fetch_arxiv_citations(arxiv_id: str, headers: dict = None) -> int:
+    return pd.DataFrame(data, columns=['model', 'citation_velocity'])
+
+def resolve_papers(registry: list, headers: dict) -> dict:
     """
-    Fetch citation count for an arXiv paper using Semantic Scholar.
+    {model name: S2 paper id} for the models that have a paper, None for
+    models whose search failed. Only models missing from the resolution
+    cache, or cached with low confidence, are searched.
+    """
+    cache = papers.load_cache()
+    paper_ids = {}
+    to_search = []
+    for model in registry:
+        name = model['name']
+        paper_id = papers.registry_paper_id(model)
+        if paper_id:
+            paper_ids[name] = paper_id
+        elif papers.needs_search(cache.get(name)):
+            to_search.append(name)
+        elif cache[name]['paper_id']:
+            paper_ids[name] = cache[name]['paper_id']
+    print(f"  📎 {len(paper_ids)} papers known, {len(to_search)} to search")
+
+    if to_search:
+        # Concurrency backs off on 429 and Retry-After (see http_client)
+        resolved = http_client.parallel_map(lambda name: resolve_paper(name, headers), to_search)
+        # Failed searches (None) are not cached and are retried next run
+        updates = {name: entry for name, entry in zip(to_search, resolved) if entry is not None}
+        if updates:
+            papers.save_cache(updates)
+        for name, entry in zip(to_search, resolved):
+            if entry is None:
+                paper_ids[name] = None
+            elif entry['paper_id']:
+                paper_ids[name] = entry['paper_id']
+    return paper_ids
+
+def resolve_paper(query: str, headers: dict = None) -> Optional[dict]:
+    """
+    Search for a model's paper by name and pick the best matching title.
+    Returns a paper cache entry (paper_id None when nothing was found),
+    or None when the search itself failed.
     """
     if headers is None:
         headers = {}
-    
+
     try:
-        # Use the Graph API with citationCount field
-        url = f"https://api.semanticscholar.org/graph/v1/paper/arXiv:{arxiv_id}"
-        params = {'fields': 'citationCount,title,year'}
-        
-        response = requests.get(url, params=params, headers=headers, timeout=10)
-        
+        url = f"{SEMANTIC_SCHOLAR_API_URL}/graph/v1/paper/search"
+        params = {
+            'query': query,
+            'limit': 5,
+            'fields': 'title,year'
+        }
+
+        response = http_client.get(url, params=params, headers=headers, timeout=10)
+
         if response.status_code == 200:
-            data = response.json()
-            citations = data.get('citationCount', 0)
-            title = data.get('title', 'Unknown')[:50]
-            if citations > 0:
-                print(f"  ✅ arXiv:{arxiv_id}: {citations} citations - {title}")
-            return citations
+            candidates = response.json().get('data', [])
+            if not candidates:
+                return papers.make_entry(None)
+            best = max(candidates, key=lambda p: papers.match_confidence(query, p.get('title')))
+            confidence = papers.match_confidence(query, best.get('title'))
+            print(f"  🔎 '{query}' -> {(best.get('title') or 'Unknown')[:50]} (confidence {confidence:.2f})")
+            return papers.make_entry(best['paperId'], best.get('title'), confidence)
         elif response.status_code == 403:
-            print(f"  ⚠️ Access forbidden for {arxiv_id} - check API key")
-            return 0
+            print(f"  ⚠️ Access forbidden for search '{query}'")
         elif response.status_code == 429:
-            print(f"  ⚠️ Rate limited for {arxiv_id}")
-            time.sleep(2)
-            return 0
+            print(f"  ⚠️ Rate limited on search")
         else:
-            print(f"  ⚠️ Got status {response.status_code} for {arxiv_id}")
-            return 0
-            
+            print(f"  ⚠️ Got status {response.status_code} searching '{query}'")
+        return None
+
     except Exception as e:
-        print(f"  Error fetching arXiv citations for {arxiv_id}: {e}")
-        return 0
+        print(f"  Error searching for {query}: {e}")
+        return None
 
-def search_semantic_scholar(query: str, headers: dict = None) -> int:
+def fetch_citation_counts(paper_ids: list, headers: dict = None) -> dict:
     """
-    Search for a paper by name and get its citation count.
+    Citation counts for many papers via POST /paper/batch, S2_BATCH_SIZE
+    ids per request. A batch that fails is fetched paper by paper.
+    Returns {paper id as given: citationCount}, None where the count failed.
     """
     if headers is None:
         headers = {}
-    
+
+    counts = {}
+    url = f"{SEMANTIC_SCHOLAR_API_URL}/graph/v1/paper/batch"
+    for start in range(0, len(paper_ids), S2_BATCH_SIZE):
+        chunk = paper_ids[start:start + S2_BATCH_SIZE]
+        try:
+            response = http_client.post(url, params={'fields': 'citationCount'}, json={'ids': chunk},
+                                        headers=headers, timeout=30)
+            status = response.status_code
+        except Exception as e:
+            response, status = None, e
+        if response is not None and status == 200:
+            # One result per requested id, in order; null for unknown ids
+            for paper_id, paper in zip(chunk, response.json()):
+                counts[paper_id] = (paper or {}).get('citationCount') or 0
+            print(f"  ✅ Citation counts for {len(chunk)} papers")
+            continue
+        print(f"  ⚠️ Batch lookup failed ({status}), fetching {len(chunk)} papers one by one")
+        counts.update(zip(chunk, http_client.parallel_map(lambda p: fetch_paper_citations(p, headers), chunk)))
+    return counts
+
+def fetch_arxiv_citations(arxiv_id: str, headers: dict = None) -> Optional[int]:
+    """
+    Fetch citation count for an arXiv paper using Semantic Scholar.
+    """
+    return fetch_paper_citations(f"arXiv:{arxiv_id}", headers)
+
+def fetch_paper_citations(paper_id: str, headers: dict = None) -> Optional[int]:
+    """
+    Fetch citation count for one paper (S2 paperId or a prefixed id such as arXiv:...).
+    Returns None when the count could not be read.
+    """
+    if headers is None:
+        headers = {}
+
     try:
-        url = "https://api.semanticscholar.org/graph/v1/paper/search"
-        params = {
-            'query': query,
-            'limit': 1,
-            'fields': 'citationCount,title,year'
-        }
-        
-        response = requests.get(url, params=params, headers=headers, timeout=10)
-        
+        # Use the Graph API with citationCount field
+        url = f"{SEMANTIC_SCHOLAR_API_URL}/graph/v1/paper/{paper_id}"
+        params = {'fields': 'citationCount,title,year'}
+
+        response = http_client.get(url, params=params, headers=headers, timeout=10)
+
         if response.status_code == 200:
             data = response.json()
-            papers = data.get('data', [])
-            if papers:
-                citations = papers[0].get('citationCount', 0)
-                title = papers[0].get('title', 'Unknown')[:50]
-                if citations > 0:
-                    print(f"  ✅ '{query}': {citations} citations - {title}")
-                return citations
+            citations = data.get('citationCount', 0)
+            title = data.get('title', 'Unknown')[:50]
+            if citations > 0:
+                print(f"  ✅ {paper_id}: {citations} citations - {title}")
+            return citations
         elif response.status_code == 403:
-            print(f"  ⚠️ Access forbidden for search '{query}'")
+            print(f"  ⚠️ Access forbidden for {paper_id} - check API key")
         elif response.status_code == 429:
-            print(f"  ⚠️ Rate limited on search")
-            time.sleep(2)
-        
-        return 0
-        
+            print(f"  ⚠️ Rate limited for {paper_id}")
+        else:
+            print(f"  ⚠️ Got status {response.status_code} for {paper_id}")
+        return None
+
     except Exception as e:
-        print(f"  Error searching for {query}: {e}")
-        return 0
+        print(f"  Error fetching citations for {paper_id}: {e}")
+        return None
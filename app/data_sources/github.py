@@ -1,9 +1,12 @@
-import requests
 import pandas as pd
 import json
-import time
 from datetime import datetime, timedelta
-from ..config import GITHUB_TOKEN
+from typing import Optional
+from ..config import GITHUB_TOKEN, GITHUB_API_URL, MODELS_REGISTRY_PATH
+from .archive import archived
+from .resilience import guarded
+from .schemas import typed
+from . import http_client
 
 # Then in fetch_repo_stats function, add the token to headers:
 headers = {}
@@ -11,42 +14,52 @@ if GITHUB_TOKEN:
     headers['Authorization'] = f'token {GITHUB_TOKEN}'
 
 
-def fetch_github_stats():
+@archived("github")
+@typed("github")
+@guarded("github")
+def fetch_github_stats(registry=None):
     """
     Fetch GitHub statistics for models with GitHub repos.
     """
-    with open('app/models_registry.json', 'r') as f:
-        registry = json.load(f)
+    if registry is None:
+        with open(MODELS_REGISTRY_PATH, 'r') as f:
+            registry = json.load(f)
     
     headers = {
         'Authorization': f'token {GITHUB_TOKEN}',
         'Accept': 'application/vnd.github.v3+json'
     } if GITHUB_TOKEN != "your_github_token_here" else {}
     
+    models = [model for model in registry if model.get('github_repo')]
+    # Concurrency and pacing follow the X-RateLimit headers (see http_client)
+    stats = http_client.parallel_map(lambda model: fetch_repo_stats(model['github_repo'], headers), models)
+
     data = []
-    for model in registry:
-        github_repo = model.get('github_repo')
-        if github_repo:
-            stats = fetch_repo_stats(github_repo, headers)
-            data.append({
-                'model': model['name'],
-                'github': stats['growth_score']
-            })
-            time.sleep(1)  # Rate limiting
-    
-    return pd.DataFrame(data)
+    for model, repo_stats in zip(models, stats):
+        # A failed lookup is left out (missing), not scored as zero growth
+        if repo_stats is None:
+            continue
+        data.append({
+            'model': model['name'],
+            'github': repo_stats['growth_score']
+        })
+
+    return pd.DataFrame(data, columns=['model', 'github'])
 
-def fetch_repo_stats(repo_full_name: str, headers: dict) -> dict:
+def fetch_repo_stats(repo_full_name: str, headers: dict) -> Optional[dict]:
     """
-    Fetch comprehensive stats for a GitHub repo.
+    Fetch comprehensive stats for a GitHub repo. Returns None when the
+    stats could not be read (error status, rate limit, deadline, open
+    circuit), so the caller can tell a failure from a repo with no growth.
     """
-    base_url = f"https://api.github.com/repos/{repo_full_name}"
+    base_url = f"{GITHUB_API_URL}/repos/{repo_full_name}"
     
     try:
         # Get basic repo info
-        repo_response = requests.get(base_url, headers=headers, timeout=10)
+        repo_response = http_client.get(base_url, headers=headers, timeout=10)
         if repo_response.status_code != 200:
-            return {'growth_score': 0, 'stars': 0, 'forks': 0, 'commits_30d': 0}
+            print(f"  ⚠️ Got status {repo_response.status_code} for {repo_full_name}")
+            return None
         
         repo_data = repo_response.json()
         stars = repo_data.get('stargazers_count', 0)
@@ -55,9 +68,16 @@ def fetch_repo_stats(repo_full_name: str, headers: dict) -> dict:
         # Get recent commit activity
         since = (datetime.now() - timedelta(days=30)).isoformat()
         commits_url = f"{base_url}/commits?since={since}&per_page=100"
-        commits_response = requests.get(commits_url, headers=headers, timeout=10)
+        commits_response = http_client.get(commits_url, headers=headers, timeout=10)
         
-        commits_30d = len(commits_response.json()) if commits_response.status_code == 200 else 0
+        if commits_response.status_code == 200:
+            commits_30d = len(commits_response.json())
+        elif commits_response.status_code == 409:
+            # Empty repository
+            commits_30d = 0
+        else:
+            print(f"  ⚠️ Got status {commits_response.status_code} for {repo_full_name} commits")
+            return None
         
         # Calculate growth score (custom metric)
         # You can adjust this formula based on what matters
@@ -72,14 +92,14 @@ def fetch_repo_stats(repo_full_name: str, headers: dict) -> dict:
         
     except Exception as e:
         print(f"Error fetching {repo_full_name}: {e}")
-        return {'growth_score': 0, 'stars': 0, 'forks': 0, 'commits_30d': 0}
+        return None
 
 def fetch_github_trending():
     """
     Alternative: Fetch trending repositories.
     """
     try:
-        url = "https://api.github.com/search/repositories"
+        url = f"{GITHUB_API_URL}/search/repositories"
         params = {
             'q': 'language:python OR language:jupyter-notebook topic:ai topic:machine-learning',
             'sort': 'stars',
@@ -88,7 +108,7 @@ def fetch_github_trending():
         }
         
         headers = {'Authorization': f'token {GITHUB_TOKEN}'} if GITHUB_TOKEN != "your_github_token_here" else {}
-        response = requests.get(url, params=params, headers=headers, timeout=10)
+        response = http_client.get(url, params=params, headers=headers, timeout=10)
         
         if response.status_code == 200:
             data = response.json()
@@ -0,0 +1,352 @@
+"""
+Shared HTTP layer for the fetchers.
+
+Every request goes through a per-host controller that adapts concurrency
+AIMD-style: the limit grows by 1/limit per healthy response and halves on
+429, 5xx or a low remaining quota. Retry-After and GitHub-style
+X-RateLimit-Remaining/Reset headers delay the next request; once the
+remaining quota drops below HTTP_QUOTA_RESERVE of the limit, requests are
+spread evenly over the rest of the reset window. parallel_map() runs
+per-model fetches on a thread pool and lets the controllers decide how
+many actually hit each host at once.
+
+Each host also has a circuit breaker: after CIRCUIT_FAILURES consecutive
+connection errors or 5xx responses, requests to it fail fast with
+CircuitOpen for CIRCUIT_COOLDOWN seconds, then a single trial request
+decides whether it closes again. A scope (see app.data_sources.resilience)
+bounds request timeouts by a deadline and counts outcomes per source.
+
+Controllers live in one process. When several processes fetch at once
+(the sharded pipeline's workers), each calls set_share(processes) and
+takes an equal part of every host: HTTP_MAX_CONCURRENCY // processes
+requests in flight, and 1/processes of the remaining quota and of its
+reserve (the headers report the quota of the whole account) to pace
+over the window. Together the processes send no more than one would.
+"""
+
+import time
+import threading
+import contextvars
+import requests
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+from ..config import (HTTP_MAX_CONCURRENCY, HTTP_MAX_RETRIES, HTTP_QUOTA_RESERVE, HTTP_MAX_WAIT,
+                      CIRCUIT_FAILURES, CIRCUIT_COOLDOWN)
+from ..utils import tracing
+
+_state = {"offline": False, "share": 1}
+_controllers = {}
+_controllers_lock = threading.Lock()
+_scope = contextvars.ContextVar("http_scope", default=None)
+
+
+class RateLimitExceeded(RuntimeError):
+    """The host asked us to wait longer than HTTP_MAX_WAIT."""
+
+
+class CircuitOpen(RuntimeError):
+    """The host failed too often recently; requests are skipped until the cooldown ends."""
+
+
+class DeadlineExceeded(RuntimeError):
+    """The current scope's deadline has passed."""
+
+
+class Scope:
+    """Deadline and request outcomes for one source fetch."""
+
+    def __init__(self, source: str, deadline: float = None):
+        self.source = source
+        self.deadline = deadline  # time.time() value, None for no deadline
+        self.ok = 0
+        self.failed = 0
+        self.lock = threading.Lock()
+
+    def remaining(self):
+        return None if self.deadline is None else self.deadline - time.time()
+
+    def expire(self):
+        """Make further requests in this scope fail fast."""
+        self.deadline = time.time()
+
+    def record(self, ok: bool):
+        with self.lock:
+            if ok:
+                self.ok += 1
+            else:
+                self.failed += 1
+
+
+def current_scope() -> Scope:
+    return _scope.get()
+
+
+def run_in_scope(scope: Scope, func, *args, **kwargs):
+    """Call func with scope active (in this thread and in parallel_map workers)."""
+    token = _scope.set(scope)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        _scope.reset(token)
+
+
+def set_offline(offline: bool = True):
+    """Refuse all outgoing requests (used by replay and backfill workers)."""
+    _state["offline"] = offline
+
+
+def _header_float(response, *names):
+    for name in names:
+        value = response.headers.get(name)
+        if value is not None:
+            try:
+                return float(value)
+            except ValueError:
+                pass
+    return None
+
+
+def _quota(response):
+    """(limit, remaining, seconds until reset) from rate-limit headers, None when absent."""
+    if response is None:
+        return None, None, None
+    limit = _header_float(response, "X-RateLimit-Limit", "RateLimit-Limit")
+    remaining = _header_float(response, "X-RateLimit-Remaining", "RateLimit-Remaining")
+    reset = _header_float(response, "X-RateLimit-Reset")
+    if reset is not None:
+        # GitHub sends an epoch timestamp
+        reset = max(reset - time.time(), 0.0)
+    else:
+        reset = _header_float(response, "RateLimit-Reset")
+    return limit, remaining, reset
+
+
+def _retry_after(response):
+    if response is None:
+        return None
+    return _header_float(response, "Retry-After")
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures -> half-open trial after the cooldown."""
+
+    def __init__(self, host: str, failures: int = CIRCUIT_FAILURES, cooldown: float = CIRCUIT_COOLDOWN):
+        self.host = host
+        self.threshold = max(1, failures)
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at < self.cooldown or self.trial:
+                tracing.count("circuit_skips")
+                raise CircuitOpen(f"Circuit open for {self.host}")
+            # Half-open: let one request through
+            self.trial = True
+
+    def record(self, ok: bool):
+        with self.lock:
+            self.trial = False
+            if ok:
+                self.failures = 0
+                self.opened_at = None
+                return
+            self.failures += 1
+            if self.failures >= self.threshold:
+                if self.opened_at is None:
+                    print(f"  ⚡ Circuit open for {self.host} after {self.failures} failures "
+                          f"(retry in {self.cooldown:.0f}s)")
+                    tracing.count("circuit_opened")
+                self.opened_at = time.monotonic()
+
+
+class HostController:
+    """AIMD concurrency limit and quota pacing for one host."""
+
+    def __init__(self, host: str, max_limit: int = HTTP_MAX_CONCURRENCY):
+        self.host = host
+        self.max_limit = max(1, max_limit)
+        self.limit = 1.0
+        self.in_flight = 0
+        self.interval = 0.0     # spacing between request starts while the quota is low
+        self.not_before = 0.0   # monotonic time the next request may start
+        self.failures = 0
+        self.cond = threading.Condition()
+        self.breaker = CircuitBreaker(host)
+
+    def acquire(self, scope: Scope = None) -> float:
+        """Block until a request may start; returns the seconds blocked (0.0 when a slot was free)."""
+        started = time.monotonic()
+        blocked = False
+        with self.cond:
+            while True:
+                now = time.monotonic()
+                if now + HTTP_MAX_WAIT < self.not_before:
+                    raise RateLimitExceeded(
+                        f"{self.host} rate limited for {self.not_before - now:.0f}s")
+                # Re-read every round: the scope can be expired while we wait
+                left = scope.remaining() if scope else None
+                if left is not None and (left <= 0 or self.not_before - now > left):
+                    raise DeadlineExceeded(f"Deadline passed waiting for {self.host}")
+                if self.in_flight < int(self.limit) and now >= self.not_before:
+                    self.in_flight += 1
+                    self.not_before = max(self.not_before, now) + self.interval
+                    return now - started if blocked else 0.0
+                timeout = self.not_before - now if now < self.not_before else None
+                if left is not None:
+                    timeout = min(timeout if timeout is not None else left, left, 1.0)
+                blocked = True
+                self.cond.wait(timeout)
+
+    def cancel(self):
+        """Give back a slot taken by acquire() without sending the request."""
+        with self.cond:
+            self.in_flight -= 1
+            self.cond.notify_all()
+
+    def release(self, response=None) -> bool:
+        """Feed back a response (None on a connection error); returns True when it should be retried."""
+        with self.cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            status = response.status_code if response is not None else None
+            limit, remaining, reset = _quota(response)
+            exhausted = remaining is not None and remaining <= 0
+            throttled = status is None or status == 429 or status >= 500 or (status == 403 and exhausted)
+
+            if throttled:
+                self.limit = max(1.0, self.limit / 2)
+                self.failures += 1
+                if exhausted and reset is not None:
+                    # The quota comes back at the reset time, not after a backoff
+                    delay = reset
+                else:
+                    delay = _retry_after(response) or min(2.0 ** (self.failures - 1), 60.0)
+                self.not_before = max(self.not_before, now + delay)
+            else:
+                self.failures = 0
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+            if remaining is not None and reset is not None:
+                # This process's part of the account-wide quota and reserve (see set_share)
+                share = _state["share"]
+                own, reserve = remaining / share, (limit or 0) / share * HTTP_QUOTA_RESERVE
+                if own <= reserve:
+                    # Low quota: back off and spread what is left over the window
+                    self.limit = max(1.0, self.limit / 2)
+                    self.interval = reset / max(own, 1.0)
+                else:
+                    self.interval = 0.0
+            self.cond.notify_all()
+            return throttled and response is not None
+
+
+def set_share(processes: int):
+    """
+    Fetch as one of processes concurrent processes: a 1/processes part of
+    each host's concurrency and quota. Drops controllers inherited from the
+    parent process, which were sized for a whole host.
+    """
+    with _controllers_lock:
+        _state["share"] = max(1, int(processes))
+        _controllers.clear()
+
+
+def controller_for(host: str) -> HostController:
+    with _controllers_lock:
+        controller = _controllers.get(host)
+        if controller is None:
+            controller = _controllers[host] = HostController(
+                host, max(1, HTTP_MAX_CONCURRENCY // _state["share"]))
+        return controller
+
+
+def request(method: str, url: str, params: dict = None, headers: dict = None, timeout: float = 10, **kwargs):
+    """
+    requests.request through the host's controller, retrying 429/5xx and
+    exhausted quotas up to HTTP_MAX_RETRIES times (only use it for
+    idempotent calls). Returns the last response; a tracing span per call
+    records host, status, bytes and retries. Raises CircuitOpen or
+    DeadlineExceeded instead of sending the request.
+    """
+    if _state["offline"]:
+        raise RuntimeError(f"Network access is disabled ({method} {url})")
+    parts = urlsplit(url)
+    controller = controller_for(parts.netloc)
+    scope = _scope.get()
+    with tracing.span(f"{method} {parts.netloc}", "http", host=parts.netloc, path=parts.path) as span:
+        for attempt in range(HTTP_MAX_RETRIES + 1):
+            try:
+                waited = controller.acquire(scope)
+                try:
+                    # Checked after waiting: the circuit may have opened meanwhile
+                    controller.breaker.allow()
+                except CircuitOpen:
+                    controller.cancel()
+                    raise
+            except (CircuitOpen, DeadlineExceeded, RateLimitExceeded):
+                if scope:
+                    scope.record(False)
+                raise
+            if waited > 0:
+                tracing.count("rate_limit_waits")
+                tracing.count("rate_limit_wait_seconds", waited)
+            left = scope.remaining() if scope else None
+            request_timeout = timeout if left is None else max(0.1, min(timeout, left))
+            try:
+                response = requests.request(method, url, params=params, headers=headers,
+                                            timeout=request_timeout, **kwargs)
+            except Exception:
+                controller.release(None)
+                controller.breaker.record(False)
+                if scope:
+                    scope.record(False)
+                raise
+            if response.status_code == 429:
+                tracing.count("http_429")
+            # Rate limiting is not a host failure; errors and 5xx are
+            controller.breaker.record(response.status_code < 500)
+            if not controller.release(response) or attempt == HTTP_MAX_RETRIES:
+                break
+            tracing.count("http_retries")
+        if scope:
+            scope.record(response.status_code < 400 or response.status_code == 404)
+        span.set(status=response.status_code, bytes=len(response.content), retries=attempt,
+                 concurrency=int(controller.limit))
+        return response
+
+
+def get(url: str, params: dict = None, headers: dict = None, timeout: float = 10, **kwargs):
+    return request("GET", url, params=params, headers=headers, timeout=timeout, **kwargs)
+
+
+def post(url: str, params: dict = None, headers: dict = None, timeout: float = 10, **kwargs):
+    """POST for idempotent lookups such as batch endpoints; retried like get()."""
+    return request("POST", url, params=params, headers=headers, timeout=timeout, **kwargs)
+
+
+def parallel_map(func, items, workers: int = None) -> list:
+    """func over items on a thread pool, results in input order. The caller's scope carries over."""
+    items = list(items)
+    workers = min(workers or max(1, HTTP_MAX_CONCURRENCY // _state["share"]), len(items))
+    if workers <= 1:
+        return [func(item) for item in items]
+    # One context copy per item: a Context cannot be entered by two threads at once
+    contexts = [contextvars.copy_context() for _ in items]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda pair: pair[0].run(func, pair[1]), zip(contexts, items)))
+
+
+def wait(seconds: float, host: str = None):
+    """Rate-limit sleep, recorded as a span and counters."""
+    if seconds <= 0:
+        return
+    tracing.count("rate_limit_waits")
+    tracing.count("rate_limit_wait_seconds", seconds)
+    with tracing.span("rate limit wait", "wait", host=host, seconds=seconds):
+        time.sleep(seconds)
@@ -1,94 +1,162 @@
-import requests
 import pandas as pd
 import json
-import time
-from ..config import HUGGINGFACE_TOKEN, RATE_LIMIT
+from ..config import HUGGINGFACE_TOKEN, HF_BASE_URL, MODELS_REGISTRY_PATH, HF_BULK, HF_PAGE_SIZE
+from .archive import archived
+from .resilience import guarded
+from .schemas import typed
+from . import http_client
 
-def fetch_hf_downloads():
+# Expanded fields requested from the Hub: rolling 30-day and all-time downloads
+EXPAND = [("expand[]", "downloads"), ("expand[]", "downloadsAllTime")]
+
+@archived("downloads")
+@typed("downloads")
+@guarded("downloads")
+def fetch_hf_downloads(registry=None):
     """
     Fetch real Hugging Face download statistics for models.
     Uses your Hugging Face token for higher rate limits.
+
+    Fetches downloads (last 30 days) and downloads_all_time; @typed checks
+    and keeps both. With HF_BULK, repos are grouped by organization and
+    read from the paged /api/models listing; otherwise each repo is
+    requested on its own.
+    Request pacing is left to http_client's per-host controller.
     """
-    with open('app/models_registry.json', 'r') as f:
-        registry = json.load(f)
-    
+    if registry is None:
+        with open(MODELS_REGISTRY_PATH, 'r') as f:
+            registry = json.load(f)
+
     headers = {}
     if HUGGINGFACE_TOKEN and HUGGINGFACE_TOKEN != "your_huggingface_token_here":
         headers['Authorization'] = f'Bearer {HUGGINGFACE_TOKEN}'
         print("🤗 Using authenticated Hugging Face API")
     else:
         print("⚠️ No Hugging Face token - using unauthenticated (limited)")
-    
+
+    repos = [m.get('hf_repo') for m in registry]
+    repos = [r for r in repos if r and r != "None"]
+    if HF_BULK:
+        stats = fetch_bulk_downloads(repos, headers)
+    else:
+        stats = fetch_each_downloads(repos, headers)
+
     data = []
     for model in registry:
         hf_repo = model.get('hf_repo')
-        model_name = model['name']
-        
-        if hf_repo and hf_repo != "None" and hf_repo is not None:
-            downloads = fetch_repo_downloads(hf_repo, headers)
-            data.append({
-                'model': model_name,
-                'downloads': downloads
-            })
-        else:
-            # No HF repo for this model
-            data.append({
-                'model': model_name,
-                'downloads': 0
-            })
-        
-        # Rate limiting
-        time.sleep(1.0 / RATE_LIMIT)
-    
-    return pd.DataFrame(data)
+        # No HF repo for this model: zero downloads, no request made
+        downloads, all_time = stats.get(hf_repo, (0, 0)) if hf_repo and hf_repo != "None" else (0, 0)
+        data.append({
+            'model': model['name'],
+            'downloads': downloads,
+            'downloads_all_time': all_time
+        })
 
-def fetch_repo_downloads(repo_id: str, headers: dict) -> int:
+    return pd.DataFrame(data, columns=['model', 'downloads', 'downloads_all_time'])
+
+def fetch_bulk_downloads(repos: list, headers: dict) -> dict:
     """
-    Fetch download count for a Hugging Face model.
+    Download counts for many repos from the /api/models listing, one paged
+    walk per organization. Repos the listing does not return (renamed,
+    gated) are fetched one by one. Returns {repo_id: (downloads, all_time)}.
+    """
+    by_org = {}
+    for repo_id in dict.fromkeys(repos):
+        by_org.setdefault(repo_id.split('/')[0], []).append(repo_id)
+
+    stats = {}
+    for org, org_repos in by_org.items():
+        listed = fetch_org_downloads(org, headers)
+        found = 0
+        for repo_id in org_repos:
+            # Hub ids are case-insensitive
+            if repo_id.lower() in listed:
+                stats[repo_id] = listed[repo_id.lower()]
+                found += 1
+        print(f"  ✅ {org}: {found}/{len(org_repos)} repos from {len(listed):,} listed models")
+
+    stats.update(fetch_each_downloads([r for r in repos if r not in stats], headers))
+    return stats
+
+def fetch_each_downloads(repos: list, headers: dict) -> dict:
+    """Per-repo requests, run concurrently under the host's rate-limit controller."""
+    repos = list(dict.fromkeys(repos))
+    return dict(zip(repos, http_client.parallel_map(lambda r: fetch_repo_downloads(r, headers), repos)))
+
+def fetch_org_downloads(org: str, headers: dict) -> dict:
+    """
+    Page through /api/models?author=<org>, following the Link header.
+    Returns {lowercased repo_id: (downloads, all_time)}.
+    """
+    listed = {}
+    url = f"{HF_BASE_URL}/api/models"
+    params = [("author", org), ("limit", HF_PAGE_SIZE)] + EXPAND
+    while url:
+        try:
+            response = http_client.get(url, params=params, headers=headers, timeout=30)
+        except Exception as e:
+            print(f"  Error listing {org}: {e}")
+            break
+        if response.status_code != 200:
+            print(f"  ⚠️ Got status {response.status_code} listing {org}")
+            break
+        for item in response.json():
+            repo_id = item.get('id') or item.get('modelId')
+            if repo_id:
+                listed[repo_id.lower()] = (item.get('downloads', 0), item.get('downloadsAllTime', 0))
+        # The next-page URL already carries the query (cursor included)
+        url, params = response.links.get('next', {}).get('url'), None
+    return listed
+
+def fetch_repo_downloads(repo_id: str, headers: dict) -> tuple:
+    """
+    Fetch download counts for a Hugging Face model.
+    Returns (downloads, all_time).
     """
     try:
         # Hugging Face API endpoint
-        url = f"https://huggingface.co/api/models/{repo_id}"
-        response = requests.get(url, headers=headers, timeout=10)
-        
+        url = f"{HF_BASE_URL}/api/models/{repo_id}"
+        response = http_client.get(url, params=EXPAND, headers=headers, timeout=10)
+
         if response.status_code == 200:
             data = response.json()
-            # Total downloads across all versions
+            # Downloads over the last 30 days, and since creation
             downloads = data.get('downloads', 0)
+            all_time = data.get('downloadsAllTime', 0)
             if downloads > 0:
                 print(f"  ✅ {repo_id}: {downloads:,} downloads")
-            return downloads
+            return downloads, all_time
         elif response.status_code == 401:
             print(f"  ⚠️ Authentication failed for {repo_id} - check token")
-            return 0
+            return 0, 0
         elif response.status_code == 404:
             print(f"  ⚠️ Repo not found: {repo_id}")
-            return 0
+            return 0, 0
         else:
             print(f"  ⚠️ Got status {response.status_code} for {repo_id}")
-            return 0
-            
+            return 0, 0
+
     except Exception as e:
         print(f"  Error fetching {repo_id}: {e}")
-        return 0
+        return 0, 0
 
 def fetch_trending_downloads(limit: int = 30):
     """
     Alternative: Fetch trending models as a backup.
     """
     try:
-        url = "https://huggingface.co/api/trending"
-        response = requests.get(url, timeout=10)
-        
+        url = f"{HF_BASE_URL}/api/trending"
+        response = http_client.get(url, timeout=10)
+
         if response.status_code == 200:
             data = response.json()
             models = []
             downloads = []
-            
+
             for item in data.get('trending', [])[:limit]:
                 models.append(item['repoId'])
                 downloads.append(item.get('downloads', 0))
-            
+
             return pd.DataFrame({
                 'model': models,
                 'downloads': downloads
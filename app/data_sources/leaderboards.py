@@ -0,0 +1,169 @@
+"""
+Bulk benchmark scores from leaderboard dataset files (Parquet or CSV),
+e.g. the Open LLM Leaderboard result dumps.
+
+Each file in BENCHMARK_FILES (local paths or URLs) is read with only the
+columns named in BENCHMARK_FILE_COLUMNS and only the rows whose model
+column matches a registry model (its hf_repo or name, ignoring case):
+
+- Parquet: pyarrow reads the projected columns with the row filter
+  (on the lowercased model column) applied in the scan, from a
+  memory-mapped file.
+- CSV: pandas reads the projected columns from a memory-mapped file in
+  chunks and keeps the matching rows of each chunk.
+
+Downloads are kept in CACHE_DIR for BENCHMARK_FILE_MAX_AGE. The extracted
+scores are cached under the file's SHA-256 (plus the projection and the
+registry names), so an unchanged file is not parsed twice. Scores are
+used as-is, so files should report percentages like Papers with Code.
+"""
+
+import os
+import hashlib
+import pandas as pd
+from urllib.parse import urlsplit
+from ..config import BENCHMARK_FILES, BENCHMARK_FILE_COLUMNS, BENCHMARK_FILE_MAX_AGE, CACHE_DIR
+from ..utils import cache
+from ..utils.snapshot import atomic_write
+from . import http_client
+
+try:
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pc = pq = None
+
+CSV_CHUNK_ROWS = 200_000
+
+
+def parse_columns(spec: str) -> dict:
+    """{"model": file column, metric: file column} from "model=fullname,mmlu=MMLU"."""
+    columns = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        key, _, column = part.partition("=")
+        columns[key.strip()] = column.strip()
+    if "model" not in columns:
+        raise ValueError("BENCHMARK_FILE_COLUMNS needs a model=<column> entry")
+    return columns
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _is_parquet(location: str) -> bool:
+    return urlsplit(location).path.lower().endswith((".parquet", ".pq"))
+
+
+def download(url: str) -> str:
+    """Local copy of a leaderboard file, downloaded at most once per BENCHMARK_FILE_MAX_AGE."""
+    def fetch():
+        response = http_client.get(url, timeout=300)
+        if response.status_code != 200:
+            raise RuntimeError(f"Got status {response.status_code} downloading {url}")
+        extension = os.path.splitext(urlsplit(url).path)[1]
+        path = os.path.join(CACHE_DIR, "leaderboards",
+                            hashlib.sha256(response.content).hexdigest() + extension)
+        atomic_write(path, response.content)
+        print(f"  ⬇️ Downloaded {url} ({len(response.content):,} bytes)")
+        return {"url": url, "path": path}
+
+    key = "leaderboard-url-" + hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+    entry = cache.get_or_fetch(key, fetch, max_age=BENCHMARK_FILE_MAX_AGE)
+    if not os.path.exists(entry["path"]):
+        # The cached download was removed; fetch it again
+        cache.store(key, fetch())
+        entry = cache.load(key)
+    return entry["path"]
+
+
+def registry_keys(registry: list) -> dict:
+    """{lowercased hf_repo or name: registry name}; hf_repo wins when both match."""
+    keys = {}
+    for model in registry:
+        keys.setdefault(str(model["name"]).lower(), str(model["name"]))
+    for model in registry:
+        repo = model.get("hf_repo")
+        if repo and repo != "None":
+            keys[repo.lower()] = str(model["name"])
+    return keys
+
+
+def read_filtered(path: str, columns: list, model_column: str, keys: set) -> pd.DataFrame:
+    """Projected columns of the rows whose model column (lowercased) is in keys."""
+    if _is_parquet(path):
+        if pq is None:
+            raise RuntimeError("pyarrow is required to read Parquet leaderboards")
+        present = set(pq.read_schema(path, memory_map=True).names)
+        wanted = [c for c in columns if c in present]
+        # Lowercased in the scan: files spell repo ids in any case
+        table = pq.read_table(path, columns=wanted, memory_map=True,
+                              filters=pc.utf8_lower(pc.field(model_column)).isin(sorted(keys)))
+        df = table.to_pandas()
+    else:
+        header = pd.read_csv(path, nrows=0).columns
+        wanted = [c for c in columns if c in header]
+        parts = []
+        for chunk in pd.read_csv(path, usecols=wanted, memory_map=True, chunksize=CSV_CHUNK_ROWS,
+                                 dtype={model_column: str}):
+            parts.append(chunk[chunk[model_column].str.lower().isin(keys)])
+        df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=wanted)
+    return df[df[model_column].str.lower().isin(keys)]
+
+
+def extract_scores(path: str, columns: dict, keys: dict) -> dict:
+    """
+    {metric: [[registry name, score], ...]} from one file. Several rows for
+    a model (revisions, precisions) keep its best score per metric.
+    """
+    model_column = columns["model"]
+    metric_columns = {m: c for m, c in columns.items() if m != "model"}
+    df = read_filtered(path, [model_column] + list(metric_columns.values()), model_column, set(keys))
+    df = df.assign(model=df[model_column].str.lower().map(keys))
+
+    scores = {}
+    for metric, column in metric_columns.items():
+        if column not in df.columns:
+            continue
+        values = pd.to_numeric(df[column], errors="coerce")
+        best = values.groupby(df["model"]).max().dropna()
+        scores[metric] = [[name, float(value)] for name, value in sorted(best.items())]
+    return scores
+
+
+def fetch_leaderboard_benchmarks(registry: list, files: str = BENCHMARK_FILES,
+                                 spec: str = BENCHMARK_FILE_COLUMNS) -> dict:
+    """
+    {metric: DataFrame(model, metric)} keyed by registry name, merged over
+    all files (earlier files win). Empty when no files are configured.
+    """
+    columns = parse_columns(spec)
+    keys = registry_keys(registry)
+    # Part of the cache key: a registry change re-filters an unchanged file
+    names_digest = hashlib.sha256("\n".join(sorted(keys)).encode("utf-8")).hexdigest()[:12]
+    spec_digest = hashlib.sha256(spec.encode("utf-8")).hexdigest()[:8]
+
+    merged = {}
+    for location in filter(None, (f.strip() for f in files.split(","))):
+        try:
+            path = download(location) if urlsplit(location).scheme in ("http", "https") else location
+            sha256 = file_sha256(path)
+            key = f"leaderboard-{sha256[:16]}-{spec_digest}-{names_digest}"
+            scores = cache.get_or_fetch(key, lambda: extract_scores(path, columns, keys),
+                                        keep=lambda value: value is not None)
+        except Exception as e:
+            print(f"  ⚠️ Skipping leaderboard {location}: {e}")
+            continue
+        for metric, rows in scores.items():
+            found = merged.setdefault(metric, {})
+            for name, value in rows:
+                found.setdefault(name, value)
+        print(f"  ✅ {os.path.basename(urlsplit(location).path)}: "
+              + ", ".join(f"{len(rows)} {metric}" for metric, rows in scores.items()))
+
+    return {metric: pd.DataFrame(sorted(found.items()), columns=["model", metric])
+            for metric, found in merged.items()}
@@ -1,11 +1,13 @@
-import requests
 import pandas as pd
 import time
 import pickle
 import io
-import os
-import json
-from datetime import datetime, timedelta
+from .archive import archived
+from .resilience import guarded
+from .schemas import typed
+from . import http_client
+from ..config import HF_BASE_URL, ARENA_CACHE_MAX_AGE
+from ..utils import cache
 
 def fetch_arena_scores_internal():
     """
@@ -28,7 +30,7 @@ def fetch_from_lmarena_pkl():
     Fetch the latest Elo results from the PKL files in the LMArena space.
     """
     # Base URL for raw files in the space
-    base_url = "https://huggingface.co/spaces/lmarena-ai/lmarena-leaderboard/resolve/main"
+    base_url = f"{HF_BASE_URL}/spaces/lmarena-ai/lmarena-leaderboard/resolve/main"
     
     # List of recent PKL files (you can update this list periodically)
     pkl_files = [
@@ -54,7 +56,7 @@ def fetch_from_lmarena_pkl():
             print(f"  Trying PKL: {pkl_file}")
             
             # Download the PKL file
-            response = requests.get(url, timeout=10)
+            response = http_client.get(url, timeout=10)
             if response.status_code == 200:
                 # Load the pickle data
                 pkl_data = pickle.loads(response.content)
@@ -109,10 +111,12 @@ def fetch_from_lmarena_pkl():
                 print(f"  ⚠️ Unknown PKL structure, trying to convert...")
                 # Try to convert to DataFrame directly
                 df = pd.DataFrame(pkl_data)
-                if len(df.columns) >= 2:
-                    # Use first two columns
-                    df = df.iloc[:, [0, 1]].rename(
-                        columns={df.columns[0]: 'model', df.columns[1]: 'elo'}
+                names = {str(col).lower(): col for col in df.columns}
+                model_col = next((names[c] for c in ('model', 'name') if c in names), None)
+                score_col = next((names[c] for c in ('elo', 'rating', 'score') if c in names), None)
+                if model_col is not None and score_col is not None:
+                    df = df[[model_col, score_col]].rename(
+                        columns={model_col: 'model', score_col: 'elo'}
                     )
                     print(f"  ✅ Success! Found {len(df)} models")
                     return df
@@ -128,10 +132,12 @@ def fetch_from_csv_fallback():
     """
     Fallback: Try to fetch from CSV if available.
     """
-    csv_url = "https://huggingface.co/spaces/lmarena-ai/lmarena-leaderboard/raw/main/arena_hard_auto_leaderboard_v0.1.csv"
+    csv_url = f"{HF_BASE_URL}/spaces/lmarena-ai/lmarena-leaderboard/raw/main/arena_hard_auto_leaderboard_v0.1.csv"
     try:
         print(f"  Trying CSV fallback...")
-        df = pd.read_csv(csv_url)
+        response = http_client.get(csv_url, timeout=10)
+        response.raise_for_status()
+        df = pd.read_csv(io.StringIO(response.text))
         
         # Try to identify model and score columns
         for col in df.columns:
@@ -155,11 +161,11 @@ def fetch_from_lmarena_webpage():
     """
     Last resort: Try to scrape the webpage.
     """
-    url = "https://huggingface.co/spaces/lmarena-ai/lmarena-leaderboard"
+    url = f"{HF_BASE_URL}/spaces/lmarena-ai/lmarena-leaderboard"
     headers = {'User-Agent': 'Mozilla/5.0'}
     
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = http_client.get(url, headers=headers, timeout=10)
         # The actual data is likely loaded via JavaScript, so scraping may not work
         # This is a placeholder for completeness
         pass
@@ -168,40 +174,24 @@ def fetch_from_lmarena_webpage():
     
     raise Exception("Webpage scraping not implemented - PKL files are the primary source")
 
+@archived("arena")
+@typed("arena")
+@guarded("arena")
 def fetch_arena_scores():
     """
-    Public function with caching.
+    Public function with caching: one fetch per ARENA_CACHE_MAX_AGE for
+    every engine process on the host (see app.utils.cache).
     """
-    cache_file = "cache/arena_scores.json"
-    os.makedirs("cache", exist_ok=True)
-    
-    # Check cache (6 hours)
-    if os.path.exists(cache_file):
-        try:
-            with open(cache_file, 'r') as f:
-                cache = json.load(f)
-            cache_time = datetime.fromisoformat(cache['timestamp'])
-            if datetime.now() - cache_time < timedelta(hours=6):
-                print("📦 Using cached arena scores")
-                return pd.DataFrame(cache['data'])
-        except Exception as e:
-            print(f"Cache read failed: {e}")
-    
-    # Fetch fresh data
-    print("🌐 Fetching fresh arena scores from LMArena PKL files...")
-    df = fetch_arena_scores_internal()
-    
-    # Save to cache if we got data
-    if not df.empty:
-        try:
-            cache = {
-                'timestamp': datetime.now().isoformat(),
-                'data': df.to_dict('records')
-            }
-            with open(cache_file, 'w') as f:
-                json.dump(cache, f, indent=2)
-            print(f"💾 Cached {len(df)} model scores")
-        except Exception as e:
-            print(f"Cache write failed: {e}")
-    
-    return df
+    fetched = []
+
+    def fetch():
+        fetched.append(True)
+        print("🌐 Fetching fresh arena scores from LMArena PKL files...")
+        return fetch_arena_scores_internal().to_dict('records')
+
+    records = cache.get_or_fetch("arena_scores", fetch, max_age=ARENA_CACHE_MAX_AGE)
+    if not fetched:
+        print("📦 Using cached arena scores")
+    elif records:
+        print(f"💾 Cached {len(records)} model scores")
+    return pd.DataFrame(records, columns=None if records else ['model', 'elo'])
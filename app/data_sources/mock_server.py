@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the upstream APIs the data sources call.
+
+Emulates Hugging Face (/api/models listing and /api/models/{id}, LMArena
+Space PKL/CSV files, an Open LLM Leaderboard style CSV dataset),
+GitHub (/repos/{r}, /repos/{r}/commits), Semantic Scholar
+(/graph/v1/paper/*, POST /graph/v1/paper/batch) and Papers with Code (/sota/{slug}) with
+deterministic fixture data generated from a registry of any size,
+configurable latency and rate limiting.
+
+    python -m app.data_sources.mock_server --port 8900 --models 10000 \\
+        --write-registry /tmp/registry.json --latency lognormal:-3,0.5 --rate-limit 50
+
+Then run the engine with every base URL pointed at the server, e.g.
+HF_BASE_URL=http://127.0.0.1:8900 GITHUB_API_URL=http://127.0.0.1:8900 ...
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import time
+import pickle
+import random
+import hashlib
+import argparse
+import threading
+from urllib.parse import urlsplit, parse_qs, unquote, urlencode
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.config import MODELS_REGISTRY_PATH
+
+PWC_SLUGS = {
+    "multi-task-language-understanding-on-mmlu": "mmlu",
+    "arithmetic-reasoning-on-gsm8k": "gsm8k",
+    "code-generation-on-humaneval": "humaneval",
+}
+ORGS = ["meta-llama", "mistralai", "Qwen", "deepseek-ai", "google", "microsoft",
+        "01-ai", "zai-org", "MiniMaxAI", "moonshotai"]
+
+
+def synthetic_registry(n: int, seed: int = 42) -> list:
+    """A registry of n models shaped like app/models_registry.json."""
+    rng = random.Random(seed)
+    registry = []
+    for i in range(n):
+        org = ORGS[i % len(ORGS)]
+        name = f"model-{i}"
+        registry.append({
+            "name": name,
+            "tier": rng.choices("ABC", weights=[1, 3, 6])[0],
+            "arena_id": name,
+            "hf_repo": f"{org}/{name}" if rng.random() < 0.6 else None,
+            "github_repo": f"{org}/{name}-src" if rng.random() < 0.5 else None,
+            "paper_id": f"arxiv:24{i % 12 + 1:02d}.{i % 100000:05d}" if rng.random() < 0.3 else None,
+        })
+    return registry
+
+
+class Fixtures:
+    """Deterministic upstream data derived from a registry and a seed."""
+
+    def __init__(self, registry: list, seed: int = 42):
+        self.seed = seed
+        self.registry = registry
+        self.hf = {}
+        self.github = {}
+        self.papers = {}
+        self.search = {}
+        for model in registry:
+            name = model["name"]
+            if model.get("hf_repo"):
+                self.hf[model["hf_repo"]] = {
+                    "id": model["hf_repo"],
+                    "author": model["hf_repo"].split("/")[0],
+                    "downloads": int(10 ** (2 + 5 * self._rand("dl", name))),
+                    "downloadsAllTime": int(10 ** (4 + 5 * self._rand("dla", name))),
+                }
+            if model.get("github_repo"):
+                repo = model["github_repo"]
+                self.github[repo.lower()] = {
+                    "full_name": repo,
+                    "stargazers_count": int(10 ** (1 + 4 * self._rand("stars", repo))),
+                    "forks_count": int(10 ** (1 + 3 * self._rand("forks", repo))),
+                    "open_issues_count": int(200 * self._rand("issues", repo)),
+                    "commits_30d": int(100 * self._rand("commits", repo)),
+                }
+            paper = self._paper(name)
+            self.search[name.lower()] = paper
+            self.papers[paper["paperId"]] = paper
+            if model.get("paper_id", "") and model["paper_id"].startswith("arxiv:"):
+                arxiv = model["paper_id"].replace("arxiv:", "")
+                self.papers[f"arXiv:{arxiv}"] = paper
+
+        self.arena = {
+            "models": [m.get("arena_id") or m["name"] for m in registry],
+            "elo": [round(1000 + 400 * self._rand("elo", m["name"]), 2) for m in registry],
+        }
+        self.leaderboards = {}
+        for slug, metric in PWC_SLUGS.items():
+            scored = sorted(
+                ((round(40 + 60 * self._rand(metric, m["name"]), 1), m["name"]) for m in registry),
+                reverse=True,
+            )
+            self.leaderboards[slug] = scored[:20]
+
+    def leaderboard_csv(self) -> str:
+        """Full benchmark table by HF repo, plus fine-tunes outside the registry."""
+        rows = ["fullname,MMLU,GSM8K,HumanEval"]
+        for model in self.registry:
+            if not model.get("hf_repo"):
+                continue
+            # Registry repos score like their Papers with Code rows
+            fine_tune = f"community/{model['hf_repo'].split('/')[-1]}-ft"
+            for repo, key in ((model["hf_repo"], model["name"]), (fine_tune, fine_tune)):
+                scores = [round(40 + 60 * self._rand(metric, key), 1) for metric in PWC_SLUGS.values()]
+                rows.append(",".join([repo] + [str(v) for v in scores]))
+        return "\n".join(rows) + "\n"
+
+    def _rand(self, *key) -> float:
+        digest = hashlib.sha256(":".join(map(str, (self.seed,) + key)).encode()).digest()
+        return int.from_bytes(digest[:8], "big") / 2**64
+
+    def _paper(self, name: str) -> dict:
+        return {
+            "paperId": hashlib.sha1(f"{self.seed}:{name}".encode()).hexdigest(),
+            "title": f"{name}: Technical Report",
+            "year": 2020 + int(6 * self._rand("year", name)),
+            "citationCount": int(10 ** (4 * self._rand("cites", name))),
+        }
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> float:
+        """Returns 0 if a token was taken, else seconds until one is available."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+
+class QuotaWindow:
+    """GitHub-style fixed window quota with X-RateLimit-* headers."""
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self.reset_at = time.time() + window
+        self.used = 0
+        self.lock = threading.Lock()
+
+    def take(self, limit: int):
+        with self.lock:
+            now = time.time()
+            if now >= self.reset_at:
+                self.reset_at = now + self.window
+                self.used = 0
+            allowed = self.used < limit
+            if allowed:
+                self.used += 1
+            return allowed, max(0, limit - self.used), int(math.ceil(self.reset_at))
+
+
+def parse_latency(spec: str):
+    """none | fixed:S | uniform:A,B | lognormal:MU,SIGMA (seconds)."""
+    if not spec or spec == "none":
+        return lambda rng: 0.0
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v]
+    if kind == "fixed":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(values[0], values[1])
+    raise ValueError(f"Unknown latency spec: {spec}")
+
+
+class MockAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server_version = "AIGI-Mock-API/1.0"
+
+    routes = []
+    post_routes = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, str(value))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.record(self.family, status)
+
+    def _json(self, status: int, payload, headers=None):
+        self._send(status, json.dumps(payload).encode("utf-8"), headers=headers)
+
+    def do_GET(self):
+        self._dispatch(self.routes)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            self.body = json.loads(self.rfile.read(length) or b"null")
+        except ValueError:
+            self.family = "unknown"
+            self._json(400, {"error": "Invalid JSON body"})
+            return
+        self._dispatch(self.post_routes)
+
+    def _dispatch(self, routes):
+        parts = urlsplit(self.path)
+        path = unquote(parts.path)
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        if path == "/__stats":
+            self.family = "stats"
+            self._json(200, self.server.stats())
+            return
+
+        for pattern, family, method in routes:
+            match = pattern.match(path)
+            if match:
+                self.family = family
+                break
+        else:
+            self.family = "unknown"
+            self._json(404, {"error": "Not Found"})
+            return
+
+        delay = self.server.latency()
+        if delay > 0:
+            time.sleep(delay)
+
+        headers = {}
+        if family == "github":
+            limit = self.server.github_auth_quota if self.headers.get("Authorization") else self.server.github_quota
+            allowed, remaining, reset = self.server.github_window.take(limit)
+            headers = {"X-RateLimit-Limit": limit, "X-RateLimit-Remaining": remaining,
+                       "X-RateLimit-Reset": reset}
+            if not allowed:
+                self._json(403, {"message": "API rate limit exceeded"}, headers)
+                return
+        else:
+            bucket = self.server.buckets.get(family)
+            wait = bucket.take() if bucket else 0.0
+            if wait > 0:
+                self._json(429, {"error": "Too Many Requests"}, {"Retry-After": int(math.ceil(wait))})
+                return
+
+        getattr(self, method)(match, query, headers)
+
+    # -- Hugging Face -------------------------------------------------
+
+    def hf_model(self, match, query, headers):
+        model = self.server.fixtures.hf.get(match["repo"])
+        if model is None:
+            self._json(404, {"error": "Repository not found"})
+        else:
+            self._json(200, model, headers)
+
+    def hf_list(self, match, query, headers):
+        # Paged like the Hub: an opaque cursor in the query, the next page in the Link header
+        params = parse_qs(urlsplit(self.path).query)
+        expand = params.get("expand[]") or ["downloads"]
+        author = query.get("author")
+        models = [m for _, m in sorted(self.server.fixtures.hf.items())
+                  if author is None or m["author"] == author]
+        limit = max(1, min(int(query.get("limit", 1000)), 1000))
+        start = int(query.get("cursor", 0))
+        page = [{"id": m["id"], **{k: m[k] for k in expand if k in m}}
+                for m in models[start:start + limit]]
+        if start + limit < len(models):
+            params["cursor"] = [str(start + limit)]
+            next_url = f"{self.server.base_url}/api/models?{urlencode(params, doseq=True)}"
+            headers = {**headers, "Link": f'<{next_url}>; rel="next"'}
+        self._json(200, page, headers)
+
+    def arena_pkl(self, match, query, headers):
+        self._send(200, pickle.dumps(self.server.fixtures.arena), "application/octet-stream", headers)
+
+    def arena_csv(self, match, query, headers):
+        arena = self.server.fixtures.arena
+        rows = ["model,elo"] + [f"{m},{e}" for m, e in zip(arena["models"], arena["elo"])]
+        self._send(200, ("\n".join(rows) + "\n").encode("utf-8"), "text/csv", headers)
+
+    def leaderboard_csv(self, match, query, headers):
+        self._send(200, self.server.fixtures.leaderboard_csv().encode("utf-8"), "text/csv", headers)
+
+    # -- GitHub -------------------------------------------------------
+
+    def github_repo(self, match, query, headers):
+        repo = self.server.fixtures.github.get(match["repo"].lower())
+        if repo is None:
+            self._json(404, {"message": "Not Found"}, headers)
+            return
+        self._json(200, {k: v for k, v in repo.items() if k != "commits_30d"}, headers)
+
+    def github_commits(self, match, query, headers):
+        repo = self.server.fixtures.github.get(match["repo"].lower())
+        if repo is None:
+            self._json(404, {"message": "Not Found"}, headers)
+            return
+        per_page = int(query.get("per_page", 30))
+        count = min(per_page, repo["commits_30d"])
+        self._json(200, [{"sha": f"{i:040x}"} for i in range(count)], headers)
+
+    # -- Semantic Scholar ---------------------------------------------
+
+    def s2_search(self, match, query, headers):
+        paper = self.server.fixtures.search.get(query.get("query", "").lower())
+        self._json(200, {"total": int(paper is not None), "data": [paper] if paper else []}, headers)
+
+    def s2_batch(self, match, query, headers):
+        ids = (self.body or {}).get("ids") if isinstance(self.body, dict) else None
+        if not isinstance(ids, list) or len(ids) > 500:
+            self._json(400, {"error": "ids must be a list of at most 500 paper ids"}, headers)
+            return
+        self._json(200, [self.server.fixtures.papers.get(i) for i in ids], headers)
+
+    def s2_paper(self, match, query, headers):
+        paper = self.server.fixtures.papers.get(match["paper"])
+        if paper is None:
+            self._json(404, {"error": "Paper not found"}, headers)
+        else:
+            self._json(200, paper, headers)
+
+    # -- Papers with Code ---------------------------------------------
+
+    def pwc_sota(self, match, query, headers):
+        board = self.server.fixtures.leaderboards.get(match["slug"])
+        if board is None:
+            self._send(404, b"<html><body>Not found</body></html>", "text/html", headers)
+            return
+        rows = "".join(
+            f"<tr><td>{rank}</td><td>{name}</td><td>{score}</td></tr>"
+            for rank, (score, name) in enumerate(board, start=1)
+        )
+        html = (f"<html><body><table class=\"table\"><tr><th>Rank</th><th>Model</th>"
+                f"<th>Score</th></tr>{rows}</table></body></html>")
+        self._send(200, html.encode("utf-8"), "text/html", headers)
+
+
+MockAPIHandler.routes = [
+    (re.compile(r"^/api/models$"), "hf", "hf_list"),
+    (re.compile(r"^/api/models/(?P<repo>[^/]+/[^/]+)$"), "hf", "hf_model"),
+    (re.compile(r"^/spaces/lmarena-ai/lmarena-leaderboard/resolve/main/(?P<file>[^/]+\.pkl)$"), "hf", "arena_pkl"),
+    (re.compile(r"^/spaces/lmarena-ai/lmarena-leaderboard/raw/main/(?P<file>[^/]+\.csv)$"), "hf", "arena_csv"),
+    (re.compile(r"^/datasets/open-llm-leaderboard/contents/resolve/main/(?P<file>[^/]+\.csv)$"), "hf", "leaderboard_csv"),
+    (re.compile(r"^/repos/(?P<repo>[^/]+/[^/]+)/commits$"), "github", "github_commits"),
+    (re.compile(r"^/repos/(?P<repo>[^/]+/[^/]+)$"), "github", "github_repo"),
+    (re.compile(r"^/graph/v1/paper/search$"), "s2", "s2_search"),
+    (re.compile(r"^/graph/v1/paper/(?P<paper>[^/]+)$"), "s2", "s2_paper"),
+    (re.compile(r"^/sota/(?P<slug>[^/]+)$"), "pwc", "pwc_sota"),
+]
+MockAPIHandler.post_routes = [
+    (re.compile(r"^/graph/v1/paper/batch$"), "s2", "s2_batch"),
+]
+
+
+class MockAPIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, fixtures: Fixtures, latency: str = "none", rate_limit: float = 0,
+                 burst: float = None, github_quota: int = 60, github_auth_quota: int = 5000,
+                 github_window: float = 3600, seed: int = 42):
+        super().__init__(address, MockAPIHandler)
+        self.fixtures = fixtures
+        self._latency = parse_latency(latency)
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.buckets = {}
+        if rate_limit > 0:
+            for family in ("hf", "s2", "pwc"):
+                self.buckets[family] = TokenBucket(rate_limit, burst or rate_limit)
+        self.github_quota = github_quota
+        self.github_auth_quota = github_auth_quota
+        self.github_window = QuotaWindow(github_quota, github_window)
+        self._counts = {}
+        self._counts_lock = threading.Lock()
+        self.started = time.monotonic()
+
+    def latency(self) -> float:
+        with self._rng_lock:
+            return self._latency(self._rng)
+
+    def record(self, family: str, status: int):
+        with self._counts_lock:
+            key = f"{family} {status}"
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+    def stats(self) -> dict:
+        with self._counts_lock:
+            counts = dict(sorted(self._counts.items()))
+        total = sum(v for k, v in counts.items() if not k.startswith("stats"))
+        elapsed = time.monotonic() - self.started
+        return {"requests": total, "elapsed_seconds": round(elapsed, 3),
+                "requests_per_second": round(total / elapsed, 2) if elapsed else 0.0,
+                "by_status": counts}
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the upstream data APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--registry", default=None, help="Registry to derive fixtures from")
+    parser.add_argument("--models", type=int, default=None, help="Generate a synthetic registry of N models")
+    parser.add_argument("--write-registry", default=None, help="Write the registry used to this path")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency", default="none", help="none | fixed:S | uniform:A,B | lognormal:MU,SIGMA")
+    parser.add_argument("--rate-limit", type=float, default=0, help="Requests/sec per API before 429 (0 = off)")
+    parser.add_argument("--burst", type=float, default=None)
+    parser.add_argument("--github-quota", type=int, default=60)
+    parser.add_argument("--github-auth-quota", type=int, default=5000)
+    parser.add_argument("--github-window", type=float, default=3600)
+    args = parser.parse_args()
+
+    if args.models:
+        registry = synthetic_registry(args.models, args.seed)
+    else:
+        with open(args.registry or MODELS_REGISTRY_PATH, "r") as f:
+            registry = json.load(f)
+    if args.write_registry:
+        with open(args.write_registry, "w") as f:
+            json.dump(registry, f, indent=2)
+
+    server = MockAPIServer((args.host, args.port), Fixtures(registry, args.seed), args.latency,
+                           args.rate_limit, args.burst, args.github_quota, args.github_auth_quota,
+                           args.github_window, args.seed)
+    url = server.base_url
+    print(f"🧪 Mock APIs for {len(registry):,} models on {url}")
+    print(f"   HF_BASE_URL={url} GITHUB_API_URL={url} SEMANTIC_SCHOLAR_API_URL={url} PWC_BASE_URL={url}")
+    if args.write_registry:
+        print(f"   MODELS_REGISTRY_PATH={args.write_registry}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(server.stats(), indent=2))
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
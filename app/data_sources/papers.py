@@ -0,0 +1,129 @@
+"""
+Persistent model -> Semantic Scholar paper resolution cache.
+
+Models without an arXiv paper_id used to be resolved with a full-text
+/paper/search on every run. Resolutions are now kept in PAPER_CACHE_PATH:
+
+    {"gpt-4-turbo": {"paper_id": "...", "title": "...", "confidence": 0.67,
+                     "source": "search", "resolved_at": "2026-04-01T00:00:00Z"}}
+
+A model is only searched again when it has no entry, its confidence is
+below PAPER_MIN_CONFIDENCE, or it was invalidated (`aigi papers
+invalidate`). A search that found nothing is cached with paper_id null
+and trusted for PAPER_NEGATIVE_MAX_AGE. Registry arXiv ids can be written in up front with
+`aigi papers seed`; they always take precedence over the cache.
+"""
+
+import os
+import re
+import json
+from datetime import datetime
+from ..config import PAPER_CACHE_PATH, PAPER_MIN_CONFIDENCE, PAPER_NEGATIVE_MAX_AGE
+from ..utils.cache import locked as cache_lock
+from ..utils.snapshot import atomic_write
+
+
+def load_cache(path: str = PAPER_CACHE_PATH) -> dict:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"  ⚠️ Unreadable paper cache {path}: {e}")
+        return {}
+
+
+def save_cache(entries: dict, path: str = PAPER_CACHE_PATH):
+    """
+    Merge entries into the cache file, re-reading it under the file lock
+    so concurrent runs keep each other's resolutions.
+    """
+    with cache_lock(path):
+        cache = load_cache(path)
+        cache.update(entries)
+        atomic_write(path, json.dumps(dict(sorted(cache.items())), indent=2).encode("utf-8"))
+
+
+def registry_paper_id(model: dict):
+    """S2 id for a registry entry's paper_id ("arxiv:2303.08774" -> "arXiv:2303.08774"), or None."""
+    paper_id = model.get("paper_id")
+    if not paper_id or paper_id == "None":
+        return None
+    if paper_id.startswith("arxiv:"):
+        return "arXiv:" + paper_id[len("arxiv:"):]
+    return paper_id
+
+
+def needs_search(entry: dict) -> bool:
+    if not entry:
+        return True
+    if entry.get("paper_id") is None:
+        # No paper found: searched again once the entry is older than PAPER_NEGATIVE_MAX_AGE
+        try:
+            resolved = datetime.fromisoformat(entry["resolved_at"].rstrip("Z"))
+        except (KeyError, TypeError, ValueError):
+            return True
+        return (datetime.utcnow() - resolved).total_seconds() > PAPER_NEGATIVE_MAX_AGE
+    return entry.get("confidence", 0.0) < PAPER_MIN_CONFIDENCE
+
+
+def _tokens(text: str) -> list:
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def match_confidence(name: str, title: str) -> float:
+    """
+    How well a paper title matches a model name: 1.0 when the name appears
+    in the title ignoring case and punctuation, otherwise the share of name
+    tokens found in the title.
+    """
+    name_tokens, title_tokens = _tokens(name), _tokens(title or "")
+    if not name_tokens:
+        return 0.0
+    if "".join(name_tokens) in "".join(title_tokens):
+        return 1.0
+    found = sum(1 for t in name_tokens if t in title_tokens)
+    return round(found / len(name_tokens), 2)
+
+
+def make_entry(paper_id, title: str = None, confidence: float = 0.0, source: str = "search") -> dict:
+    return {
+        "paper_id": paper_id,
+        "title": title,
+        "confidence": confidence,
+        "source": source,
+        "resolved_at": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+def seed_from_registry(registry: list, path: str = PAPER_CACHE_PATH) -> int:
+    """Write registry paper ids into the cache; returns the number of entries written."""
+    entries = {}
+    for model in registry:
+        paper_id = registry_paper_id(model)
+        if paper_id:
+            entries[model["name"]] = make_entry(paper_id, confidence=1.0, source="registry")
+    if entries:
+        save_cache(entries, path)
+    return len(entries)
+
+
+def invalidate(names: list = None, below: float = None, path: str = PAPER_CACHE_PATH) -> list:
+    """
+    Drop entries so they are searched again: the given names, every entry
+    under a confidence threshold, or (neither given) the whole cache.
+    Returns the names removed.
+    """
+    with cache_lock(path):
+        cache = load_cache(path)
+        if names:
+            removed = [n for n in names if n in cache]
+        elif below is not None:
+            removed = [n for n, e in cache.items() if e.get("confidence", 0.0) < below]
+        else:
+            removed = list(cache)
+        for name in removed:
+            del cache[name]
+        atomic_write(path, json.dumps(cache, indent=2).encode("utf-8"))
+    return removed
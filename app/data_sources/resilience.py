@@ -0,0 +1,314 @@
+"""
+Source deadlines, last-known-good fallback and the epoch time budget.
+
+@guarded(source) runs a fetch_* in a worker thread under a deadline
+(SOURCE_DEADLINE, capped by the epoch budget minus EPOCH_RESERVE). A
+result is good unless the fetch raised, every request it made failed, or
+it returned an empty frame after making requests. Good results are kept
+in LAST_GOOD_DIR. When a source misses its deadline or fails, its last
+good value is used instead and the source is listed under stale_sources
+in the snapshot with the age of that value. A fetch that misses its
+deadline keeps running in the background until the epoch run ends and
+refreshes the last good value if it completes.
+
+A good result from a fetch where some requests failed is degraded: the
+fetchers leave the models they could not read out, those are filled in
+from the last good value, and the source is listed with its
+failed_requests count.
+
+Stack @guarded under @archived, so the archive records the values that
+were actually scored and replays reproduce the snapshot.
+"""
+
+import os
+import gzip
+import json
+import time
+import functools
+import threading
+import pandas as pd
+from datetime import datetime
+
+from ..config import SOURCE_DEADLINE, EPOCH_DEADLINE, EPOCH_RESERVE, LAST_GOOD_DIR
+from ..utils import tracing
+from ..utils.snapshot import atomic_write
+from . import archive, http_client, schemas
+
+_epoch = {"deadline": None, "watchdog": None}
+_stale = {}
+_late = []  # scopes of fetches still running past their deadline
+_lock = threading.Lock()
+
+
+def begin_epoch(budget: float = EPOCH_DEADLINE):
+    """
+    Start the epoch clock. With a budget (seconds), source deadlines are
+    capped by it and the process exits with status 124 if the run is
+    still going when it expires.
+    """
+    end_epoch()
+    schemas.reset()
+    with _lock:
+        _stale.clear()
+    _epoch["deadline"] = time.time() + budget if budget > 0 else None
+    if budget > 0:
+        watchdog = threading.Timer(budget, _expired, args=(budget,))
+        watchdog.daemon = True
+        watchdog.start()
+        _epoch["watchdog"] = watchdog
+
+
+def end_epoch():
+    """Stop the watchdog and let fetches still running in the background wind down."""
+    if _epoch["watchdog"] is not None:
+        _epoch["watchdog"].cancel()
+        _epoch["watchdog"] = None
+    with _lock:
+        late, _late[:] = list(_late), []
+    for scope in late:
+        scope.expire()
+
+
+def _expired(budget: float):
+    print(f"\n❌ Epoch run exceeded its {budget:.0f}s budget, aborting", flush=True)
+    try:
+        tracing.export()
+    finally:
+        os._exit(124)
+
+
+def remaining(default: float = None):
+    """Seconds left in the epoch budget, capped at default (default when unbounded)."""
+    if _epoch["deadline"] is None:
+        return default
+    left = max(_epoch["deadline"] - time.time(), 0.0)
+    return left if default is None else min(left, default)
+
+
+def source_deadline():
+    """Wall-clock deadline for a source starting now, or None."""
+    deadline = time.time() + SOURCE_DEADLINE if SOURCE_DEADLINE > 0 else None
+    if _epoch["deadline"] is not None:
+        fetch_end = _epoch["deadline"] - EPOCH_RESERVE
+        deadline = fetch_end if deadline is None else min(deadline, fetch_end)
+    return deadline
+
+
+# -- Last known good values ----------------------------------------------
+
+def _last_good_path(name: str) -> str:
+    return os.path.join(LAST_GOOD_DIR, f"{name}.json.gz")
+
+
+def save_last_good(name: str, value):
+    body = json.dumps({
+        "name": name,
+        "fetched_at": datetime.utcnow().isoformat() + "Z",
+        "epoch_id": archive.get_settings()[1],
+        "payload": archive.encode_payload(value),
+    }, default=str).encode("utf-8")
+    atomic_write(_last_good_path(name), gzip.compress(body, mtime=0))
+
+
+def load_last_good(name: str):
+    """(value, entry without payload) or None."""
+    path = _last_good_path(name)
+    if not os.path.exists(path):
+        return None
+    try:
+        with gzip.open(path, "rb") as f:
+            entry = json.loads(f.read())
+        value = archive.decode_payload(entry.pop("payload"))
+    except Exception as e:
+        print(f"  ⚠️ Unreadable last known good value {path}: {e}")
+        return None
+    return value, entry
+
+
+# -- Stale source metadata ------------------------------------------------
+
+def stale_sources() -> dict:
+    """Sources scored from fallbacks in this run (in replay: as recorded in the archive index)."""
+    if archive.get_mode() == "replay":
+        try:
+            return archive.load_index().get("stale_sources", {})
+        except FileNotFoundError:
+            return {}
+    with _lock:
+        return dict(sorted(_stale.items()))
+
+
+def add_stale(entries: dict):
+    """Include stale sources reported by worker processes."""
+    with _lock:
+        _stale.update(entries)
+
+
+def snapshot_fields() -> dict:
+    """Extra snapshot fields; empty when every source was fresh."""
+    stale = stale_sources()
+    return {"stale_sources": stale} if stale else {}
+
+
+# -- Guard ----------------------------------------------------------------
+
+def _is_good(value, scope) -> bool:
+    if scope.failed and not scope.ok:
+        return False
+    if isinstance(value, pd.DataFrame) and value.empty and (scope.ok or scope.failed):
+        return False
+    return True
+
+
+def _split(key: str, parts, value) -> list:
+    """[(name, fresh value or None)] for a source or each part of a multi-frame source."""
+    if not parts:
+        return [(key, value)]
+    value = value if isinstance(value, dict) else {}
+    return [(f"{key}.{part}", value.get(part)) for part in parts]
+
+
+def _join(parts, resolved: list):
+    if not parts:
+        return resolved[0]
+    return dict(zip(parts, resolved))
+
+
+def _fill(fresh, fallback):
+    """fresh plus the rows of fallback for models fresh has none for; (value, rows filled)."""
+    if not (isinstance(fresh, pd.DataFrame) and isinstance(fallback, pd.DataFrame)
+            and "model" in fresh.columns and "model" in fallback.columns):
+        return fresh, 0
+    missing = fallback[~fallback["model"].isin(fresh["model"])]
+    if missing.empty:
+        return fresh, 0
+    missing = missing[fresh.columns.intersection(missing.columns)]
+    return pd.concat([fresh, missing], ignore_index=True), len(missing)
+
+
+def _degraded(name: str, fresh, failed: int):
+    """A result with failed requests: fresh rows win, missing models come from the last good value."""
+    fallback = load_last_good(name)
+    tracing.count("degraded_sources")
+    entry = {"reason": f"{failed} failed request(s)", "failed_requests": failed,
+             "fetched_at": None, "epoch_id": None, "age_seconds": None, "filled_models": 0}
+    value = fresh
+    if fallback is not None:
+        old, meta = fallback
+        value, filled = _fill(fresh, old)
+        fetched = datetime.fromisoformat(meta["fetched_at"].rstrip("Z"))
+        entry.update(fetched_at=meta["fetched_at"], epoch_id=meta.get("epoch_id"),
+                     age_seconds=round((datetime.utcnow() - fetched).total_seconds(), 1),
+                     filled_models=filled)
+    print(f"  ♻️ {name}: {failed} failed request(s), {entry['filled_models']} model(s) "
+          f"filled from the last known good value")
+    try:
+        # Fresh where the fetch succeeded, never values the fetch made up
+        save_last_good(name, value)
+    except Exception as e:
+        print(f"  ⚠️ Could not save last known good {name}: {e}")
+    with _lock:
+        _stale[name] = entry
+    return value
+
+
+def _resolve(name: str, fresh, good: bool, reason: str, failed: int = 0):
+    if good and failed:
+        return _degraded(name, fresh, failed)
+    if good:
+        # A long-running process (the scheduler) may have used a fallback before
+        with _lock:
+            _stale.pop(name, None)
+        try:
+            save_last_good(name, fresh)
+        except Exception as e:
+            print(f"  ⚠️ Could not save last known good {name}: {e}")
+        return fresh
+
+    fallback = load_last_good(name)
+    tracing.count("stale_sources")
+    if fallback is None:
+        print(f"  ⚠️ {name}: {reason}, no last known good value")
+        entry = {"reason": reason, "fetched_at": None, "epoch_id": None, "age_seconds": None}
+        value = fresh if fresh is not None else pd.DataFrame(columns=["model", name.split(".")[-1]])
+    else:
+        value, meta = fallback
+        fetched = datetime.fromisoformat(meta["fetched_at"].rstrip("Z"))
+        age = round((datetime.utcnow() - fetched).total_seconds(), 1)
+        print(f"  ♻️ {name}: {reason}, using values from {meta['fetched_at']} ({age / 3600:.1f}h old)")
+        entry = {"reason": reason, "fetched_at": meta["fetched_at"],
+                 "epoch_id": meta.get("epoch_id"), "age_seconds": age}
+    with _lock:
+        _stale[name] = entry
+    return value
+
+
+def _revalidated(key: str, parts, value, scope):
+    """A fetch that missed its deadline finished: refresh the last good values."""
+    refreshed = 0
+    for name, fresh in _split(key, parts, value):
+        if fresh is not None and _is_good(fresh, scope):
+            if scope.failed:
+                fallback = load_last_good(name)
+                fresh = _fill(fresh, fallback[0])[0] if fallback is not None else fresh
+            save_last_good(name, fresh)
+            refreshed += 1
+    print(f"  🔄 {key} finished after its deadline; refreshed {refreshed} last known good value(s)")
+
+
+def guarded(source: str, parts: tuple = None):
+    """
+    Decorator for fetch_* functions: deadline plus last-known-good
+    fallback. parts names the frames of a source returning a dict of
+    frames; each part falls back on its own.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = archive.source_key(source)
+            deadline = source_deadline()
+            # The fetch may outlive the source deadline, never the epoch
+            scope = http_client.Scope(key, _epoch["deadline"])
+            outcome = {}
+            done = threading.Event()
+            handoff = threading.Lock()
+
+            def target():
+                try:
+                    outcome["value"] = http_client.run_in_scope(scope, func, *args, **kwargs)
+                except Exception as e:
+                    outcome["error"] = e
+                with handoff:
+                    late = outcome.get("late", False)
+                    done.set()
+                if late and "value" in outcome:
+                    try:
+                        _revalidated(key, parts, outcome["value"], scope)
+                    except Exception as e:
+                        print(f"  ⚠️ Background refresh of {key} failed: {e}")
+
+            threading.Thread(target=target, name=f"fetch {key}", daemon=True).start()
+            done.wait(None if deadline is None else max(deadline - time.time(), 0.0))
+            with handoff:
+                finished = done.is_set()
+                outcome["late"] = not finished
+
+            if not finished:
+                with _lock:
+                    _late.append(scope)
+                tracing.count("source_deadline_missed")
+                reason = "missed deadline"
+                results = [_resolve(name, None, False, reason) for name, _ in _split(key, parts, None)]
+            elif "error" in outcome:
+                error = outcome["error"]
+                reason = f"{type(error).__name__}: {error}"
+                results = [_resolve(name, None, False, reason) for name, _ in _split(key, parts, None)]
+            else:
+                results = [
+                    _resolve(name, fresh, fresh is not None and _is_good(fresh, scope), "fetch failed",
+                             scope.failed)
+                    for name, fresh in _split(key, parts, outcome["value"])
+                ]
+            return _join(parts, results)
+        return wrapper
+    return decorator
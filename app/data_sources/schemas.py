@@ -0,0 +1,215 @@
+"""
+Declared shape of every source frame, enforced where the fetchers return.
+
+Each metric has a schema: the key column, the value column the fetcher
+produces (plus older names it is accepted under), the valid range and the
+unit. @typed(source) wraps a fetch_* so it returns exactly
+
+    model (str) | <column> (float64, NaN where missing or rejected)
+
+plus the schema's extra columns (other values of the same source, such
+as downloads_all_time next to downloads), each checked against its own
+schema.
+
+Validation is vectorized: one type pass over object columns, then float64
+array comparisons. Values that are not numbers (dicts, strings, ...) and
+values outside the range are rejected; rows without a key are dropped.
+Duplicate rows are kept, as merge_dataframes joins them. Counts of
+rejected values per source are collected for the run (rejections()) and
+written to the raw archive index.
+
+merge_dataframes and the streaming pipeline validate again with the same
+rules, so frames replayed from archives recorded before this check (or
+built in memory) are scored the same way.
+"""
+
+import functools
+import threading
+import numpy as np
+import pandas as pd
+from ..utils import tracing
+
+# Scalar types accepted as numbers in object columns
+NUMERIC_TYPES = (int, float, bool, np.float64, np.float32, np.int64, np.int32, np.bool_)
+
+
+class Schema:
+    """One metric's source frame: key and value columns, valid range, unit, extra columns."""
+
+    __slots__ = ("metric", "column", "aliases", "key", "minimum", "maximum", "unit", "extras")
+
+    def __init__(self, metric: str, column: str, minimum: float = None, maximum: float = None,
+                 unit: str = "", aliases: tuple = (), key: str = "model", extras: tuple = ()):
+        self.metric = metric
+        self.column = column
+        self.aliases = aliases
+        self.extras = extras
+        self.key = key
+        self.minimum = -np.inf if minimum is None else minimum
+        self.maximum = np.inf if maximum is None else maximum
+        self.unit = unit
+
+    def value_column(self, frame: pd.DataFrame):
+        """The frame's value column: the declared one, an alias, else the first non-key column."""
+        for name in (self.column, self.metric) + tuple(self.aliases):
+            if name in frame.columns:
+                return name
+        others = [c for c in frame.columns if c != self.key]
+        return others[0] if others else None
+
+
+SCHEMAS = {s.metric: s for s in (
+    Schema("arena", "elo", 0, 5000, "Elo rating"),
+    Schema("mmlu", "mmlu", 0, 100, "% accuracy"),
+    Schema("gsm8k", "gsm8k", 0, 100, "% accuracy"),
+    Schema("humaneval", "humaneval", 0, 100, "% pass@1"),
+    Schema("multimodal", "multimodal", 0, 100, "score"),
+    Schema("robustness", "robustness", 0, 100, "score"),
+    Schema("downloads", "downloads", 0, None, "downloads / 30 days", extras=("downloads_all_time",)),
+    Schema("downloads_all_time", "downloads_all_time", 0, None, "downloads since creation"),
+    Schema("github", "github", 0, None, "activity score", aliases=("github_growth",)),
+    Schema("citations", "citation_velocity", 0, None, "citations"),
+    Schema("release", "release_frequency", 0, None, "releases / 6 months"),
+)}
+
+
+class Validated:
+    """Validated source: model keys, float64 values and the validity mask."""
+
+    __slots__ = ("schema", "models", "values", "valid", "rejected", "has_column")
+
+    def __init__(self, schema, models, values, valid, rejected, has_column=True):
+        self.schema = schema
+        self.models = models
+        self.values = values
+        self.valid = valid
+        self.rejected = rejected
+        self.has_column = has_column
+
+    def frame(self, column: str = None) -> pd.DataFrame:
+        """model plus the values (NaN where invalid) under column (default: the metric)."""
+        data = {"model": self.models}
+        if self.has_column:
+            data[column or self.schema.metric] = self.values
+        return pd.DataFrame(data)
+
+
+def validate(schema: Schema, frame: pd.DataFrame) -> Validated:
+    """Check a source frame against its schema in O(n) array operations."""
+    rejected = {}
+    if frame is None or schema.key not in frame.columns:
+        if frame is not None and len(frame):
+            rejected["missing_key"] = len(frame)
+        empty = np.empty(0)
+        return Validated(schema, np.empty(0, dtype=object), empty, empty.astype(bool), rejected)
+
+    keys = frame[schema.key]
+    key_ok = keys.notna().to_numpy()
+    if not key_ok.all():
+        rejected["missing_key"] = int((~key_ok).sum())
+    models = keys[key_ok].astype(str).to_numpy(dtype=object)
+
+    column = schema.value_column(frame)
+    if column is None:
+        if len(models):
+            rejected["missing_column"] = len(models)
+        values = np.full(len(models), np.nan)
+        return Validated(schema, models, values, np.zeros(len(models), dtype=bool), rejected, False)
+
+    series = frame[column][key_ok]
+    if pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    else:
+        # One type lookup per cell; everything after is array arithmetic
+        numeric = series.map(type).isin(NUMERIC_TYPES).to_numpy()
+        values = np.full(len(series), np.nan)
+        values[numeric] = series.to_numpy()[numeric].astype(np.float64)
+        malformed = ~numeric & series.notna().to_numpy()
+        if malformed.any():
+            rejected["non_numeric"] = int(malformed.sum())
+
+    present = ~np.isnan(values)
+    with np.errstate(invalid="ignore"):
+        in_range = np.isfinite(values) & (values >= schema.minimum) & (values <= schema.maximum)
+    out_of_range = present & ~in_range
+    if out_of_range.any():
+        rejected["out_of_range"] = int(out_of_range.sum())
+        values[out_of_range] = np.nan
+    return Validated(schema, models, values, in_range, rejected)
+
+
+# -- Rejection counts for the run ------------------------------------------
+
+_rejected = {}
+_lock = threading.Lock()
+
+
+def reset(metrics=None):
+    """Forget the counts of every metric (a new epoch) or of the given ones (a refetch)."""
+    if metrics is not None:
+        metrics = [m for metric in metrics for m in (metric,) + SCHEMAS[metric].extras]
+    with _lock:
+        for metric in list(_rejected) if metrics is None else metrics:
+            _rejected.pop(metric, None)
+
+
+def add_rejections(entries: dict):
+    """Add {source: {reason: count}} (also used for counts from worker processes)."""
+    with _lock:
+        for source, reasons in entries.items():
+            counts = _rejected.setdefault(source, {})
+            for reason, count in reasons.items():
+                counts[reason] = counts.get(reason, 0) + count
+
+
+def rejections() -> dict:
+    with _lock:
+        return {source: dict(sorted(reasons.items())) for source, reasons in sorted(_rejected.items())}
+
+
+def _report(metric: str, rejected: dict, rows: int):
+    add_rejections({metric: rejected})
+    for reason, count in rejected.items():
+        tracing.count(f"rejected.{metric}.{reason}", count)
+    details = ", ".join(f"{count} {reason}" for reason, count in sorted(rejected.items()))
+    print(f"  ⚠️ {metric}: rejected {details} of {rows} rows")
+
+
+def conform(metric: str, frame: pd.DataFrame, column: str = None, record: bool = True,
+            extras: bool = True) -> pd.DataFrame:
+    """
+    Validated (model, column or metric) frame for a metric's source frame,
+    plus the schema's extra columns the frame has (unless extras=False).
+    """
+    schema = SCHEMAS[metric]
+    validated = validate(schema, frame)
+    if validated.rejected and record:
+        _report(metric, validated.rejected, len(frame))
+    conformed = validated.frame(column)
+    if not extras or frame is None or schema.key not in frame.columns:
+        return conformed
+    for extra in schema.extras:
+        if extra in frame.columns:
+            checked = validate(SCHEMAS[extra], frame[[schema.key, extra]])
+            # Rows without a key are dropped (and counted) once, for the metric
+            checked.rejected.pop("missing_key", None)
+            if checked.rejected and record:
+                _report(extra, checked.rejected, len(frame))
+            conformed[extra] = checked.values
+    return conformed
+
+
+def typed(source: str, parts: tuple = None):
+    """
+    Decorator enforcing the schema on a fetch_* result: one frame for the
+    source's metric, or a dict of frames for each metric in parts.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            value = func(*args, **kwargs)
+            if parts is None:
+                return conform(source, value, SCHEMAS[source].column)
+            return {part: conform(part, value[part], SCHEMAS[part].column) for part in parts}
+        return wrapper
+    return decorator
@@ -15,26 +15,55 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.config import (
     EPOCH_ID, SNAPSHOT_TIMESTAMP, RAW_DATA_ARCHIVE_DIR,
-    MODEL_SCORE_WEIGHTS
+    MODEL_SCORE_WEIGHTS, IPFS_PUBLISH_TIMEOUT, RAW_ARCHIVE_MODE, REPLAY_EPOCH_ID,
+    MODELS_REGISTRY_PATH, SHARDS, SHARD_WORKERS, STREAMING, STREAM_CHUNK_SIZE, INDICES_PATH
 )
 from app.data_sources import (
     fetch_arena_scores, fetch_hf_downloads, fetch_github_stats,
     fetch_citations, get_mock_all_data
 )
 from app.data_sources.benchmarks import fetch_all_benchmarks
-from app.scoring.normalization import normalize
+from app.data_sources import archive, resilience
+from app.data_sources.schemas import conform, rejections
+from app.scoring.normalization import normalize, min_max_normalize_with
 from app.scoring.intelligence import compute_intelligence_score
 from app.scoring.adoption import compute_adoption_score
 from app.scoring.momentum import compute_momentum_score
 from app.scoring.cis import compute_model_score, compute_cis
+from app.scoring.indices import SubIndexEngine, load_definitions
+from app.scoring.ranks import write_ranks, previous_snapshot
+from app.sharding import run_sharded
+from app.streaming import compute_snapshot_streaming
 from app.utils.hashing import hash_dataset
-from app.utils.ipfs import upload_to_ipfs
-from app.utils.snapshot import save_snapshot
+from app.utils import tracing
+from app.utils.ipfs import IPFSPublisher, compute_file_cid
+from app.utils.history import write_summary
+from app.utils.manifest import record_epoch
+from app.utils.snapshot import save_snapshot, publish_snapshot
 
+@archive.archived("registry")
 def load_model_registry():
-    with open("app/models_registry.json", "r") as f:
+    with open(MODELS_REGISTRY_PATH, "r") as f:
         return json.load(f)
 
+@archive.archived("indices", optional=True)
+def load_index_definitions():
+    """Sub-index definitions from INDICES_PATH ([] when none are configured)."""
+    return load_definitions(INDICES_PATH) if INDICES_PATH else []
+
+def index_engine(registry):
+    """SubIndexEngine for the configured definitions, or None when there are none."""
+    definitions = load_index_definitions()
+    return SubIndexEngine(definitions, registry) if definitions else None
+
+def index_fields(registry, df) -> dict:
+    """{"indices": ...} for a scored frame, or {} when no sub-indices are configured."""
+    engine = index_engine(registry)
+    if engine is None:
+        return {}
+    with tracing.span("indices", indices=len(engine.names)):
+        return {"indices": engine.evaluate(df)}
+
 def fetch_all_data():
     """
     Returns a dictionary with dataframes for current and previous metrics.
@@ -44,19 +73,24 @@ def fetch_all_data():
     
     # Fetch real data
     print("\n📊 Fetching LMArena scores...")
-    arena_df = fetch_arena_scores()
+    with tracing.span("fetch arena", "source"):
+        arena_df = fetch_arena_scores()
     
     print("\n📚 Fetching benchmark data (MMLU, GSM8K, HumanEval)...")
-    benchmarks = fetch_all_benchmarks()
+    with tracing.span("fetch benchmarks", "source"):
+        benchmarks = fetch_all_benchmarks()
     
     print("\n🤗 Fetching Hugging Face downloads...")
-    downloads_df = fetch_hf_downloads()
+    with tracing.span("fetch downloads", "source"):
+        downloads_df = fetch_hf_downloads()
     
     print("\n🐙 Fetching GitHub stats...")
-    github_df = fetch_github_stats()
+    with tracing.span("fetch github", "source"):
+        github_df = fetch_github_stats()
     
     print("\n📖 Fetching citation counts...")
-    citations_df = fetch_citations()
+    with tracing.span("fetch citations", "source"):
+        citations_df = fetch_citations()
     
     current = {
         "arena": arena_df,
@@ -82,6 +116,27 @@ def fetch_all_data():
     
     return current, previous
 
+# Sources merged in this order; the previous-epoch ones become prev_<metric>
+CURRENT_METRICS = ["arena", "mmlu", "gsm8k", "humaneval", "multimodal", "robustness",
+                   "downloads", "github", "citations", "release"]
+PREVIOUS_METRICS = {
+    "arena": "elo",
+    "mmlu": "mmlu",
+    "gsm8k": "gsm8k",
+    "humaneval": "humaneval",
+    "downloads": "downloads",
+    "citations": "citation_velocity"
+}
+
+def prepare_current(curr_df, metric):
+    """A source frame as merge_dataframes joins it: model plus its float64 metric column."""
+    print(f"  Merging {metric}: {len(curr_df)} rows, columns: {curr_df.columns.tolist()}")
+    return conform(metric, curr_df)
+
+def prepare_previous(prev_df, metric):
+    """A previous-epoch frame as merge_dataframes joins it: model plus prev_<metric>."""
+    return conform(metric, prev_df, f"prev_{metric}", record=False, extras=False)
+
 def merge_dataframes(registry, current, previous):
     """
     Merge registry with current and previous metrics.
@@ -104,50 +159,9 @@ def merge_dataframes(registry, current, previous):
         df['name'] = df['name'].astype(str)
     
     # Merge current metrics one by one
-    metrics = ["arena", "mmlu", "gsm8k", "humaneval", "multimodal", "robustness",
-               "downloads", "github", "citations", "release"]
-    
-    for metric in metrics:
+    for metric in CURRENT_METRICS:
         if metric in current:
-            curr_df = current[metric].copy()
-            
-            # Debug: Check dataframe structure
-            print(f"  Merging {metric}: {len(curr_df)} rows, columns: {curr_df.columns.tolist()}")
-            
-            # Check for dict/list values in any column
-            for col in curr_df.columns:
-                if curr_df[col].dtype == 'object':
-                    mask = curr_df[col].apply(lambda x: isinstance(x, (dict, list)))
-                    if mask.any():
-                        print(f"    WARNING: Column '{col}' contains dict/list values! Cleaning.")
-                        # Convert to None
-                        curr_df[col] = curr_df[col].apply(
-                            lambda x: None if isinstance(x, (dict, list)) else x
-                        )
-            
-            # Ensure model is string for merging
-            if 'model' in curr_df.columns:
-                curr_df['model'] = curr_df['model'].astype(str)
-            
-            # Ensure we only have model and value columns
-            if len(curr_df.columns) > 2:
-                print(f"  Warning: {metric} has {len(curr_df.columns)} columns, expected 2")
-            
-            # Rename the value column to the metric name
-            value_cols = [col for col in curr_df.columns if col != 'model']
-            if len(value_cols) == 1:
-                curr_df = curr_df.rename(columns={value_cols[0]: metric})
-            elif len(value_cols) > 1:
-                # Take only the first value column
-                curr_df = curr_df[['model', value_cols[0]]].rename(columns={value_cols[0]: metric})
-            
-            # Ensure the value column contains only scalars (not dicts/lists)
-            if metric in curr_df.columns:
-                # Convert any non-scalar values to None
-                curr_df[metric] = curr_df[metric].apply(
-                    lambda x: x if isinstance(x, (int, float, type(None))) or pd.isna(x) else None
-                )
-            
+            curr_df = prepare_current(current[metric], metric)
             df = df.merge(curr_df, left_on="name", right_on="model", how="left")
             
             # Drop duplicate model column if it exists
@@ -155,42 +169,21 @@ def merge_dataframes(registry, current, previous):
                 df = df.drop(columns=['model'])
     
     # For previous values
-    prev_metrics = {
-        "arena": "elo",
-        "mmlu": "mmlu",
-        "gsm8k": "gsm8k",
-        "humaneval": "humaneval",
-        "downloads": "downloads",
-        "citations": "citation_velocity"
-    }
-    
-    for metric, colname in prev_metrics.items():
+    for metric, colname in PREVIOUS_METRICS.items():
         if metric in previous:
-            prev_df = previous[metric].copy()
-            
-            # Rename the value column to prev_{metric}
-            value_cols = [col for col in prev_df.columns if col != 'model']
-            if len(value_cols) == 1:
-                prev_df = prev_df.rename(columns={value_cols[0]: f"prev_{metric}"})
-            elif len(value_cols) > 1:
-                prev_df = prev_df[['model', value_cols[0]]].rename(columns={value_cols[0]: f"prev_{metric}"})
-            
-            # Ensure model is string for merging
-            if 'model' in prev_df.columns:
-                prev_df['model'] = prev_df['model'].astype(str)
-            
-            # Ensure scalar values only
-            prev_col = f"prev_{metric}"
-            if prev_col in prev_df.columns:
-                prev_df[prev_col] = prev_df[prev_col].apply(
-                    lambda x: x if isinstance(x, (int, float, type(None))) or pd.isna(x) else None
-                )
-            
+            prev_df = prepare_previous(previous[metric], metric)
             df = df.merge(prev_df, left_on="name", right_on="model", how="left")
             
             if 'model' in df.columns:
                 df = df.drop(columns=['model'])
     
+    df = add_deltas(df)
+    
+    print(f"Merged data: {df.shape[0]} rows, {df.shape[1]} columns")
+    return df
+
+def add_deltas(df):
+    """Benchmark average and current-vs-previous deltas from merged columns."""
     # Compute deltas
     if 'arena' in df.columns and 'prev_arena' in df.columns:
         df["elo_delta"] = df["arena"] - df["prev_arena"]
@@ -211,74 +204,264 @@ def merge_dataframes(registry, current, previous):
     if 'citations' in df.columns and 'prev_citations' in df.columns:
         df["citation_growth"] = df["citations"] - df["prev_citations"]
     
-    print(f"Merged data: {df.shape[0]} rows, {df.shape[1]} columns")
     return df
 
-def normalize_all(df):
-    """Apply normalization to all metric columns."""
-    metric_cols = ["arena", "mmlu", "gsm8k", "humaneval", "multimodal", "robustness",
-                   "downloads", "github", "citations", "release",
-                   "elo_delta", "benchmark_delta", "download_growth", "citation_growth"]
-    for col in metric_cols:
+NORMALIZED_METRICS = ["arena", "mmlu", "gsm8k", "humaneval", "multimodal", "robustness",
+                      "downloads", "github", "citations", "release",
+                      "elo_delta", "benchmark_delta", "download_growth", "citation_growth"]
+
+def normalize_all(df, bounds=None):
+    """
+    Apply normalization to all metric columns. bounds maps a column to
+    global (min, max) when df is one shard of a larger registry.
+    """
+    for col in NORMALIZED_METRICS:
         if col in df.columns:
-            df[f"{col}_norm"] = normalize(df[col])
+            if bounds is None:
+                df[f"{col}_norm"] = normalize(df[col])
+            else:
+                df[f"{col}_norm"] = min_max_normalize_with(df[col], *bounds[col])
     return df   
 
-def main():
-    print("🚀 AIGI Index Engine - Layer 1")
-    print(f"Epoch: {EPOCH_ID}")
+SNAPSHOT_COLUMNS = ["name", "tier", "intelligence_score", "adoption_score",
+                    "momentum_score", "model_score"]
+# Source values published as fetched, when the source provides them (schema extras)
+SOURCE_COLUMNS = ["downloads_all_time"]
 
-    try:
-        # Load model registry
-        registry = load_model_registry()
-        print(f"Loaded {len(registry)} models.")
+def snapshot_columns(df):
+    return SNAPSHOT_COLUMNS + [col for col in SOURCE_COLUMNS if col in df.columns]
 
-        # Fetch data (mock)
-        current, previous = fetch_all_data()
+def snapshot_records(df):
+    """Model entries of a scored frame; missing source values are null."""
+    records = df[snapshot_columns(df)]
+    sources = [col for col in SOURCE_COLUMNS if col in records.columns]
+    if sources:
+        records = records.astype({col: object for col in sources})
+        records[sources] = records[sources].where(records[sources].notna(), None)
+    return records.to_dict(orient="records")
 
-        # Merge into one dataframe
+def score_all(df):
+    """Add the sub-scores and the final model score to a normalized frame."""
+    # Compute intelligence score per model
+    df["intelligence_score"] = compute_intelligence_score(df)
+    # Compute adoption score
+    df["adoption_score"] = compute_adoption_score(df)
+    # Compute momentum score
+    df["momentum_score"] = compute_momentum_score(df)
+
+    # Compute final model score (weighted combination)
+    df["model_score"] = df.apply(compute_model_score, axis=1)
+    return df
+
+def compute_snapshot(registry, current, previous, epoch_id, timestamp=None):
+    """Run merge, normalization and scoring; returns the snapshot dict."""
+    # Merge into one dataframe
+    with tracing.span("merge", models=len(registry)):
         df = merge_dataframes(registry, current, previous)
-        print("Data merged.")
+    print("Data merged.")
 
-        # Normalize all metrics
+    # Normalize all metrics
+    with tracing.span("normalize"):
         df = normalize_all(df)
-        print("Normalization complete.")
-
-        # Compute intelligence score per model
-        df["intelligence_score"] = compute_intelligence_score(df)
-        # Compute adoption score
-        df["adoption_score"] = compute_adoption_score(df)
-        # Compute momentum score
-        df["momentum_score"] = compute_momentum_score(df)
+    print("Normalization complete.")
 
-        # Compute final model score (weighted combination)
-        df["model_score"] = df.apply(compute_model_score, axis=1)
+    with tracing.span("score"):
+        df = score_all(df)
 
-        # Compute CIS
+    # Compute CIS
+    with tracing.span("cis"):
         cis = compute_cis(df)
-        print(f"\n📊 Composite Intelligence Score (CIS): {cis:.4f}")
-
-        # Prepare output snapshot
-        timestamp = SNAPSHOT_TIMESTAMP or datetime.utcnow().isoformat() + "Z"
-        snapshot = {
-            "epoch_id": EPOCH_ID,
-            "timestamp": timestamp,
-            "cis": cis,
-            "models": df[["name", "tier", "intelligence_score", "adoption_score",
-                          "momentum_score", "model_score"]].to_dict(orient="records"),
-            "engine_version": "1.0.0",
-        }
+    print(f"\n📊 Composite Intelligence Score (CIS): {cis:.4f}")
 
-        # Save to file
-        filepath = save_snapshot(snapshot, EPOCH_ID, timestamp)
+    # Prepare output snapshot
+    timestamp = timestamp or datetime.utcnow().isoformat() + "Z"
+    return {
+        "epoch_id": epoch_id,
+        "timestamp": timestamp,
+        "cis": cis,
+        "models": snapshot_records(df),
+        "engine_version": "1.0.0",
+        **index_fields(registry, df),
+        **resilience.snapshot_fields(),
+    }
+
+def replay_epoch(epoch_id):
+    """
+    Recompute an epoch from its raw archive without network access.
+    Returns True when the snapshot hash matches the recorded one.
+    """
+    index = archive.load_index(epoch_id)
+    archive.set_mode("replay", epoch_id)
+
+    registry = load_model_registry()
+    if index.get("shards"):
+        snapshot = run_sharded(registry, index["epoch_id"], index["timestamp"],
+                               index["shards"], SHARD_WORKERS)
+    else:
+        current, previous = fetch_all_data()
+        snapshot = compute_snapshot(registry, current, previous,
+                                    index["epoch_id"], index["timestamp"])
+
+    snapshot_hash = hash_dataset(snapshot)
+    expected = index.get("snapshot_sha256")
+    print(f"Snapshot SHA256: {snapshot_hash}")
+    if expected == snapshot_hash:
+        print("✅ Replay matches the recorded snapshot.")
+        return True
+    print(f"❌ Replay mismatch, recorded SHA256: {expected}")
+    return False
+
+def publish_epoch(snapshot, filepath, snapshot_hash, epoch_id, streamed=False):
+    """
+    Pin the snapshot and raw archive, write variants and the latest
+    pointer, and record the epoch in the manifest.
+    """
+    # Pin snapshot and raw archive on a background worker
+    publisher = IPFSPublisher()
+    raw_dir = os.path.join(RAW_DATA_ARCHIVE_DIR, epoch_id)
+    root_cid = publisher.publish(
+        [filepath, raw_dir],
+        on_done=lambda expected, pinned: record_epoch(
+            epoch_id, root_cid=expected, pinned=pinned == expected),
+    )
+
+    # CID is computed locally, no IPFS daemon needed
+    ipfs_hash = compute_file_cid(filepath)
+    print(f"IPFS CID: {ipfs_hash}")
+    print(f"IPFS root CID: {root_cid}")
+
+    # Precompressed variants and the latest pointer
+    with tracing.span("publish"):
+        variants = publish_snapshot(snapshot, filepath, streamed=streamed,
+                                    sha256=snapshot_hash, cid=ipfs_hash)
+        # History summary for `aigi report` and the rank index (streamed snapshots are read back)
+        write_summary(filepath, snapshot)
+        write_ranks(filepath, snapshot, previous_snapshot(
+            os.path.dirname(filepath) or ".", epoch_id, snapshot["timestamp"]))
+
+    record_epoch(
+        epoch_id,
+        timestamp=snapshot["timestamp"],
+        snapshot=os.path.basename(filepath),
+        cis=snapshot["cis"],
+        sha256=snapshot_hash,
+        cid=ipfs_hash,
+        root_cid=root_cid,
+        variants=variants,
+    )
+
+    with tracing.span("ipfs wait"):
+        publisher.wait(timeout=resilience.remaining(IPFS_PUBLISH_TIMEOUT))
+    return ipfs_hash
+
+def run_report_fields():
+    """Archive index fields: sources scored from last known good values, rejected values."""
+    fields = {}
+    stale = resilience.stale_sources()
+    if stale:
+        fields["stale_sources"] = stale
+    rejected = rejections()
+    if rejected:
+        fields["rejected"] = rejected
+    return fields
+
+def fetch_epoch(epoch_id, timestamp=None):
+    """Fetch every source into the raw archive of an epoch (no scoring)."""
+    timestamp = timestamp or datetime.utcnow().isoformat() + "Z"
+    archive.set_mode("record", epoch_id)
+    resilience.begin_epoch()
+    try:
+        with tracing.span("load registry"):
+            load_model_registry()
+            load_index_definitions()
+        with tracing.span("fetch"):
+            fetch_all_data()
+        return archive.write_index(epoch_id, timestamp, **run_report_fields())
+    finally:
+        resilience.end_epoch()
+
+def score_epoch(epoch_id):
+    """
+    Score an epoch from its raw archive and save the snapshot.
+    Returns (snapshot, filepath, sha256, streamed).
+    """
+    index = archive.load_index(epoch_id)
+    archive.set_mode("replay", epoch_id)
+    registry = load_model_registry()
+    streamed = STREAMING and not index.get("shards")
+    if index.get("shards"):
+        snapshot = run_sharded(registry, epoch_id, index["timestamp"], index["shards"], SHARD_WORKERS)
+    else:
+        current, previous = fetch_all_data()
+        if streamed:
+            snapshot = compute_snapshot_streaming(registry, current, previous, epoch_id,
+                                                  index["timestamp"], chunk_size=STREAM_CHUNK_SIZE)
+        else:
+            snapshot = compute_snapshot(registry, current, previous, epoch_id, index["timestamp"])
 
-        # Hash the snapshot
+    if streamed:
+        filepath, snapshot_hash = snapshot["path"], snapshot["sha256"]
+    else:
         snapshot_hash = hash_dataset(snapshot)
+        with tracing.span("save snapshot"):
+            filepath = save_snapshot(snapshot, epoch_id, index["timestamp"])
+    print(f"Snapshot SHA256: {snapshot_hash}")
+    archive.update_index(epoch_id, snapshot_sha256=snapshot_hash)
+    return snapshot, filepath, snapshot_hash, streamed
+
+def main():
+    print("🚀 AIGI Index Engine - Layer 1")
+
+    if RAW_ARCHIVE_MODE == "replay":
+        print(f"Replaying epoch: {REPLAY_EPOCH_ID}")
+        if not replay_epoch(REPLAY_EPOCH_ID):
+            sys.exit(1)
+        return
+
+    print(f"Epoch: {EPOCH_ID}")
+    archive.set_mode(RAW_ARCHIVE_MODE, EPOCH_ID)
+    resilience.begin_epoch()
+
+    try:
+        # Load model registry
+        with tracing.span("load registry"):
+            registry = load_model_registry()
+        print(f"Loaded {len(registry)} models.")
+
+        streamed = STREAMING and SHARDS <= 1
+        if SHARDS > 1:
+            # Per-model sources are fetched and scored shard by shard
+            snapshot = run_sharded(registry, EPOCH_ID, SNAPSHOT_TIMESTAMP, SHARDS, SHARD_WORKERS)
+        else:
+            # Fetch data
+            with tracing.span("fetch"):
+                current, previous = fetch_all_data()
+
+            if streamed:
+                # Written to disk as it is scored; snapshot is only a summary
+                snapshot = compute_snapshot_streaming(registry, current, previous, EPOCH_ID,
+                                                      SNAPSHOT_TIMESTAMP, chunk_size=STREAM_CHUNK_SIZE)
+                filepath = snapshot["path"]
+            else:
+                snapshot = compute_snapshot(registry, current, previous, EPOCH_ID, SNAPSHOT_TIMESTAMP)
+        timestamp = snapshot["timestamp"]
+
+        # Hash the snapshot (the streamed file is canonical JSON, its hash is already known)
+        snapshot_hash = snapshot["sha256"] if streamed else hash_dataset(snapshot)
         print(f"Snapshot SHA256: {snapshot_hash}")
 
-        # Upload to IPFS (optional)
-        ipfs_hash = upload_to_ipfs(filepath)
-        print(f"IPFS CID: {ipfs_hash}")
+        # Index the raw archive so the epoch can be replayed
+        if archive.get_mode() == "record":
+            shard_fields = {"shards": SHARDS} if SHARDS > 1 else {}
+            archive.write_index(EPOCH_ID, timestamp, snapshot_sha256=snapshot_hash,
+                                **shard_fields, **run_report_fields())
+
+        # Save to file
+        if not streamed:
+            with tracing.span("save snapshot"):
+                filepath = save_snapshot(snapshot, EPOCH_ID, timestamp)
+
+        publish_epoch(snapshot, filepath, snapshot_hash, EPOCH_ID, streamed)
 
         print("\n✅ Epoch complete.")
         
@@ -287,6 +470,9 @@ def main():
         import traceback
         traceback.print_exc()
         raise
+    finally:
+        resilience.end_epoch()
+        tracing.export()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Static HTML dashboard of the epoch history.
+
+Built from the per-epoch summaries in HISTORY_DIR (see utils.history), so
+snapshots are only parsed the first time they are summarized. The page has
+the CIS series, the per-tier contributions to CIS (stacked), model score
+trajectories and rank changes against the previous epoch.
+
+Every trace is WebGL (scattergl). Series longer than REPORT_MAX_POINTS
+(REPORT_TRAJECTORY_POINTS for model trajectories) are downsampled with
+Largest-Triangle-Three-Buckets, which keeps peaks and turns that plain
+striding drops. Trajectories are downsampled for all models at once, and
+every model outside the REPORT_TOP_MODELS is drawn in one background trace
+(series separated by gaps), so the page stays responsive with thousands
+of models and hundreds of epochs.
+
+    python -m app.report
+    python -m app.report --output report.html --cdn
+"""
+
+import os
+import sys
+import time
+import warnings
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import (SNAPSHOT_DIR, REPORT_PATH, REPORT_MAX_POINTS, REPORT_TRAJECTORY_POINTS,
+                        REPORT_TOP_MODELS, TIER_WEIGHTS)
+from app.utils.history import load_history
+from app.utils.snapshot import atomic_write
+
+try:
+    import plotly.graph_objects as go
+    import plotly.io as pio
+except ImportError:
+    go = pio = None
+
+# Values are drawn, not verified; shorter numbers keep the page small
+DECIMALS = 4
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets over rows sharing x: y is (rows, n),
+    returns (rows, threshold) indices into x. Each bucket keeps the point
+    forming the largest triangle with the point kept before it and the
+    mean of the next bucket. NaN points are only kept when a bucket has
+    nothing else.
+    """
+    rows, n = y.shape
+    if threshold >= n or threshold < 3:
+        return np.tile(np.arange(n), (rows, 1))
+    every = (n - 2) / (threshold - 2)
+    kept = np.empty((rows, threshold), dtype=np.int64)
+    kept[:, 0], kept[:, -1] = 0, n - 1
+    a = np.zeros(rows, dtype=np.int64)
+    row = np.arange(rows)
+    with warnings.catch_warnings(), np.errstate(invalid="ignore"):
+        # Rows that are all NaN in a bucket (models absent from those epochs)
+        warnings.simplefilter("ignore", RuntimeWarning)
+        for i in range(threshold - 2):
+            start, end = int(i * every) + 1, int((i + 1) * every) + 1
+            next_start, next_end = end, min(int((i + 2) * every) + 1, n)
+            mean_x = x[next_start:next_end].mean()
+            mean_y = np.nanmean(y[:, next_start:next_end], axis=1)
+            ax, ay = x[a][:, None], y[row, a][:, None]
+            area = np.abs((ax - mean_x) * (y[:, start:end] - ay)
+                          - (ax - x[start:end][None, :]) * (mean_y[:, None] - ay))
+            a = start + np.argmax(np.where(np.isnan(area), -1.0, area), axis=1)
+            kept[:, i + 1] = a
+    return kept
+
+
+def downsample(x: np.ndarray, y: np.ndarray, threshold: int):
+    keep = lttb(x, y[None, :], threshold)[0]
+    return x[keep], y[keep]
+
+
+def _round(values: np.ndarray) -> np.ndarray:
+    return np.round(values.astype(np.float64), DECIMALS)
+
+
+def _times(timestamps: list):
+    """(x, is_date): timestamps as float milliseconds, which date axes take, else epoch positions."""
+    parsed = pd.to_datetime(pd.Series(timestamps, dtype=object), utc=True, errors="coerce")
+    if parsed.isna().any():
+        return np.arange(len(timestamps), dtype=np.float64), False
+    return parsed.astype("int64").to_numpy() / 1e6, True
+
+
+def cis_figure(history: dict, x: np.ndarray, max_points: int):
+    xs, ys = downsample(x, history["cis"], max_points)
+    fig = go.Figure(go.Scattergl(x=xs, y=_round(ys), mode="lines+markers", name="CIS"))
+    fig.update_layout(title=f"Composite Intelligence Score ({len(x)} epochs)")
+    return fig
+
+
+def tier_figure(history: dict, x: np.ndarray, max_points: int):
+    fig = go.Figure()
+    stacked = np.zeros(len(x))
+    # Downsample on the stacked total so every tier keeps the same epochs
+    keep = lttb(x, history["cis"][None, :], max_points)[0]
+    for k, tier in enumerate(TIER_WEIGHTS):
+        stacked = stacked + history["contributions"][tier]
+        fig.add_trace(go.Scattergl(x=x[keep], y=_round(stacked[keep]), mode="lines", name=f"Tier {tier}",
+                                   fill="tonexty" if k else "tozeroy"))
+    fig.update_layout(title="Contribution to CIS by tier (stacked)")
+    return fig
+
+
+def trajectory_figure(history: dict, x: np.ndarray, top: int, points: int):
+    scores = history["scores"]
+    names = history["names"]
+    latest = scores[-1] if len(scores) else np.empty(0)
+    order = np.argsort(-np.nan_to_num(latest, nan=-np.inf), kind="stable")
+    leaders = order[:top]
+    rest = order[top:]
+
+    fig = go.Figure()
+    if len(rest):
+        keep = lttb(x, scores[:, rest].T, points)
+        xs = np.hstack([x[keep], np.full((len(rest), 1), np.nan)]).ravel()
+        ys = np.hstack([scores[keep, rest[:, None]], np.full((len(rest), 1), np.nan)]).ravel()
+        fig.add_trace(go.Scattergl(x=xs, y=_round(ys), mode="lines", name=f"{len(rest)} other models",
+                                   line={"width": 1, "color": "rgba(150,150,150,0.25)"},
+                                   hoverinfo="skip", connectgaps=False))
+    for column in leaders:
+        keep = lttb(x, scores[None, :, column], points)[0]
+        fig.add_trace(go.Scattergl(x=x[keep], y=_round(scores[keep, column]), mode="lines",
+                                   name=str(names[column])))
+    fig.update_layout(title=f"Model score trajectories (top {len(leaders)} by latest score highlighted)")
+    return fig
+
+
+def movers_figure(history: dict, top: int):
+    ranks = history["ranks"]
+    names = history["names"]
+    fig = go.Figure()
+    if len(ranks) < 2:
+        fig.update_layout(title="Rank changes (needs two epochs)")
+        return fig
+    current, previous = ranks[-1], ranks[-2]
+    both = ~np.isnan(current) & ~np.isnan(previous)
+    change = previous[both] - current[both]  # positive: moved up
+    fig.add_trace(go.Scattergl(x=current[both], y=change, mode="markers", name="all models",
+                               text=names[both], marker={"size": 4, "opacity": 0.5},
+                               hovertemplate="%{text}<br>rank %{x}<br>change %{y:+}<extra></extra>"))
+    order = np.argsort(-np.abs(change), kind="stable")[:top]
+    fig.add_trace(go.Scattergl(x=current[both][order], y=change[order], mode="markers+text",
+                               name=f"top {len(order)} movers", text=names[both][order],
+                               textposition="top center", marker={"size": 8}))
+    fig.update_layout(title=f"Rank changes since {history['epoch_ids'][-2]}",
+                      xaxis_title="rank", yaxis_title="places moved up")
+    return fig
+
+
+def build_report(snapshot_dir: str = None, output: str = None, cdn: bool = False,
+                 max_points: int = REPORT_MAX_POINTS, trajectory_points: int = REPORT_TRAJECTORY_POINTS,
+                 top: int = REPORT_TOP_MODELS) -> dict:
+    """Write the dashboard; returns {"path", "epochs", "models", "bytes", "seconds"}."""
+    if go is None:
+        raise RuntimeError("plotly is required to build the report")
+    started = time.perf_counter()
+    snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+    output = output or REPORT_PATH
+    history = load_history(snapshot_dir)
+    if not history["epoch_ids"]:
+        raise ValueError(f"No epoch snapshots in {snapshot_dir}")
+
+    x, dates = _times(history["timestamps"])
+    figures = [
+        cis_figure(history, x, max_points),
+        tier_figure(history, x, max_points),
+        trajectory_figure(history, x, top, trajectory_points),
+        movers_figure(history, top),
+    ]
+    divs = []
+    for i, fig in enumerate(figures):
+        if i < 3 and dates:
+            fig.update_xaxes(type="date")
+        fig.update_layout(template="plotly_white", height=480, margin={"t": 60, "b": 40})
+        plotlyjs = ("cdn" if cdn else True) if i == 0 else False
+        divs.append(pio.to_html(fig, full_html=False, include_plotlyjs=plotlyjs,
+                                config={"responsive": True}))
+
+    latest = history["epoch_ids"][-1]
+    page = (
+        "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n<title>AIGI history</title>\n</head>\n"
+        "<body style=\"font-family: sans-serif; margin: 2em\">\n"
+        f"<h1>AIGI history</h1>\n<p>{len(x)} epochs, {len(history['names'])} models. "
+        f"Latest: {latest}, CIS {history['cis'][-1]:.4f}.</p>\n"
+        + "\n".join(divs) + "\n</body>\n</html>\n"
+    )
+    body = page.encode("utf-8")
+    atomic_write(output, body)
+    return {"path": output, "epochs": len(x), "models": len(history["names"]), "bytes": len(body),
+            "seconds": round(time.perf_counter() - started, 2)}
+
+
+def run(snapshot_dir: str = None, output: str = None, cdn: bool = False):
+    try:
+        result = build_report(snapshot_dir, output, cdn)
+    except (RuntimeError, ValueError) as e:
+        sys.exit(f"❌ {e}")
+    print(f"✅ Report of {result['epochs']} epochs x {result['models']} models -> {result['path']} "
+          f"({result['bytes'] / 1e6:.1f} MB in {result['seconds']}s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the HTML history dashboard")
+    parser.add_argument("--dir", default=None, help="Snapshot directory")
+    parser.add_argument("--output", default=None, help="HTML file (default REPORT_PATH)")
+    parser.add_argument("--cdn", action="store_true", help="Load plotly.js from the CDN instead of embedding it")
+    args = parser.parse_args(argv)
+    run(args.dir, args.output, args.cdn)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+"""
+Refresh scheduler: a long-running alternative to the monthly batch.
+
+    aigi schedule [--cadence github=15m] [--epochs monthly]
+
+The registry and the latest value of every source stay in memory. Each
+source is refetched on its own cadence (SCHEDULE_CADENCES) with random
+jitter of +/- SCHEDULE_JITTER of the cadence. After a refresh only that
+source's merged columns are replaced; the normalized columns and
+sub-scores that depend on them, the model scores and CIS are recomputed
+and a provisional snapshot is written to PROVISIONAL_PATH, so a current
+CIS is always available without a pipeline run (`aigi provisional`, or
+/provisional on the read API). A source with duplicate models (which
+multiply rows in merge_dataframes) makes the frame rebuild in full.
+
+Official epochs are cut on SCHEDULE_EPOCHS boundaries from the values in
+memory: every source is recorded in the raw archive, the snapshot is
+computed in full by compute_snapshot, then saved and published as by
+`aigi run`, so replaying the epoch reproduces it.
+"""
+
+import os
+import json
+import time
+import random
+import signal
+import threading
+from datetime import datetime, timedelta
+
+from .config import (SCHEDULE_CADENCES, SCHEDULE_JITTER, SCHEDULE_EPOCHS, PROVISIONAL_PATH,
+                     MODELS_REGISTRY_PATH)
+from .data_sources import archive, resilience, schemas
+from .main import (PREVIOUS_METRICS, snapshot_records, prepare_current, prepare_previous,
+                   merge_dataframes, add_deltas, normalize_all, score_all, compute_snapshot, index_fields,
+                   publish_epoch, run_report_fields)
+from .scoring.normalization import normalize
+from .scoring.intelligence import compute_intelligence_score
+from .scoring.adoption import compute_adoption_score
+from .scoring.momentum import compute_momentum_score
+from .scoring.cis import compute_model_score, compute_cis
+from .utils import tracing
+from .utils.hashing import hash_dataset
+from .utils.snapshot import save_snapshot, atomic_write
+
+
+def _fetch_arena(registry):
+    from .data_sources import fetch_arena_scores
+    return fetch_arena_scores()
+
+
+def _fetch_benchmarks(registry):
+    from .data_sources.benchmarks import fetch_all_benchmarks
+    return fetch_all_benchmarks(registry)
+
+
+def _fetch_downloads(registry):
+    from .data_sources import fetch_hf_downloads
+    return fetch_hf_downloads(registry)
+
+
+def _fetch_github(registry):
+    from .data_sources import fetch_github_stats
+    return fetch_github_stats(registry)
+
+
+def _fetch_citations(registry):
+    from .data_sources import fetch_citations
+    return fetch_citations(registry)
+
+
+# source -> (fetch(registry), metrics it provides); names match the raw archive records
+SOURCES = {
+    "arena": (_fetch_arena, ["arena"]),
+    "benchmarks": (_fetch_benchmarks, ["mmlu", "gsm8k", "humaneval"]),
+    "downloads": (_fetch_downloads, ["downloads"]),
+    "github": (_fetch_github, ["github"]),
+    "citations": (_fetch_citations, ["citations"]),
+}
+# Sources that fetch per registry model
+PER_MODEL_SOURCES = ["downloads", "github", "citations"]
+
+# Columns add_deltas derives from each metric
+DERIVED = {
+    "arena": ["elo_delta"],
+    "mmlu": ["benchmark_delta"],
+    "gsm8k": ["benchmark_delta"],
+    "humaneval": ["benchmark_delta"],
+    "downloads": ["download_growth"],
+    "citations": ["citation_growth"],
+}
+
+# Sub-score column -> (function, metrics whose *_norm it reads)
+SUB_SCORES = {
+    "intelligence_score": (compute_intelligence_score,
+                           {"arena", "mmlu", "gsm8k", "humaneval", "multimodal", "robustness"}),
+    "adoption_score": (compute_adoption_score, {"downloads", "github", "citations", "release"}),
+    "momentum_score": (compute_momentum_score,
+                       {"elo_delta", "benchmark_delta", "download_growth", "citation_growth"}),
+}
+
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_duration(text: str) -> float:
+    """Seconds in "90", "15m", "1h" or "7d"."""
+    text = text.strip()
+    if text and text[-1] in _UNITS:
+        return float(text[:-1]) * _UNITS[text[-1]]
+    return float(text)
+
+
+def parse_cadences(spec: str) -> dict:
+    """{source: seconds} from "arena=1d,github=1h"."""
+    cadences = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        source, _, duration = part.partition("=")
+        if source not in SOURCES:
+            raise ValueError(f"Unknown source in cadence spec: {source}")
+        cadences[source] = parse_duration(duration)
+    return cadences
+
+
+def epoch_start(now: datetime, schedule: str) -> datetime:
+    """Start of the epoch period containing now (UTC)."""
+    if schedule == "monthly":
+        return datetime(now.year, now.month, 1)
+    if schedule == "weekly":
+        return datetime(now.year, now.month, now.day) - timedelta(days=now.weekday())
+    if schedule == "daily":
+        return datetime(now.year, now.month, now.day)
+    period = parse_duration(schedule)
+    start = now.timestamp() // period * period
+    return datetime.utcfromtimestamp(start)
+
+
+def next_epoch_start(now: datetime, schedule: str) -> datetime:
+    start = epoch_start(now, schedule)
+    if schedule == "monthly":
+        return datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+    if schedule == "weekly":
+        return start + timedelta(days=7)
+    if schedule == "daily":
+        return start + timedelta(days=1)
+    return start + timedelta(seconds=parse_duration(schedule))
+
+
+def epoch_label(start: datetime, schedule: str) -> str:
+    """Epoch id for a period: 2026-04, 2026-W15, 2026-04-06 or 20260406T120000Z."""
+    if schedule == "monthly":
+        return start.strftime("%Y-%m")
+    if schedule == "weekly":
+        year, week, _ = start.isocalendar()
+        return f"{year}-W{week:02d}"
+    if schedule == "daily":
+        return start.strftime("%Y-%m-%d")
+    return start.strftime("%Y%m%dT%H%M%SZ")
+
+
+class MetricStore:
+    """Registry, latest source frames and the scored frame built from them."""
+
+    def __init__(self, registry: list):
+        self.registry = registry
+        self.current = {}
+        self.df = None
+
+    def previous(self) -> dict:
+        # As in fetch_all_data: the previous epoch is the current data (momentum zero)
+        return {m: self.current[m].copy() for m in PREVIOUS_METRICS if m in self.current}
+
+    def set_source(self, source: str, value) -> list:
+        """Store a fetched value; returns the metrics it updated."""
+        metrics = SOURCES[source][1]
+        frames = value if isinstance(value, dict) else {metrics[0]: value}
+        for metric in metrics:
+            self.current[metric] = frames[metric]
+        return metrics
+
+    def rebuild(self):
+        with tracing.span("rebuild", models=len(self.registry)):
+            df = merge_dataframes(self.registry, self.current, self.previous())
+            self.df = score_all(normalize_all(df))
+
+    def _replace(self, column: str, prepared) -> bool:
+        """Swap one merged column in place; False when a full merge is needed."""
+        if column not in prepared.columns or "model" not in prepared.columns:
+            return False
+        if prepared["model"].duplicated().any() or column not in self.df.columns:
+            return False
+        merged = self.df[["name"]].merge(prepared, left_on="name", right_on="model", how="left")
+        self.df[column] = merged[column].values
+        return True
+
+    def update(self, metrics: list):
+        """Rescore after the given metrics changed, touching only what depends on them."""
+        if self.df is None:
+            self.rebuild()
+            return
+        with tracing.span("incremental rescore", metrics=",".join(metrics)):
+            for metric in metrics:
+                prepared = prepare_current(self.current[metric], metric)
+                ok = self._replace(metric, prepared)
+                for extra in schemas.SCHEMAS[metric].extras:
+                    if ok and (extra in prepared.columns or extra in self.df.columns):
+                        ok = self._replace(extra, prepared)
+                if ok and metric in PREVIOUS_METRICS:
+                    ok = self._replace(f"prev_{metric}", prepare_previous(self.current[metric], metric))
+                if not ok:
+                    print(f"  ↻ {metric}: full rebuild (new column or duplicate models)")
+                    self.rebuild()
+                    return
+
+            df = add_deltas(self.df)
+            affected = set(metrics)
+            for metric in metrics:
+                affected.update(DERIVED.get(metric, []))
+            for column in sorted(affected):
+                if column in df.columns:
+                    df[f"{column}_norm"] = normalize(df[column])
+            for column, (func, inputs) in SUB_SCORES.items():
+                if inputs & affected or column not in df.columns:
+                    df[column] = func(df)
+            df["model_score"] = df.apply(compute_model_score, axis=1)
+            self.df = df
+
+    def cis(self) -> float:
+        return compute_cis(self.df)
+
+    def models(self) -> list:
+        return snapshot_records(self.df)
+
+
+class Scheduler:
+    """Refresh loop: per-source cadences, provisional snapshots, epoch cuts."""
+
+    def __init__(self, cadences: dict = None, jitter: float = SCHEDULE_JITTER,
+                 epochs: str = SCHEDULE_EPOCHS, provisional_path: str = PROVISIONAL_PATH,
+                 registry_path: str = MODELS_REGISTRY_PATH):
+        self.cadences = dict(parse_cadences(SCHEDULE_CADENCES))
+        self.cadences.update(cadences or {})
+        self.jitter = jitter
+        self.epochs = epochs
+        self.provisional_path = provisional_path
+        self.registry_path = registry_path
+        self.refreshed = {}
+        self.due = {}
+        self.stop_event = threading.Event()
+        self.store = None
+        self._registry_mtime = None
+
+    def _next_due(self, source: str) -> float:
+        cadence = self.cadences[source]
+        return time.time() + cadence * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def _load_registry(self) -> list:
+        with open(self.registry_path, "r") as f:
+            registry = json.load(f)
+        self._registry_mtime = os.stat(self.registry_path).st_mtime_ns
+        return registry
+
+    def refresh(self, source: str) -> list:
+        """Fetch one source into the store; returns the metrics updated."""
+        fetch, metrics = SOURCES[source]
+        print(f"\n🔁 Refreshing {source}")
+        schemas.reset(metrics)
+        with tracing.span(f"refresh {source}", "source"):
+            value = fetch(self.store.registry)
+        self.refreshed[source] = datetime.utcnow().isoformat() + "Z"
+        return self.store.set_source(source, value)
+
+    def provisional(self) -> dict:
+        now = datetime.utcnow()
+        return {
+            # The epoch these values are heading for (cut at the next boundary)
+            "epoch_id": epoch_label(next_epoch_start(now, self.epochs), self.epochs),
+            "provisional": True,
+            "timestamp": now.isoformat() + "Z",
+            "cis": self.store.cis(),
+            "models": self.store.models(),
+            "engine_version": "1.0.0",
+            **index_fields(self.store.registry, self.store.df),
+            "refreshed": dict(sorted(self.refreshed.items())),
+            **resilience.snapshot_fields(),
+        }
+
+    def write_provisional(self) -> dict:
+        snapshot = self.provisional()
+        atomic_write(self.provisional_path, json.dumps(snapshot, indent=2, default=str).encode("utf-8"))
+        print(f"📈 Provisional CIS {snapshot['cis']:.4f} -> {self.provisional_path}")
+        return snapshot
+
+    def cut_epoch(self, epoch_id: str):
+        """Record the in-memory sources as an epoch, score it in full and publish it."""
+        timestamp = datetime.utcnow().isoformat() + "Z"
+        print(f"\n🗓️ Cutting epoch {epoch_id}")
+        archive.set_mode("record", epoch_id)
+        try:
+            archive.record("registry", self.store.registry)
+            for source, (_, metrics) in SOURCES.items():
+                if all(m in self.store.current for m in metrics):
+                    frames = {m: self.store.current[m] for m in metrics}
+                    archive.record(source, frames if len(metrics) > 1 else frames[metrics[0]])
+            snapshot = compute_snapshot(self.store.registry, self.store.current, self.store.previous(),
+                                        epoch_id, timestamp)
+            snapshot_hash = hash_dataset(snapshot)
+            print(f"Snapshot SHA256: {snapshot_hash}")
+            archive.write_index(epoch_id, timestamp, snapshot_sha256=snapshot_hash, **run_report_fields())
+            filepath = save_snapshot(snapshot, epoch_id, timestamp)
+            publish_epoch(snapshot, filepath, snapshot_hash, epoch_id)
+        finally:
+            archive.set_mode("off", epoch_id)
+        print(f"✅ Epoch {epoch_id} published")
+        return snapshot
+
+    def start(self):
+        """Load the registry, fetch every source once and score."""
+        # Refreshes are not archived; cut_epoch records what an epoch used
+        archive.set_mode("off", archive.get_settings()[1])
+        resilience.begin_epoch(0)
+        self.store = MetricStore(self._load_registry())
+        print(f"Loaded {len(self.store.registry)} models.")
+        for source in SOURCES:
+            self.refresh(source)
+            self.due[source] = self._next_due(source)
+        self.store.rebuild()
+        self.write_provisional()
+
+    def _check_registry(self):
+        try:
+            mtime = os.stat(self.registry_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._registry_mtime:
+            return
+        print("\n📝 Registry changed, reloading")
+        self.store.registry = self._load_registry()
+        self.store.rebuild()
+        # New models have no per-model data until these sources run again
+        for source in PER_MODEL_SOURCES:
+            self.due[source] = time.time()
+
+    def tick(self) -> float:
+        """Run whatever is due; returns seconds until the next due item."""
+        self._check_registry()
+        now = time.time()
+        for source in sorted(s for s, at in self.due.items() if at <= now):
+            try:
+                metrics = self.refresh(source)
+                self.store.update(metrics)
+                self.write_provisional()
+            except Exception as e:
+                print(f"❌ Refresh of {source} failed: {type(e).__name__}: {e}")
+            self.due[source] = self._next_due(source)
+
+        if time.time() >= self.next_cut.timestamp():
+            try:
+                self.cut_epoch(epoch_label(self.next_cut, self.epochs))
+            except Exception as e:
+                print(f"❌ Epoch cut failed: {type(e).__name__}: {e}")
+            self.next_cut = next_epoch_start(datetime.utcnow(), self.epochs)
+            tracing.export()
+        return max(min(min(self.due.values()), self.next_cut.timestamp()) - time.time(), 0.0)
+
+    def run(self, cut_now: bool = False):
+        self.start()
+        if cut_now:
+            self.cut_epoch(epoch_label(epoch_start(datetime.utcnow(), self.epochs), self.epochs))
+        self.next_cut = next_epoch_start(datetime.utcnow(), self.epochs)
+        print(f"⏰ Next epoch cut at {self.next_cut.isoformat()}Z; cadences: "
+              + ", ".join(f"{s}={c:.0f}s" for s, c in self.cadences.items()))
+        while not self.stop_event.is_set():
+            # Wake at least every minute to notice registry edits
+            self.stop_event.wait(min(self.tick(), 60.0))
+        print("👋 Scheduler stopped")
+
+    def stop(self):
+        self.stop_event.set()
+
+
+def run_scheduler(cadences: dict = None, epochs: str = None, jitter: float = None, cut_now: bool = False):
+    scheduler = Scheduler(cadences, SCHEDULE_JITTER if jitter is None else jitter, epochs or SCHEDULE_EPOCHS)
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: scheduler.stop())
+    try:
+        scheduler.run(cut_now)
+    finally:
+        resilience.end_epoch()
+        tracing.export()
@@ -3,6 +3,8 @@ from .adoption import compute_adoption_score
 from .momentum import compute_momentum_score
 from .cis import compute_model_score, compute_cis
 from .normalization import normalize
+from .indices import SubIndexEngine
+from .ranks import RankIndex
 
 __all__ = [
     'compute_intelligence_score',
@@ -10,5 +12,7 @@ __all__ = [
     'compute_momentum_score',
     'compute_model_score',
     'compute_cis',
-    'normalize'
+    'normalize',
+    'SubIndexEngine',
+    'RankIndex'
 ]
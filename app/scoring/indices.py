@@ -0,0 +1,152 @@
+"""
+Sub-indices: CIS-style aggregates of model_score over slices of the registry.
+
+Definitions are declarative (a JSON list, see AIGI_INDICES_PATH):
+
+    {"name": "tier-a", "where": {"tier": "A"}, "weighting": "equal"}
+    {"name": "open-weights", "where": {"open_weights": true}}
+    {"name": "provider", "group_by": "provider"}
+
+"where" keeps models whose registry field equals the value (or is one of
+a list of values). "group_by" expands to one index per distinct value,
+named "provider:meta-llama" etc. Besides the registry fields, models have
+"provider" (the registry provider, else the hf_repo organization) and
+"open_weights" (has an hf_repo). Weighting is "tier" (TIER_WEIGHTS split
+equally within each tier, as compute_cis does) or "equal" (mean score).
+
+Membership is precomputed once per registry as a sparse (CSR) matrix of
+model -> indices. Every index is then evaluated with one grouped
+reduction (np.bincount over index x tier), so fifty indices cost about
+the same as one. A frame read in chunks collects each chunk's rows()
+and reduces them once: adding per-chunk sums would round differently
+from evaluate() over the whole frame.
+"""
+
+import json
+import numpy as np
+import pandas as pd
+from ..config import TIER_WEIGHTS
+
+WEIGHTINGS = ("tier", "equal")
+
+
+def load_definitions(path: str) -> list:
+    with open(path, "r") as f:
+        definitions = json.load(f)
+    for definition in definitions:
+        if "name" not in definition:
+            raise ValueError(f"Index definition without a name: {definition}")
+        if definition.get("weighting", "tier") not in WEIGHTINGS:
+            raise ValueError(f"Unknown weighting for index {definition['name']}: {definition['weighting']}")
+    return definitions
+
+
+def model_attributes(registry: list) -> pd.DataFrame:
+    """Registry fields plus provider and open_weights, one row per model name."""
+    df = pd.DataFrame(registry).drop_duplicates("name").set_index("name")
+    hf_repo = df["hf_repo"].where(df["hf_repo"].notna() & (df["hf_repo"] != "None")) \
+        if "hf_repo" in df.columns else pd.Series(None, index=df.index, dtype=object)
+    organization = hf_repo.str.split("/").str[0]
+    df["provider"] = df["provider"].fillna(organization) if "provider" in df.columns else organization
+    df["open_weights"] = hf_repo.notna()
+    return df
+
+
+def _matches(column: pd.Series, expected) -> np.ndarray:
+    if isinstance(expected, list):
+        return column.isin(expected).to_numpy()
+    return (column == expected).to_numpy()
+
+
+def expand(definitions: list, attributes: pd.DataFrame) -> list:
+    """[(index name, membership mask over attributes rows, weighting)], group_by expanded."""
+    expanded = []
+    for definition in definitions:
+        mask = np.ones(len(attributes), dtype=bool)
+        for field, expected in definition.get("where", {}).items():
+            if field not in attributes.columns:
+                mask[:] = False
+                break
+            mask &= _matches(attributes[field], expected)
+        weighting = definition.get("weighting", "tier")
+        group_by = definition.get("group_by")
+        if group_by is None:
+            expanded.append((definition["name"], mask, weighting))
+            continue
+        if group_by not in attributes.columns:
+            continue
+        # Models outside the where filter (or without a value) get code -1
+        codes, values = pd.factorize(attributes[group_by].where(mask))
+        for code in sorted(range(len(values)), key=lambda k: str(values[k])):
+            expanded.append((f"{definition['name']}:{values[code]}", codes == code, weighting))
+    return expanded
+
+
+class SubIndexEngine:
+    """Evaluates every expanded index definition over scored frames of one registry."""
+
+    def __init__(self, definitions: list, registry: list):
+        attributes = model_attributes(registry)
+        expanded = expand(definitions, attributes)
+        self.names = [name for name, _, _ in expanded]
+        self.tier_weighted = np.array([weighting == "tier" for _, _, weighting in expanded], dtype=bool)
+        self.tiers = list(TIER_WEIGHTS)
+        self.tier_weights = np.array([TIER_WEIGHTS[t] for t in self.tiers], dtype=np.float64)
+        self.positions = pd.Series(np.arange(len(attributes)), index=attributes.index)
+
+        # CSR membership: row i's indices are members[indptr[i]:indptr[i + 1]]
+        rows = [np.flatnonzero(mask) for _, mask, _ in expanded]
+        cols = [np.full(len(r), k, dtype=np.int64) for k, r in enumerate(rows)]
+        rows = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+        cols = np.concatenate(cols) if cols else np.empty(0, dtype=np.int64)
+        order = np.argsort(rows, kind="stable")
+        self.members = cols[order]
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=len(attributes)))])
+
+    def rows(self, df: pd.DataFrame):
+        """(registry positions, tier codes, scores) of the rows of df that are registry models."""
+        positions = df["name"].map(self.positions).to_numpy()
+        known = ~pd.isna(positions)
+        positions = positions[known].astype(np.int64)
+        tier_codes = df["tier"].map({t: i for i, t in enumerate(self.tiers)}) \
+            .fillna(len(self.tiers)).to_numpy(dtype=np.int64)[known]
+        scores = np.nan_to_num(df["model_score"].to_numpy(dtype=np.float64)[known])
+        return positions, tier_codes, scores
+
+    def partial(self, df: pd.DataFrame):
+        """(sums, counts) of model_score per index and tier for the rows of df."""
+        return self.reduce(*self.rows(df))
+
+    def reduce(self, positions: np.ndarray, tier_codes: np.ndarray, scores: np.ndarray):
+        """(sums, counts) per index and tier from rows(); one pass, in row order."""
+        width = len(self.tiers) + 1  # last column: tiers without a weight
+
+        # Expand each row into one entry per index it belongs to
+        starts = self.indptr[positions]
+        lengths = self.indptr[positions + 1] - starts
+        row_of = np.repeat(np.arange(len(positions)), lengths)
+        offsets = np.arange(len(row_of)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        index_of = self.members[np.repeat(starts, lengths) + offsets]
+
+        keys = index_of * width + tier_codes[row_of]
+        size = len(self.names) * width
+        sums = np.bincount(keys, weights=scores[row_of], minlength=size).reshape(-1, width)
+        counts = np.bincount(keys, minlength=size).reshape(-1, width)
+        return sums, counts
+
+    def finish(self, sums: np.ndarray, counts: np.ndarray) -> dict:
+        """{index name: {"value": ..., "models": ...}} from (possibly accumulated) partials."""
+        tiers = len(self.tiers)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            tier_means = np.where(counts[:, :tiers] > 0, sums[:, :tiers] / counts[:, :tiers], 0.0)
+            weighted = tier_means @ self.tier_weights
+            equal = sums.sum(axis=1) / counts.sum(axis=1)
+        values = np.where(self.tier_weighted, weighted, equal)
+        models = counts.sum(axis=1)
+        return {
+            name: {"value": float(values[k]) if models[k] else None, "models": int(models[k])}
+            for k, name in enumerate(self.names)
+        }
+
+    def evaluate(self, df: pd.DataFrame) -> dict:
+        return self.finish(*self.partial(df))
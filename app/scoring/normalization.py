@@ -2,8 +2,10 @@ import pandas as pd
 
 def min_max_normalize(series: pd.Series) -> pd.Series:
     """Normalize series to [0,1] using min-max."""
-    min_val = series.min()
-    max_val = series.max()
+    return min_max_normalize_with(series, series.min(), series.max())
+
+def min_max_normalize_with(series: pd.Series, min_val, max_val) -> pd.Series:
+    """Min-max normalize using bounds computed elsewhere (e.g. across shards)."""
     if max_val == min_val:
         return pd.Series(0, index=series.index)
     return (series - min_val) / (max_val - min_val)
@@ -16,5 +18,21 @@ def z_score_normalize(series: pd.Series) -> pd.Series:
         return pd.Series(0, index=series.index)
     return (series - mean) / std
 
+def series_stats(series: pd.Series) -> dict:
+    """Partial statistics that can be combined across shards with merge_stats."""
+    return {"min": series.min(), "max": series.max(),
+            "sum": series.sum(), "count": int(series.count())}
+
+def merge_stats(parts: list) -> dict:
+    """Combine series_stats results; NaN bounds from empty parts are skipped."""
+    mins = [p["min"] for p in parts if pd.notna(p["min"])]
+    maxs = [p["max"] for p in parts if pd.notna(p["max"])]
+    return {
+        "min": min(mins) if mins else float("nan"),
+        "max": max(maxs) if maxs else float("nan"),
+        "sum": sum(p["sum"] for p in parts),
+        "count": sum(p["count"] for p in parts),
+    }
+
 # Choose your preferred method
 normalize = min_max_normalize
\ No newline at end of file
@@ -0,0 +1,255 @@
+"""
+Rank and percentile index over one epoch's model scores.
+
+Built once per epoch, so consumers never scan and sort snapshot["models"]:
+
+- order: rows by model_score, highest first (argsort); rows without a
+  score are unranked and left out.
+- tier_order / tier_ptr: the same per tier, as one array with offsets
+  (tier k is tier_order[tier_ptr[k]:tier_ptr[k + 1]]).
+- rank / tier_rank: competition ranks (ties share the best rank; 0 for
+  unranked) per row.
+- prev_rank / prev_tier_rank: the ranks the same model had in the prior
+  epoch (0 when it was absent), and mover_order: the rows ranked in both
+  epochs, ordered by places gained.
+- name_order: rows by name, for lookups.
+
+top(), rank_range(), percentile(), lookup() and movers() are binary
+searches plus slices: O(log n + K). The index is saved as a compressed
+.npz next to its snapshot (<snapshot>.ranks.npz) when the epoch is
+published, and rebuilt from the snapshot when missing or stale.
+"""
+
+import io
+import os
+import json
+import numpy as np
+from ..utils.manifest import load_manifest
+from ..utils.snapshot import atomic_write
+
+ARRAYS = ("names", "tiers", "scores", "order", "tier_names", "tier_ptr", "tier_order",
+          "rank", "tier_rank", "prev_rank", "prev_tier_rank", "mover_order", "name_order")
+
+
+def _competition_ranks(sorted_scores: np.ndarray) -> np.ndarray:
+    """Ranks of descending sorted scores, ties sharing the best rank."""
+    return np.searchsorted(-sorted_scores, -sorted_scores, side="left").astype(np.int32) + 1
+
+
+class RankIndex:
+    """Sorted views and ranks of one epoch; see the module docstring."""
+
+    def __init__(self, arrays: dict, meta: dict = None):
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+        self.meta = meta or {}
+        # Derived once per load; every query below is O(log n + K)
+        # Negated so the descending score order is ascending for searchsorted
+        self.sorted_keys = -self.scores[self.order]
+        self.sorted_rank = self.rank[self.order]
+        self.tier_sorted_keys = -self.scores[self.tier_order]
+        self.tier_sorted_rank = self.tier_rank[self.tier_order]
+        self.movers_lost = (self.rank - self.prev_rank)[self.mover_order]  # ascending
+        self.sorted_names = self.names[self.name_order]
+        self.tier_of = {str(tier): k for k, tier in enumerate(self.tier_names)}
+
+    @classmethod
+    def build(cls, names, tiers, scores, previous: "RankIndex" = None, meta: dict = None) -> "RankIndex":
+        names = np.asarray(names, dtype=str)
+        tiers = np.asarray(tiers, dtype=str)
+        scores = np.asarray(scores, dtype=np.float64)
+        ranked = np.flatnonzero(~np.isnan(scores))
+        order = ranked[np.argsort(-scores[ranked], kind="stable")]
+
+        rank = np.zeros(len(names), dtype=np.int32)
+        rank[order] = _competition_ranks(scores[order])
+
+        # Per-tier orders: a stable regroup of the global order keeps each tier sorted
+        tier_names = np.unique(tiers[order]) if len(order) else np.array([], dtype=str)
+        codes = np.searchsorted(tier_names, tiers[order])
+        tier_order = order[np.argsort(codes, kind="stable")]
+        tier_ptr = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(tier_names)))])
+        tier_rank = np.zeros(len(names), dtype=np.int32)
+        for k in range(len(tier_names)):
+            rows = tier_order[tier_ptr[k]:tier_ptr[k + 1]]
+            tier_rank[rows] = _competition_ranks(scores[rows])
+
+        name_order = np.argsort(names, kind="stable")
+        prev_rank = np.zeros(len(names), dtype=np.int32)
+        prev_tier_rank = np.zeros(len(names), dtype=np.int32)
+        if previous is not None:
+            rows = previous.rows(names)
+            found = rows >= 0
+            prev_rank[found] = previous.rank[rows[found]]
+            prev_tier_rank[found] = previous.tier_rank[rows[found]]
+        both = np.flatnonzero((rank > 0) & (prev_rank > 0))
+        gained = prev_rank[both] - rank[both]
+        # Most places gained first; ties by current rank
+        mover_order = both[np.lexsort((rank[both], -gained))]
+
+        arrays = {
+            "names": names, "tiers": tiers, "scores": scores, "order": order.astype(np.int64),
+            "tier_names": tier_names, "tier_ptr": tier_ptr.astype(np.int64),
+            "tier_order": tier_order.astype(np.int64), "rank": rank, "tier_rank": tier_rank,
+            "prev_rank": prev_rank, "prev_tier_rank": prev_tier_rank,
+            "mover_order": mover_order.astype(np.int64), "name_order": name_order.astype(np.int64),
+        }
+        meta = dict(meta or {})
+        if previous is not None:
+            meta["previous_epoch_id"] = previous.meta.get("epoch_id")
+        return cls(arrays, meta)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict, previous: "RankIndex" = None) -> "RankIndex":
+        models = snapshot.get("models", [])
+        return cls.build([str(m.get("name")) for m in models], [str(m.get("tier")) for m in models],
+                         [m.get("model_score") for m in models], previous,
+                         {"epoch_id": snapshot.get("epoch_id"), "timestamp": snapshot.get("timestamp")})
+
+    # -- Persistence --------------------------------------------------------
+
+    def to_bytes(self) -> bytes:
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, meta=np.array(json.dumps(self.meta)),
+                            **{name: getattr(self, name) for name in ARRAYS})
+        return buffer.getvalue()
+
+    @classmethod
+    def load(cls, path: str) -> "RankIndex":
+        with np.load(path) as data:
+            return cls({name: data[name] for name in ARRAYS}, json.loads(str(data["meta"])))
+
+    # -- Queries ------------------------------------------------------------
+
+    def rows(self, names) -> np.ndarray:
+        """Row of each name (first occurrence), -1 where absent."""
+        names = np.asarray(names, dtype=str)
+        if not len(self.sorted_names):
+            return np.full(len(names), -1, dtype=np.int64)
+        at = np.minimum(np.searchsorted(self.sorted_names, names), len(self.sorted_names) - 1)
+        return np.where(self.sorted_names[at] == names, self.name_order[at], -1)
+
+    def _segment(self, tier: str = None):
+        """(rows by score, their negated scores, their ranks) for all models or one tier."""
+        if tier is None:
+            return self.order, self.sorted_keys, self.sorted_rank
+        k = self.tier_of.get(str(tier))
+        lo, hi = (self.tier_ptr[k], self.tier_ptr[k + 1]) if k is not None else (0, 0)
+        return self.tier_order[lo:hi], self.tier_sorted_keys[lo:hi], self.tier_sorted_rank[lo:hi]
+
+    def entry(self, row: int) -> dict:
+        rank, prev_rank = int(self.rank[row]), int(self.prev_rank[row])
+        score = float(self.scores[row])
+        return {
+            "name": str(self.names[row]),
+            "tier": str(self.tiers[row]),
+            "model_score": None if score != score else score,
+            "rank": rank or None,
+            "tier_rank": int(self.tier_rank[row]) or None,
+            "prev_rank": prev_rank or None,
+            "rank_change": prev_rank - rank if rank and prev_rank else None,
+        }
+
+    def top(self, k: int = 10, tier: str = None) -> list:
+        rows, _, _ = self._segment(tier)
+        return [self.entry(row) for row in rows[:max(k, 0)]]
+
+    def rank_range(self, start: int, end: int, tier: str = None, limit: int = None) -> list:
+        """Models ranked start..end (inclusive, 1 = best), globally or within a tier; at most limit."""
+        rows, _, ranks = self._segment(tier)
+        # Bounds in the array's dtype, so searchsorted does not convert the array
+        lo = np.searchsorted(ranks, ranks.dtype.type(start), side="left")
+        hi = np.searchsorted(ranks, ranks.dtype.type(end), side="right")
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        return [self.entry(row) for row in rows[lo:hi]]
+
+    def percentile(self, name: str, tier: bool = False):
+        """Share of the other ranked models (in its tier with tier=True) scoring lower, 0-100."""
+        row = int(self.rows([name])[0])
+        if row < 0 or not self.rank[row]:
+            return None
+        rows, keys, _ = self._segment(str(self.tiers[row]) if tier else None)
+        if len(rows) == 1:
+            return 100.0
+        at_least = np.searchsorted(keys, -self.scores[row], side="right")
+        return float(100.0 * (len(rows) - at_least) / (len(rows) - 1))
+
+    def lookup(self, name: str):
+        """Ranks, change and percentiles of one model, or None."""
+        row = int(self.rows([name])[0])
+        if row < 0:
+            return None
+        entry = self.entry(row)
+        entry["percentile"] = self.percentile(name)
+        entry["tier_percentile"] = self.percentile(name, tier=True)
+        return entry
+
+    def movers(self, k: int = 10, down: bool = False) -> list:
+        """Models that gained (or with down=True, lost) the most places since the prior epoch."""
+        k, zero = max(k, 0), self.movers_lost.dtype.type(0)
+        if down:
+            lost = len(self.mover_order) - np.searchsorted(self.movers_lost, zero, side="right")
+            rows = self.mover_order[::-1][:min(k, lost)]
+        else:
+            rows = self.mover_order[:min(k, np.searchsorted(self.movers_lost, zero, side="left"))]
+        return [self.entry(row) for row in rows]
+
+
+# -- Sidecar files -----------------------------------------------------------
+
+def rank_path(snapshot_path: str) -> str:
+    return os.path.splitext(snapshot_path)[0] + ".ranks.npz"
+
+
+def _signature(path: str) -> list:
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def previous_snapshot(snapshot_dir: str, epoch_id: str, timestamp: str, manifest_path: str = None):
+    """Path of the latest published snapshot before (epoch_id, timestamp), or None."""
+    candidates = [
+        (str(entry.get("timestamp")), entry["snapshot"])
+        for entry in load_manifest(manifest_path).values()
+        if entry.get("snapshot") and entry.get("epoch_id") != epoch_id
+        and str(entry.get("timestamp")) < str(timestamp)
+    ]
+    for _, name in sorted(candidates, reverse=True):
+        path = os.path.join(snapshot_dir, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def load_or_build(snapshot_path: str, snapshot: dict = None, previous=None) -> RankIndex:
+    """
+    The saved index of a snapshot file when it is current, else one built
+    from the snapshot against previous (a snapshot path, dict or RankIndex).
+    """
+    path = rank_path(snapshot_path)
+    if os.path.exists(path):
+        try:
+            index = RankIndex.load(path)
+            if index.meta.get("signature") == _signature(snapshot_path):
+                return index
+        except (OSError, ValueError, KeyError):
+            pass
+    if snapshot is None or not isinstance(snapshot.get("models"), list):
+        with open(snapshot_path, "r") as f:
+            snapshot = json.load(f)
+    if isinstance(previous, str):
+        previous = load_or_build(previous)
+    elif isinstance(previous, dict):
+        previous = RankIndex.from_snapshot(previous)
+    index = RankIndex.from_snapshot(snapshot, previous)
+    index.meta["signature"] = _signature(snapshot_path)
+    return index
+
+
+def write_ranks(snapshot_path: str, snapshot: dict = None, previous=None) -> str:
+    """Save the index of a snapshot file next to it; returns the sidecar path."""
+    index = load_or_build(snapshot_path, snapshot, previous)
+    path = rank_path(snapshot_path)
+    atomic_write(path, index.to_bytes())
+    return path
@@ -0,0 +1,7 @@
+from .store import SnapshotStore
+from .server import serve
+
+__all__ = [
+    'SnapshotStore',
+    'serve'
+]
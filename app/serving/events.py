@@ -0,0 +1,114 @@
+"""
+Server-sent events for snapshot changes.
+
+When the store reloads with a new epoch or a new provisional snapshot,
+one compact delta event is built and appended to a shared ring buffer
+already encoded as an SSE frame:
+
+    id: 42
+    event: epoch
+    data: {"cis":7.21,"cis_delta":0.03,"epoch_id":"2026-05","sha256":"...",
+           "changed":[{"name":"gpt-4","score":61.2,"delta":-0.4}],"removed":[]}
+
+Every subscriber reads the same frames from the buffer, so an event is
+serialized once however many clients listen. A client reconnecting with
+Last-Event-ID gets the events it missed while they are still buffered,
+otherwise a "reset" event telling it to refetch /latest.
+"""
+
+import json
+import threading
+from collections import deque
+from ..config import SSE_BUFFER_SIZE, SSE_THRESHOLD
+
+RESET_FRAME = b"event: reset\ndata: {}\n\n"
+KEEPALIVE_FRAME = b": keepalive\n\n"
+
+
+class Broadcaster:
+    """Ring buffer of encoded SSE frames shared by all subscribers."""
+
+    def __init__(self, size: int = SSE_BUFFER_SIZE):
+        self._frames = deque(maxlen=max(1, size))  # (event id, frame bytes)
+        self._next_id = 1
+        self._cond = threading.Condition()
+        self.closed = False
+
+    @property
+    def head(self) -> int:
+        """Id of the newest event (0 before the first one)."""
+        with self._cond:
+            return self._next_id - 1
+
+    def publish(self, event: str, payload: dict) -> int:
+        data = json.dumps(payload, separators=(",", ":"), sort_keys=True, default=str)
+        with self._cond:
+            event_id = self._next_id
+            self._next_id += 1
+            self._frames.append((event_id, f"id: {event_id}\nevent: {event}\ndata: {data}\n\n".encode("utf-8")))
+            self._cond.notify_all()
+        return event_id
+
+    def read(self, after: int, timeout: float = None):
+        """
+        Frames newer than event id after, waiting up to timeout for one.
+        Returns (frames, new cursor, missed) where missed means events after
+        the cursor already left the buffer (or the id is from another run).
+        """
+        with self._cond:
+            if after >= self._next_id:
+                return [], self._next_id - 1, True
+            if after == self._next_id - 1 and not self.closed:
+                self._cond.wait(timeout)
+            head = self._next_id - 1
+            if after >= head:
+                return [], head, False
+            oldest = self._frames[0][0] if self._frames else self._next_id
+            frames = [frame for event_id, frame in self._frames if event_id > after]
+            return frames, head, after + 1 < oldest
+
+    def close(self):
+        """Wake every subscriber so its stream can end."""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+def _scores(snapshot: dict) -> dict:
+    return {str(m.get("name")): m.get("model_score") for m in (snapshot or {}).get("models", [])}
+
+
+def snapshot_delta(old: dict, new: dict, sha256: str, threshold: float = SSE_THRESHOLD) -> dict:
+    """Compact change set between two snapshots: CIS, hash and models that moved by threshold or more."""
+    before, after = _scores(old), _scores(new)
+    changed = []
+    for name, score in after.items():
+        previous = before.get(name)
+        if previous is None or score is None:
+            if previous != score:
+                changed.append({"name": name, "score": score, "delta": None})
+        elif abs(score - previous) >= threshold:
+            changed.append({"name": name, "score": score, "delta": score - previous})
+    old_cis = (old or {}).get("cis")
+    return {
+        "epoch_id": new.get("epoch_id"),
+        "timestamp": new.get("timestamp"),
+        "cis": new.get("cis"),
+        "cis_delta": new["cis"] - old_cis if old_cis is not None and new.get("cis") is not None else None,
+        "sha256": sha256,
+        "changed": changed,
+        "removed": sorted(set(before) - set(after)),
+    }
+
+
+def catalog_listener(broadcaster: Broadcaster, threshold: float = SSE_THRESHOLD):
+    """SnapshotStore.on_reload listener publishing epoch and provisional events."""
+    def on_reload(old, new):
+        if new.latest is not None and new.latest_sha256 != old.latest_sha256:
+            broadcaster.publish("epoch", snapshot_delta(old.latest, new.latest, new.latest_sha256, threshold))
+        if new.provisional is not None and new.provisional[1] != (old.provisional or (None, None))[1]:
+            snapshot, sha256 = new.provisional
+            # Relative to the previous provisional values, or the latest epoch
+            base = old.provisional[0] if old.provisional is not None else new.latest
+            broadcaster.publish("provisional", snapshot_delta(base, snapshot, sha256, threshold))
+    return on_reload
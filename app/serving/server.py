@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Read API for published snapshots.
+
+Endpoints: /latest, /epochs, /epochs/{id}, /models/{name}, /cis/history,
+/provisional (when the scheduler is running), /events (server-sent events)
+
+Rank queries on the latest epoch (answered from its RankIndex):
+/ranks/top?k=10&tier=B, /ranks/range?start=11&end=20&tier=B,
+/ranks/movers?k=10&direction=down, /ranks/models/{name}
+"""
+
+import os
+import sys
+import json
+import argparse
+from urllib.parse import parse_qs, unquote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.config import API_HOST, API_PORT, API_RELOAD_INTERVAL, SSE_KEEPALIVE
+from app.serving.store import SnapshotStore
+from app.serving.events import Broadcaster, catalog_listener, RESET_FRAME, KEEPALIVE_FRAME
+
+NOT_FOUND = json.dumps({"error": "not found"}).encode("utf-8")
+# Most models a single rank query returns
+RANK_QUERY_LIMIT = 1000
+
+
+def rank_query(ranks, path: str, query: str):
+    """(status, payload) for a /ranks request against the latest epoch's RankIndex."""
+    if ranks is None:
+        return 404, {"error": "not found"}
+    header = {"epoch_id": ranks.meta.get("epoch_id"), "previous_epoch_id": ranks.meta.get("previous_epoch_id")}
+    if path.startswith("/ranks/models/"):
+        model = ranks.lookup(unquote(path[len("/ranks/models/"):]))
+        return (200, {**header, "model": model}) if model is not None else (404, {"error": "not found"})
+    params = {key: values[-1] for key, values in parse_qs(query).items()}
+    try:
+        k = min(int(params.get("k", 10)), RANK_QUERY_LIMIT)
+        tier = params.get("tier")
+        if path == "/ranks/top":
+            results = ranks.top(k, tier)
+        elif path == "/ranks/range":
+            start = int(params["start"])
+            results = ranks.rank_range(start, int(params.get("end", start)), tier, RANK_QUERY_LIMIT)
+        elif path == "/ranks/movers":
+            if params.get("direction", "up") not in ("up", "down"):
+                raise ValueError("direction must be up or down")
+            results = ranks.movers(k, params.get("direction") == "down")
+        else:
+            return 404, {"error": "not found"}
+    except (KeyError, ValueError) as e:
+        return 400, {"error": f"bad query: {e}"}
+    return 200, {**header, "results": results}
+
+
+def _accepted_encodings(header: str):
+    accepted = set()
+    for part in (header or "").split(","):
+        token, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        accepted.add(token.strip().lower())
+    return accepted
+
+
+def _choose_encoding(resource, header: str) -> str:
+    accepted = _accepted_encodings(header)
+    for encoding in ("br", "gzip"):
+        if encoding in resource.bodies and (encoding in accepted or "*" in accepted):
+            return encoding
+    return "identity"
+
+
+def _etag_matches(resource, header: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return any(etag in tags for etag in resource.etags.values())
+
+
+class SnapshotRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; avoid Nagle stalls on keep-alive
+    disable_nagle_algorithm = True
+    server_version = "AIGI-Read-API/1.0"
+    store = None
+    events = None
+    access_log = False
+
+    def _send(self, status: int, headers: dict, body: bytes = b""):
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _stream_events(self):
+        """Hold the connection open and write new event frames as they arrive."""
+        try:
+            cursor = int(self.headers.get("Last-Event-ID"))
+        except (TypeError, ValueError):
+            cursor = None
+        self.close_connection = True
+        self._send(200, {"Content-Type": "text/event-stream", "Cache-Control": "no-cache",
+                         "X-Accel-Buffering": "no", "Connection": "close"})
+        if self.command == "HEAD":
+            return
+        if cursor is None:
+            cursor = self.events.head
+        try:
+            self.wfile.write(b"retry: 5000\n\n")
+            while not self.events.closed:
+                frames, cursor, missed = self.events.read(cursor, SSE_KEEPALIVE)
+                if missed:
+                    frames = [RESET_FRAME] + frames
+                self.wfile.write(b"".join(frames) or KEEPALIVE_FRAME)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def do_GET(self):
+        path, _, query = self.path.partition("?")
+        path = path.rstrip("/") or "/"
+        if path == "/events" and self.events is not None:
+            self._stream_events()
+            return
+        if path.startswith("/ranks/"):
+            status, payload = rank_query(self.store.catalog.ranks, path, query)
+            body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+            self._send(status, {"Content-Type": "application/json", "Content-Length": str(len(body)),
+                                "Cache-Control": "no-cache"}, body)
+            return
+        resource = self.store.get(path)
+        if resource is None:
+            self._send(404, {"Content-Type": "application/json",
+                             "Content-Length": str(len(NOT_FOUND))}, NOT_FOUND)
+            return
+
+        encoding = _choose_encoding(resource, self.headers.get("Accept-Encoding"))
+        headers = {
+            "ETag": resource.etags[encoding],
+            "Vary": "Accept-Encoding",
+            "Cache-Control": "public, max-age=31536000, immutable" if resource.immutable
+                             else "no-cache",
+        }
+        if resource.dataset_sha256:
+            # hash_dataset of the snapshot, not the SHA-256 of the body bytes
+            headers["X-Dataset-SHA256"] = resource.dataset_sha256
+        if _etag_matches(resource, self.headers.get("If-None-Match")):
+            headers["Content-Length"] = "0"
+            self._send(304, headers)
+            return
+
+        body = resource.bodies[encoding]
+        headers["Content-Type"] = "application/json"
+        headers["Content-Length"] = str(len(body))
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        self._send(200, headers, body)
+
+    do_HEAD = do_GET
+
+    def log_message(self, format, *args):
+        if self.access_log:
+            super().log_message(format, *args)
+
+
+class APIServer(ThreadingHTTPServer):
+    # Event subscribers connect in bursts (e.g. all reconnecting after a restart)
+    request_queue_size = 1024
+
+
+def make_server(store: SnapshotStore, host: str = None, port: int = None,
+                handler=SnapshotRequestHandler, events: Broadcaster = None):
+    """Create a threaded HTTP server bound to the given store (and event feed)."""
+    handler_cls = type("BoundSnapshotRequestHandler", (handler,), {"store": store, "events": events})
+    server = APIServer((host or API_HOST, API_PORT if port is None else port), handler_cls)
+    server.daemon_threads = True
+    return server
+
+
+def serve(host: str = None, port: int = None, snapshot_dir: str = None,
+          reload_interval: float = None, access_log: bool = False):
+    store = SnapshotStore(snapshot_dir)
+    catalog = store.load()
+    print(f"📦 Loaded {len(catalog.epoch_ids)} epoch(s)")
+    # Registered after the first load: only changes from here on are events
+    events = Broadcaster()
+    store.on_reload(catalog_listener(events))
+    store.watch(API_RELOAD_INTERVAL if reload_interval is None else reload_interval)
+
+    server = make_server(store, host, port, events=events)
+    server.RequestHandlerClass.access_log = access_log
+    print(f"🌐 Serving snapshots on http://{server.server_address[0]}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        store.stop()
+        events.close()
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve AIGI snapshots over HTTP")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--dir", default=None, help="Snapshot directory")
+    parser.add_argument("--reload-interval", type=float, default=API_RELOAD_INTERVAL)
+    parser.add_argument("--access-log", action="store_true")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.dir, args.reload_interval, args.access_log)
+
+
+if __name__ == "__main__":
+    main()
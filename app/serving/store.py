@@ -0,0 +1,221 @@
+"""
+In-memory catalog of published snapshots.
+
+Every response body is serialized and compressed once when an epoch is
+loaded; requests are served by a single dict lookup.
+"""
+
+import os
+import gzip
+import json
+import hashlib
+import threading
+from urllib.parse import quote
+from ..config import SNAPSHOT_DIR, MANIFEST_PATH, PROVISIONAL_PATH, AUDIT_DIGESTS_PATH
+from ..utils.hashing import hash_dataset
+from ..utils.manifest import load_manifest
+from ..scoring.ranks import load_or_build
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Files in the snapshot directory that are not epoch snapshots
+NON_SNAPSHOT_FILES = {"latest.json", os.path.basename(PROVISIONAL_PATH), os.path.basename(AUDIT_DIGESTS_PATH)}
+
+
+class Resource:
+    """
+    A pre-encoded response body with its strong validators. dataset_sha256
+    is the hash_dataset of a snapshot payload (not of the body bytes), None
+    for other resources.
+    """
+
+    __slots__ = ("sha256", "dataset_sha256", "bodies", "etags", "immutable")
+
+    def __init__(self, payload, sha256: str = None, immutable: bool = False):
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        self.sha256 = sha256 or hashlib.sha256(body).hexdigest()
+        self.dataset_sha256 = sha256
+        self.immutable = immutable
+        self.bodies = {
+            "identity": body,
+            "gzip": gzip.compress(body, compresslevel=9, mtime=0),
+        }
+        if brotli is not None:
+            self.bodies["br"] = brotli.compress(body, quality=11)
+        # Each representation gets its own strong ETag
+        self.etags = {
+            encoding: f'"{self.sha256}"' if encoding == "identity" else f'"{self.sha256}+{encoding}"'
+            for encoding in self.bodies
+        }
+
+
+class Catalog:
+    """Immutable view of all epochs; swapped wholesale on reload."""
+
+    def __init__(self, epochs, provisional=None, ranks=None):
+        # epochs: list of (snapshot dict, sha256) sorted oldest first
+        self.resources = {}
+        self.provisional = provisional
+        # RankIndex of the latest epoch, for the /ranks queries
+        self.ranks = ranks
+        if provisional is not None:
+            # Written by the scheduler between epochs; never cacheable
+            self.resources["/provisional"] = Resource(*provisional)
+        self.epoch_ids = []
+        history = []
+        for snapshot, sha256 in epochs:
+            epoch_id = snapshot.get("epoch_id")
+            self.epoch_ids.append(epoch_id)
+            self.resources[f"/epochs/{quote(str(epoch_id), safe='')}"] = Resource(
+                snapshot, sha256, immutable=True)
+            history.append({
+                "epoch_id": epoch_id,
+                "timestamp": snapshot.get("timestamp"),
+                "cis": snapshot.get("cis"),
+                "sha256": sha256,
+            })
+
+        self.resources["/epochs"] = Resource(self.epoch_ids)
+        self.resources["/cis/history"] = Resource(history)
+
+        self.latest = epochs[-1][0] if epochs else None
+        self.latest_sha256 = epochs[-1][1] if epochs else None
+        if self.latest is not None:
+            self.resources["/latest"] = Resource(self.latest, epochs[-1][1])
+            for model in self.latest.get("models", []):
+                name = str(model.get("name"))
+                self.resources[f"/models/{quote(name, safe='')}"] = Resource({
+                    "epoch_id": self.latest.get("epoch_id"),
+                    "timestamp": self.latest.get("timestamp"),
+                    "model": model,
+                })
+
+    def get(self, path: str):
+        return self.resources.get(path)
+
+
+class SnapshotStore:
+    """
+    Loads snapshots from the epochs directory and hot-reloads when a new
+    epoch lands. Parsed files are cached by (mtime, size) across reloads.
+    """
+
+    def __init__(self, snapshot_dir: str = None, manifest_path: str = None):
+        self.snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+        self.manifest_path = manifest_path or MANIFEST_PATH
+        self.catalog = Catalog([])
+        self._files = {}
+        self._signature = None
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _stat_signature(self):
+        parts = []
+        for path in (self.snapshot_dir, self.manifest_path):
+            try:
+                st = os.stat(path)
+                parts.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                parts.append(None)
+        return tuple(parts)
+
+    def _load_file(self, path: str, manifest: dict):
+        st = os.stat(path)
+        key = (st.st_mtime_ns, st.st_size)
+        cached = self._files.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+        with open(path, "r") as f:
+            snapshot = json.load(f)
+        if not isinstance(snapshot, dict) or "epoch_id" not in snapshot or "models" not in snapshot:
+            entry = None
+        else:
+            recorded = manifest.get(snapshot["epoch_id"], {}).get("sha256")
+            entry = (snapshot, recorded or hash_dataset(snapshot))
+        self._files[path] = (key, entry)
+        return entry
+
+    def load(self) -> Catalog:
+        """Rebuild the catalog from disk and swap it in."""
+        with self._lock:
+            signature = self._stat_signature()
+            manifest = load_manifest(self.manifest_path)
+            epochs, paths = {}, {}
+            if os.path.isdir(self.snapshot_dir):
+                for name in sorted(os.listdir(self.snapshot_dir)):
+                    # Dotfiles are in-flight atomic writes
+                    if (not name.endswith(".json") or name.startswith(".")
+                            or name in NON_SNAPSHOT_FILES):
+                        continue
+                    path = os.path.join(self.snapshot_dir, name)
+                    try:
+                        entry = self._load_file(path, manifest)
+                    except (OSError, ValueError) as e:
+                        print(f"⚠️ Skipping {name}: {e}")
+                        continue
+                    if entry is None:
+                        continue
+                    snapshot, _ = entry
+                    current = epochs.get(snapshot["epoch_id"])
+                    if current is None or str(snapshot.get("timestamp")) >= str(current[0].get("timestamp")):
+                        epochs[snapshot["epoch_id"]] = entry
+                        paths[snapshot["epoch_id"]] = path
+
+            provisional = None
+            provisional_path = os.path.join(self.snapshot_dir, os.path.basename(PROVISIONAL_PATH))
+            if os.path.exists(provisional_path):
+                try:
+                    provisional = self._load_file(provisional_path, {})
+                except (OSError, ValueError) as e:
+                    print(f"⚠️ Skipping provisional snapshot: {e}")
+
+            ordered = sorted(epochs.values(), key=lambda e: str(e[0].get("timestamp")))
+            ranks = None
+            if ordered:
+                latest = ordered[-1][0]
+                try:
+                    ranks = load_or_build(paths[latest["epoch_id"]], latest,
+                                          ordered[-2][0] if len(ordered) > 1 else None)
+                except (OSError, ValueError) as e:
+                    print(f"⚠️ No rank index for {latest['epoch_id']}: {e}")
+            previous = self.catalog
+            self.catalog = Catalog(ordered, provisional, ranks)
+            self._signature = signature
+
+        for listener in list(self._listeners):
+            listener(previous, self.catalog)
+        return self.catalog
+
+    def on_reload(self, listener):
+        """Register listener(old_catalog, new_catalog) called after each load."""
+        self._listeners.append(listener)
+
+    def reload_if_changed(self) -> bool:
+        if self._stat_signature() != self._signature:
+            self.load()
+            return True
+        return False
+
+    def watch(self, interval: float):
+        """Poll for new epochs on a daemon thread."""
+        def _run():
+            while not self._stop.wait(interval):
+                try:
+                    if self.reload_if_changed():
+                        print(f"🔄 Reloaded {len(self.catalog.epoch_ids)} epoch(s)")
+                except Exception as e:
+                    print(f"⚠️ Reload failed: {e}")
+
+        thread = threading.Thread(target=_run, name="snapshot-watch", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+
+    def get(self, path: str):
+        return self.catalog.get(path)
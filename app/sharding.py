@@ -0,0 +1,237 @@
+"""
+Two-phase sharded pipeline for very large registries.
+
+Phase one splits the registry into contiguous shards. Each worker fetches
+the per-model sources for its shard (the arena and benchmark leaderboards
+are fetched once and filtered), merges, spills the merged frame to disk
+and returns per-metric min/max/sum/count and per-tier counts. A reduce
+turns those into global normalization bounds. Phase two normalizes and
+scores each shard with the global bounds and returns only the snapshot
+columns; CIS is computed over the shard results concatenated in registry
+order, so the snapshot is identical to the single-process one.
+
+Per-model fetches stay in the workers (their records are archived per
+shard, which replay relies on), so every worker has its own per-host
+HTTP controllers. Each worker takes 1/workers of every host's
+concurrency and remaining quota (http_client.set_share): the workers
+running at once together keep to HTTP_MAX_CONCURRENCY and pace the
+GitHub quota as a single process would.
+"""
+
+import io
+import os
+import time
+import shutil
+import tempfile
+import warnings
+import contextlib
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+from .data_sources import archive, http_client, resilience, schemas, fetch_arena_scores, fetch_hf_downloads, fetch_github_stats, fetch_citations
+from .data_sources.benchmarks import fetch_all_benchmarks
+from .scoring import normalization
+from .scoring.cis import compute_cis
+from .scoring.normalization import series_stats, merge_stats
+from .utils import tracing
+
+# Sources fetched model by model, so each shard fetches its own slice
+PER_MODEL_SOURCES = {
+    "downloads": fetch_hf_downloads,
+    "github": fetch_github_stats,
+    "citations": fetch_citations,
+}
+# Same set main.fetch_all_data() copies into previous
+PREVIOUS_SOURCES = ("arena", "mmlu", "gsm8k", "humaneval", "downloads", "citations")
+
+
+def partition(registry: list, shards: int) -> list:
+    """Split the registry into contiguous, near-equal parts."""
+    shards = max(1, min(shards, len(registry)))
+    size, extra = divmod(len(registry), shards)
+    parts, start = [], 0
+    for i in range(shards):
+        end = start + size + (1 if i < extra else 0)
+        parts.append(registry[start:end])
+        start = end
+    return parts
+
+
+def split_sources(sources: dict, parts: list) -> list:
+    """
+    Split each source frame into one slice per shard, keeping row order.
+    Rows go to every shard holding their model name (names can repeat in
+    the registry); rows for unknown models are dropped as the merge would.
+    """
+    owners = {}
+    for i, part in enumerate(parts):
+        for model in part:
+            shards = owners.setdefault(str(model["name"]), [])
+            if not shards or shards[-1] != i:
+                shards.append(i)
+    shared = {name: shards for name, shards in owners.items() if len(shards) > 1}
+    first = {name: shards[0] for name, shards in owners.items()}
+
+    slices = [{} for _ in parts]
+    for source, frame in sources.items():
+        if "model" not in frame.columns:
+            for shard in slices:
+                shard[source] = frame
+            continue
+        # Same str keys merge_dataframes joins on
+        keys = frame["model"].astype(str)
+        rows = pd.Series(np.arange(len(frame)))
+        # Unknown models map to NaN and are dropped by groupby
+        positions = {int(i): [idx] for i, idx in rows.groupby(keys.map(first).values).indices.items()}
+        if shared:
+            shared_rows = np.flatnonzero(keys.isin(shared.keys()).values)
+            for name, idx in rows[shared_rows].groupby(keys.values[shared_rows]).indices.items():
+                for i in shared[name][1:]:
+                    positions.setdefault(i, []).append(shared_rows[idx])
+        for i, shard in enumerate(slices):
+            picked = positions.get(i)
+            picked = np.sort(np.concatenate(picked)) if picked else np.array([], dtype=int)
+            shard[source] = frame.iloc[picked]
+    return slices
+
+
+def _phase_one(shard: int, shards: int, part: list, current: dict, previous: dict,
+               spill_dir: str, archive_state: tuple) -> dict:
+    from .main import merge_dataframes, NORMALIZED_METRICS
+
+    mode, epoch_id, archive_dir = archive_state
+    archive.set_mode(mode, epoch_id, archive_dir)
+    archive.set_shard(f"shard-{shard:04d}-of-{shards:04d}")
+    # Workers may have inherited (or already reported) counts
+    schemas.reset()
+    with contextlib.redirect_stdout(io.StringIO()):
+        current, previous = dict(current), dict(previous)
+        for source, fetch in PER_MODEL_SOURCES.items():
+            if source in current:
+                continue
+            frame = fetch(registry=part)
+            if "model" not in frame.columns:
+                # A shard with no repos of this kind gets an empty frame with no columns
+                frame = pd.DataFrame(columns=["model", source])
+            current[source] = frame
+            if source in PREVIOUS_SOURCES:
+                previous[source] = frame.copy()
+        df = merge_dataframes(part, current, previous)
+
+    path = os.path.join(spill_dir, f"shard-{shard:04d}.pkl")
+    df.to_pickle(path)
+    return {
+        "shard": shard,
+        "path": path,
+        "rows": len(df),
+        "stats": {col: series_stats(df[col]) for col in NORMALIZED_METRICS if col in df.columns},
+        "tiers": df["tier"].value_counts().to_dict() if "tier" in df.columns else {},
+        "recorded": archive.recorded(),
+        "stale": resilience.stale_sources() if mode != "replay" else {},
+        "rejected": schemas.rejections(),
+    }
+
+
+def _phase_two(path: str, bounds: dict) -> pd.DataFrame:
+    from .main import normalize_all, score_all, snapshot_columns
+
+    df = pd.read_pickle(path)
+    os.unlink(path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = score_all(normalize_all(df, bounds))
+    return df[snapshot_columns(df)]
+
+
+def compute_snapshot_sharded(registry: list, current: dict, previous: dict, epoch_id: str,
+                             timestamp: str = None, shards: int = 4, workers: int = None,
+                             spill_dir: str = None) -> dict:
+    """
+    Sharded equivalent of main.compute_snapshot. Per-model sources missing
+    from current are fetched inside the shard workers.
+    """
+    from .main import index_fields, snapshot_records
+
+    if normalization.normalize is not normalization.min_max_normalize:
+        raise ValueError("Sharded execution only supports min-max normalization")
+
+    parts = partition(registry, shards)
+    workers = min(workers or os.cpu_count() or 1, len(parts))
+    archive_state = archive.get_settings()
+    own_spill = spill_dir is None
+    spill_dir = spill_dir or tempfile.mkdtemp(prefix="aigi-shards-")
+    print(f"🧩 {len(registry):,} models in {len(parts)} shards on {workers} workers")
+
+    try:
+        # Workers fetching at the same time split each host's limits between them
+        with ProcessPoolExecutor(max_workers=workers, initializer=http_client.set_share,
+                                 initargs=(workers,)) as pool:
+            with tracing.span("shard phase one", shards=len(parts)):
+                started = time.perf_counter()
+                current_slices = split_sources(current, parts)
+                previous_slices = split_sources(previous, parts)
+                futures = [pool.submit(_phase_one, i, len(parts), part, current_slices[i],
+                                       previous_slices[i], spill_dir, archive_state)
+                           for i, part in enumerate(parts)]
+                results = [f.result() for f in futures]
+                print(f"  Phase one: {sum(r['rows'] for r in results):,} rows "
+                      f"in {time.perf_counter() - started:.2f}s")
+
+            for result in results:
+                archive.add_recorded(result["recorded"])
+                resilience.add_stale(result["stale"])
+                schemas.add_rejections(result["rejected"])
+
+            # Reduce: global bounds per metric
+            columns = results[0]["stats"].keys()
+            stats = {col: merge_stats([r["stats"][col] for r in results]) for col in columns}
+            bounds = {col: (s["min"], s["max"]) for col, s in stats.items()}
+
+            with tracing.span("shard phase two", shards=len(parts)):
+                started = time.perf_counter()
+                futures = [pool.submit(_phase_two, r["path"], bounds) for r in results]
+                frames = [f.result() for f in futures]
+                print(f"  Phase two: scored in {time.perf_counter() - started:.2f}s")
+    finally:
+        if own_spill:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+
+    # Concatenate in registry order so tier sums match the single-process run exactly
+    with tracing.span("cis"):
+        with warnings.catch_warnings():
+            # Shards whose score columns are all NaN; values are unaffected either way
+            warnings.simplefilter("ignore", FutureWarning)
+            df = pd.concat(frames, ignore_index=True)
+        cis = compute_cis(df)
+    print(f"\n📊 Composite Intelligence Score (CIS): {cis:.4f}")
+
+    timestamp = timestamp or datetime.utcnow().isoformat() + "Z"
+    return {
+        "epoch_id": epoch_id,
+        "timestamp": timestamp,
+        "cis": cis,
+        "models": snapshot_records(df),
+        "engine_version": "1.0.0",
+        **index_fields(registry, df),
+        **resilience.snapshot_fields(),
+    }
+
+
+def run_sharded(registry: list, epoch_id: str, timestamp: str = None, shards: int = 4,
+                workers: int = None) -> dict:
+    """Fetch leaderboards once, then fetch and score per-model sources by shard."""
+    print("🌐 Fetching leaderboards (per-model sources are fetched by shard)...")
+    with tracing.span("fetch arena", "source"):
+        arena_df = fetch_arena_scores()
+    with tracing.span("fetch benchmarks", "source"):
+        benchmarks = fetch_all_benchmarks(registry)
+
+    current = {
+        "arena": arena_df,
+        "mmlu": benchmarks["mmlu"],
+        "gsm8k": benchmarks["gsm8k"],
+        "humaneval": benchmarks["humaneval"],
+    }
+    previous = {k: v.copy() for k, v in current.items()}
+    return compute_snapshot_sharded(registry, current, previous, epoch_id, timestamp, shards, workers)
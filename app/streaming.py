@@ -0,0 +1,289 @@
+"""
+Memory-bounded streaming pipeline.
+
+Sources are consumed as chunks of (model, value) records and spilled to
+an on-disk SQLite database. The registry is then joined against them in
+registry order (same row multiplication as merge_dataframes) and scanned
+twice, chunk by chunk: pass one collects min/max per metric and the tier
+sizes, pass two normalizes, scores and appends each model record to the
+snapshot file. Peak memory follows chunk_size, not registry size.
+
+The snapshot is written as canonical JSON (sorted keys, the encoding
+hash_dataset uses), so its file SHA-256 is the snapshot hash. Per-tier
+weighted scores are spilled to disk and summed as one array per tier,
+which keeps CIS identical to compute_cis on the in-memory frame. Sub-index
+rows are spilled the same way and reduced once, as SubIndexEngine.evaluate
+does.
+"""
+
+import os
+import json
+import shutil
+import sqlite3
+import hashlib
+import tempfile
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+from .config import TIER_WEIGHTS, SNAPSHOT_DIR, STREAM_CHUNK_SIZE
+from .scoring import normalization
+from .scoring.normalization import series_stats, merge_stats
+from .data_sources import resilience
+from .data_sources.schemas import SCHEMAS, validate, conform, add_rejections
+from .utils import tracing
+from .utils.snapshot import atomic_write
+
+# Spill files of SubIndexEngine.rows(), in its order
+INDEX_COLUMNS = {"positions": np.int64, "tiers": np.int64, "scores": np.float64}
+
+
+def iter_chunks(source, chunk_size: int = STREAM_CHUNK_SIZE, extras: tuple = ()):
+    """
+    Yield lists of (model, value) records from a source: a DataFrame
+    (model column plus its first value column, as merge_dataframes uses)
+    or any iterable already yielding such lists or DataFrames. The named
+    extras columns of a DataFrame follow the value: (model, value, *extras).
+    """
+    if isinstance(source, pd.DataFrame):
+        if "model" not in source.columns:
+            return
+        value_cols = [col for col in source.columns if col != "model"]
+        if not value_cols:
+            return
+        for start in range(0, len(source), chunk_size):
+            part = source.iloc[start:start + chunk_size]
+            yield list(zip(part["model"].tolist(), part[value_cols[0]].tolist(),
+                           *(part[col].tolist() for col in extras)))
+        return
+    for chunk in source:
+        if isinstance(chunk, pd.DataFrame):
+            yield from iter_chunks(chunk, chunk_size, extras)
+        else:
+            yield chunk
+
+
+def _validated_rows(metric: str, chunk: list, record: bool) -> list:
+    # Same schema check as merge_dataframes; NULL reads back as NaN
+    validated = validate(SCHEMAS[metric], pd.DataFrame(chunk, columns=["model", "value"]))
+    if validated.rejected and record:
+        add_rejections({metric: validated.rejected})
+    values = np.where(validated.valid, validated.values, None)
+    return list(zip(validated.models.tolist(), values.tolist()))
+
+
+def _registry_row(pos: int, model: dict):
+    def clean(x):
+        return str(x) if isinstance(x, (dict, list)) else x
+    # A missing tier is NaN in pd.DataFrame(registry)
+    return pos, str(clean(model.get("name"))), clean(model.get("tier", float("nan")))
+
+
+class SpillStore:
+    """
+    SQLite tables for the registry and each source, keyed for the join. A
+    source's extra columns (schema extras) share its table, so they join
+    row for row with its value as in merge_dataframes.
+    """
+
+    def __init__(self, directory: str):
+        self.path = os.path.join(directory, "stream.sqlite")
+        self.db = sqlite3.connect(self.path)
+        self.db.execute("PRAGMA journal_mode=OFF")
+        self.db.execute("PRAGMA synchronous=OFF")
+        self.db.execute("PRAGMA temp_store=FILE")
+        self.db.execute("PRAGMA cache_size=-16384")
+        self.db.execute("CREATE TABLE registry (pos INTEGER PRIMARY KEY, name TEXT, tier)")
+        self.columns = []
+
+    def add_registry(self, registry, chunk_size: int):
+        batch = []
+        for pos, model in enumerate(registry):
+            batch.append(_registry_row(pos, model))
+            if len(batch) >= chunk_size:
+                self.db.executemany("INSERT INTO registry VALUES (?, ?, ?)", batch)
+                batch = []
+        self.db.executemany("INSERT INTO registry VALUES (?, ?, ?)", batch)
+
+    def add_source(self, column: str, source, chunk_size: int) -> bool:
+        table = f"src_{len(self.columns)}"
+        metric = column[len("prev_"):] if column.startswith("prev_") else column
+        record = metric == column
+        extras = ()
+        if isinstance(source, pd.DataFrame) and "model" in source.columns:
+            # Extras (already validated here) are only carried for the current epoch
+            source = conform(metric, source, record=record, extras=record)
+            extras = tuple(col for col in SCHEMAS[metric].extras if col in source.columns)
+        slots = "".join(f", x{i}" for i in range(len(extras)))
+        self.db.execute(f"CREATE TABLE {table} (seq INTEGER PRIMARY KEY, model TEXT, value{slots})")
+        insert = f"INSERT INTO {table} (model, value{slots}) VALUES (?, ?{', ?' * len(extras)})"
+        rows = 0
+        for chunk in iter_chunks(source, chunk_size, extras):
+            validated = _validated_rows(metric, [r[:2] for r in chunk], record)
+            if extras:
+                validated = [row + tuple(None if x != x else x for x in r[2:])
+                             for row, r in zip(validated, chunk)]
+            self.db.executemany(insert, validated)
+            rows += len(chunk)
+        if rows == 0 and not _has_value_column(source):
+            self.db.execute(f"DROP TABLE {table}")
+            return False
+        self.db.execute(f"CREATE INDEX {table}_model ON {table} (model, seq)")
+        self.columns.append((column, table, extras))
+        return True
+
+    def scan(self, chunk_size: int):
+        """Yield joined DataFrame chunks in the row order pd.merge(how='left') produces."""
+        select = ", ".join(["r.name", "r.tier"] + [
+            f"{t}.{slot}" for _, t, extras in self.columns
+            for slot in ["value"] + [f"x{i}" for i in range(len(extras))]])
+        joins = " ".join(f"LEFT JOIN {t} ON {t}.model = r.name" for _, t, _ in self.columns)
+        order = ", ".join(["r.pos"] + [f"{t}.seq" for _, t, _ in self.columns])
+        cursor = self.db.execute(f"SELECT {select} FROM registry r {joins} ORDER BY {order}")
+        values = [name for column, _, extras in self.columns for name in (column,) + extras]
+        names = ["name", "tier"] + values
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            df = pd.DataFrame.from_records(rows, columns=names)
+            for column in values:
+                df[column] = pd.to_numeric(df[column], errors="coerce").astype(float)
+            yield df
+
+    def close(self):
+        self.db.close()
+
+
+def _has_value_column(source) -> bool:
+    if isinstance(source, pd.DataFrame):
+        return "model" in source.columns and len(source.columns) > 1
+    return True
+
+
+def _canonical(value) -> str:
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+def compute_snapshot_streaming(registry, current: dict, previous: dict, epoch_id: str,
+                               timestamp: str = None, filepath: str = None,
+                               chunk_size: int = STREAM_CHUNK_SIZE, work_dir: str = None) -> dict:
+    """
+    Streaming equivalent of main.compute_snapshot. Writes the snapshot to
+    filepath and returns a summary (epoch_id, timestamp, cis, models,
+    sha256, path) instead of the full snapshot.
+    """
+    from .main import (CURRENT_METRICS, PREVIOUS_METRICS, NORMALIZED_METRICS,
+                       snapshot_records, add_deltas, normalize_all, score_all, index_engine)
+
+    if normalization.normalize is not normalization.min_max_normalize:
+        raise ValueError("Streaming mode only supports min-max normalization")
+
+    timestamp = timestamp or datetime.utcnow().isoformat() + "Z"
+    if filepath is None:
+        filepath = os.path.join(SNAPSHOT_DIR, f"{epoch_id}_{timestamp.replace(':', '-')}.json")
+    own_dir = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix=".aigi-stream-", dir=os.path.dirname(filepath) or ".")
+    store = SpillStore(work_dir)
+
+    try:
+        with tracing.span("stream spill"):
+            store.add_registry(registry, chunk_size)
+            for metric in CURRENT_METRICS:
+                if metric in current:
+                    store.add_source(metric, current[metric], chunk_size)
+            for metric in PREVIOUS_METRICS:
+                if metric in previous:
+                    store.add_source(f"prev_{metric}", previous[metric], chunk_size)
+            store.db.commit()
+
+        # Pass one: global bounds and tier sizes
+        with tracing.span("stream pass one"):
+            parts, tiers, rows = {}, {}, 0
+            for df in store.scan(chunk_size):
+                df = add_deltas(df)
+                for col in NORMALIZED_METRICS:
+                    if col in df.columns:
+                        parts.setdefault(col, []).append(series_stats(df[col]))
+                for tier, count in df["tier"].value_counts().items():
+                    tiers[tier] = tiers.get(tier, 0) + int(count)
+                rows += len(df)
+            bounds = {col: (s["min"], s["max"]) for col, s in
+                      ((col, merge_stats(p)) for col, p in parts.items())}
+
+        # Pass two: score, write model records, spill weighted tier scores
+        with tracing.span("stream pass two", models=rows):
+            models_path = os.path.join(work_dir, "models.json")
+            tier_files = {tier: open(os.path.join(work_dir, f"tier-{i}.f8"), "wb")
+                          for i, tier in enumerate(TIER_WEIGHTS)}
+            # Sub-index rows of every chunk, reduced once like SubIndexEngine.evaluate
+            engine = index_engine(registry)
+            index_files = {column: open(os.path.join(work_dir, f"index-{column}.bin"), "wb")
+                           for column in INDEX_COLUMNS} if engine is not None else {}
+            with open(models_path, "w") as out:
+                first = True
+                for df in store.scan(chunk_size):
+                    df = score_all(normalize_all(add_deltas(df), bounds))
+                    if engine is not None:
+                        for column, values in zip(INDEX_COLUMNS, engine.rows(df)):
+                            values.tofile(index_files[column])
+                    for tier, f in tier_files.items():
+                        if tiers.get(tier):
+                            equal_weight = TIER_WEIGHTS[tier] / tiers[tier]
+                            scores = df.loc[df["tier"] == tier, "model_score"]
+                            (scores * equal_weight).to_numpy(dtype=np.float64).tofile(f)
+                    records = snapshot_records(df)
+                    if records:
+                        out.write(("" if first else ", ") + ", ".join(_canonical(r) for r in records))
+                        first = False
+            for f in (*tier_files.values(), *index_files.values()):
+                f.close()
+
+            # Same reduction as compute_cis, one contiguous array per tier
+            cis = 0.0
+            for i, tier in enumerate(TIER_WEIGHTS):
+                if not tiers.get(tier):
+                    continue
+                weighted = np.memmap(os.path.join(work_dir, f"tier-{i}.f8"), dtype=np.float64, mode="r")
+                cis += pd.Series(weighted).sum()
+                del weighted
+
+        with tracing.span("stream write"):
+            header = {"cis": cis, "engine_version": "1.0.0", "epoch_id": epoch_id}
+            if engine is not None:
+                index_rows = [np.fromfile(os.path.join(work_dir, f"index-{column}.bin"), dtype=dtype)
+                              for column, dtype in INDEX_COLUMNS.items()]
+                header["indices"] = engine.finish(*engine.reduce(*index_rows))
+                del index_rows
+            prefix = _canonical(header)[:-1] + ', "models": ['
+            # Keys after "models" in sorted order
+            suffix = "], " + _canonical({"timestamp": timestamp, **resilience.snapshot_fields()})[1:]
+            sha256 = _assemble(filepath, prefix, models_path, suffix)
+    finally:
+        store.close()
+        if own_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"\n📊 Composite Intelligence Score (CIS): {cis:.4f}")
+    print(f"Snapshot streamed to {filepath} ({rows:,} models)")
+    return {"epoch_id": epoch_id, "timestamp": timestamp, "cis": cis,
+            "models": rows, "sha256": sha256, "path": filepath}
+
+
+def _assemble(filepath: str, prefix: str, models_path: str, suffix: str) -> str:
+    """Write prefix + models + suffix atomically; returns the SHA-256 of the file."""
+    digest = hashlib.sha256()
+
+    def pieces():
+        yield prefix.encode("utf-8")
+        with open(models_path, "rb") as models:
+            yield from iter(lambda: models.read(1 << 20), b"")
+        yield suffix.encode("utf-8")
+
+    def hashed():
+        for piece in pieces():
+            digest.update(piece)
+            yield piece
+
+    atomic_write(filepath, hashed())
+    return digest.hexdigest()
@@ -1,9 +1,37 @@
-from .hashing import hash_dataset
-from .ipfs import upload_to_ipfs
-from .snapshot import save_snapshot
+# Helpers are imported on first access so light commands stay fast
+import importlib
+
+_EXPORTS = {
+    'hash_dataset': '.hashing',
+    'upload_to_ipfs': '.ipfs',
+    'compute_cid': '.ipfs',
+    'compute_file_cid': '.ipfs',
+    'IPFSPublisher': '.ipfs',
+    'record_epoch': '.manifest',
+    'load_manifest': '.manifest',
+    'save_snapshot': '.snapshot',
+    'publish_snapshot': '.snapshot',
+    'resolve_latest': '.snapshot',
+}
 
 __all__ = [
     'hash_dataset',
     'upload_to_ipfs',
-    'save_snapshot'
+    'compute_cid',
+    'compute_file_cid',
+    'IPFSPublisher',
+    'record_epoch',
+    'load_manifest',
+    'save_snapshot',
+    'publish_snapshot',
+    'resolve_latest'
 ]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,135 @@
+"""
+Fetch cache shared by every engine process on the host.
+
+Entries are JSON files under CACHE_DIR (resolved from config, not the
+working directory), written to a temp file and renamed into place so
+readers never see a partial entry. Writers hold an advisory lock
+(fcntl.flock on <entry>.lock) plus a per-key thread lock, which gives
+single-flight fetches across threads and processes:
+
+    scores = cache.get_or_fetch("arena_scores", fetch, max_age=6 * 3600)
+
+The first caller runs fetch() while holding the key's lock; concurrent
+callers wait for it and then read the stored entry instead of repeating
+the request. A lock held longer than CACHE_LOCK_TIMEOUT is ignored and
+the caller fetches on its own. Without fcntl (Windows) only threads in
+one process are deduplicated.
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from ..config import CACHE_DIR, CACHE_LOCK_TIMEOUT
+from . import tracing
+from .snapshot import atomic_write
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+_thread_locks = {}
+_thread_locks_lock = threading.Lock()
+
+
+def cache_path(key: str, cache_dir: str = None) -> str:
+    return os.path.join(cache_dir or CACHE_DIR, f"{key}.json")
+
+
+def _thread_lock(path: str) -> threading.Lock:
+    with _thread_locks_lock:
+        return _thread_locks.setdefault(path, threading.Lock())
+
+
+@contextmanager
+def locked(path: str, timeout: float = CACHE_LOCK_TIMEOUT):
+    """
+    Exclusive lock for path across threads and processes. Yields True when
+    the lock was taken, False when it timed out (the caller proceeds unlocked).
+    """
+    thread_lock = _thread_lock(path)
+    if not thread_lock.acquire(timeout=timeout if timeout > 0 else -1):
+        tracing.count("cache_lock_timeouts")
+        yield False
+        return
+    try:
+        if fcntl is None:
+            yield True
+            return
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(f"{path}.lock", "a") as lock_file:
+            start = time.monotonic()
+            while True:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if timeout > 0 and time.monotonic() - start >= timeout:
+                        print(f"  ⚠️ Cache lock {path}.lock held for over {timeout:.0f}s, continuing without it")
+                        tracing.count("cache_lock_timeouts")
+                        yield False
+                        return
+                    time.sleep(0.05)
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    finally:
+        thread_lock.release()
+
+
+def load(key: str, max_age: float = None, cache_dir: str = None):
+    """Stored value for key, or None when missing, unreadable or older than max_age seconds."""
+    path = cache_path(key, cache_dir)
+    try:
+        with open(path, "r") as f:
+            entry = json.load(f)
+        stored_at = float(entry["stored_at"])
+        value = entry["value"]
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"  ⚠️ Ignoring unreadable cache entry {path}: {e}")
+        return None
+    if max_age is not None and time.time() - stored_at > max_age:
+        return None
+    return value
+
+
+def store(key: str, value, cache_dir: str = None):
+    entry = {"key": key, "stored_at": time.time(), "value": value}
+    atomic_write(cache_path(key, cache_dir), json.dumps(entry, default=str).encode("utf-8"))
+
+
+def get_or_fetch(key: str, fetch, max_age: float = None, keep=bool, cache_dir: str = None):
+    """
+    Cached value for key, or fetch() it once for all concurrent callers.
+    fetch must return something JSON-serializable; results for which
+    keep(value) is false (empty by default) are returned but not stored.
+    The call is traced as a "cache" span whose cache attribute is hit,
+    shared (fetched by another caller while we waited) or miss; on a miss
+    it covers the HTTP spans of fetch().
+    """
+    with tracing.span(f"cache {key}", "cache", key=key) as span:
+        value = load(key, max_age, cache_dir)
+        if value is not None:
+            tracing.count(f"cache_hit.{key}")
+            span.set(cache="hit")
+            return value
+
+        path = cache_path(key, cache_dir)
+        with locked(path):
+            # Another thread or process may have fetched it while we waited
+            value = load(key, max_age, cache_dir)
+            if value is not None:
+                tracing.count(f"cache_shared.{key}")
+                span.set(cache="shared")
+                return value
+            tracing.count(f"cache_miss.{key}")
+            span.set(cache="miss")
+            value = fetch()
+            if keep(value):
+                store(key, value, cache_dir)
+            return value
@@ -0,0 +1,174 @@
+"""
+Per-epoch history summaries for reports.
+
+Each published snapshot gets a compact sidecar in HISTORY_DIR (one .npz per
+snapshot file) holding what history views need: CIS, per-tier contribution
+to CIS, and per-model name, tier, model_score (float32) and global rank.
+Summaries are written when an epoch is published and built on demand for
+older snapshots. A summary records the (mtime, size) of its snapshot and is
+rebuilt when that changes, so each snapshot is parsed once.
+
+load_history() stacks the summaries into epoch x model matrices.
+"""
+
+import io
+import os
+import json
+import zipfile
+import numpy as np
+from ..config import SNAPSHOT_DIR, HISTORY_DIR, TIER_WEIGHTS
+from ..serving.store import NON_SNAPSHOT_FILES
+from .snapshot import atomic_write
+
+
+def ranks_of(scores: np.ndarray) -> np.ndarray:
+    """Rank 1 for the highest score, ties share the best rank; NaN where there is no score."""
+    ranks = np.full(len(scores), np.nan)
+    valid = ~np.isnan(scores)
+    ordered = np.sort(-scores[valid])
+    ranks[valid] = np.searchsorted(ordered, -scores[valid], side="left") + 1
+    return ranks
+
+
+def tier_contributions(tiers: np.ndarray, scores: np.ndarray) -> dict:
+    """
+    {tier: weight * sum of the tier's model_scores / its model count}; the
+    values sum to the CIS. As in compute_cis, a model without a score still
+    counts towards its tier's size, so this is not the mean of the scores
+    present when some are NaN.
+    """
+    contributions = {}
+    for tier, weight in TIER_WEIGHTS.items():
+        in_tier = tiers == tier
+        # compute_cis: (tier_df["model_score"] * weight / len(tier_df)).sum() skips NaN
+        count = int(in_tier.sum())
+        contributions[tier] = float(weight * np.nansum(scores[in_tier]) / count) if count else 0.0
+    return contributions
+
+
+def summarize(snapshot: dict) -> dict:
+    """Arrays and metadata of one snapshot's summary."""
+    models = snapshot.get("models", [])
+    names = np.array([str(m.get("name")) for m in models], dtype=str)
+    tiers = np.array([str(m.get("tier")) for m in models], dtype=str)
+    scores = np.array([m.get("model_score") for m in models], dtype=np.float64)
+    # Merges can repeat a model; the first row is the one lookups return
+    _, first = np.unique(names, return_index=True)
+    keep = np.sort(first)
+    meta = {
+        "epoch_id": snapshot.get("epoch_id"),
+        "timestamp": snapshot.get("timestamp"),
+        "cis": snapshot.get("cis"),
+        "tiers": tier_contributions(tiers, scores),
+    }
+    return {
+        "meta": meta,
+        "names": names[keep],
+        "tiers": tiers[keep],
+        "scores": scores[keep].astype(np.float32),
+        "ranks": ranks_of(scores[keep]).astype(np.float32),
+    }
+
+
+def summary_path(snapshot_path: str, history_dir: str = None) -> str:
+    name = os.path.splitext(os.path.basename(snapshot_path))[0] + ".npz"
+    return os.path.join(history_dir or HISTORY_DIR, name)
+
+
+def _signature(path: str) -> list:
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def write_summary(snapshot_path: str, snapshot: dict = None, history_dir: str = None) -> str:
+    """Write the summary of a snapshot file (parsing it unless snapshot is given)."""
+    # A streamed run's snapshot is a summary with a model count
+    if snapshot is None or not isinstance(snapshot.get("models"), list):
+        with open(snapshot_path, "r") as f:
+            snapshot = json.load(f)
+    summary = summarize(snapshot)
+    summary["meta"]["signature"] = _signature(snapshot_path)
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, meta=np.array(json.dumps(summary.pop("meta"))), **summary)
+    path = summary_path(snapshot_path, history_dir)
+    atomic_write(path, buffer.getvalue())
+    return path
+
+
+def read_summary(path: str) -> dict:
+    with np.load(path) as data:
+        summary = {key: data[key] for key in ("names", "tiers", "scores", "ranks")}
+        summary["meta"] = json.loads(str(data["meta"]))
+    return summary
+
+
+def _cached_summary(path: str):
+    if not os.path.exists(path):
+        return None
+    try:
+        return read_summary(path)
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        # Torn or foreign file; rebuilt from the snapshot
+        return None
+
+
+def _snapshot_files(snapshot_dir: str) -> list:
+    if not os.path.isdir(snapshot_dir):
+        return []
+    return [os.path.join(snapshot_dir, name) for name in sorted(os.listdir(snapshot_dir))
+            if name.endswith(".json") and not name.startswith(".") and name not in NON_SNAPSHOT_FILES]
+
+
+def load_summaries(snapshot_dir: str = None, history_dir: str = None) -> list:
+    """Summaries of every epoch (latest snapshot per epoch id), oldest first."""
+    snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+    history_dir = history_dir or os.path.join(snapshot_dir, os.path.basename(HISTORY_DIR))
+    epochs, built = {}, 0
+    for path in _snapshot_files(snapshot_dir):
+        summary = _cached_summary(summary_path(path, history_dir))
+        if summary is None or summary["meta"].get("signature") != _signature(path):
+            try:
+                summary = read_summary(write_summary(path, history_dir=history_dir))
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Skipping {os.path.basename(path)}: {e}")
+                continue
+            built += 1
+        meta = summary["meta"]
+        if meta.get("epoch_id") is None:
+            continue
+        current = epochs.get(meta["epoch_id"])
+        if current is None or str(meta.get("timestamp")) >= str(current["meta"].get("timestamp")):
+            epochs[meta["epoch_id"]] = summary
+    if built:
+        print(f"🗂️ Summarized {built} snapshot(s) into {history_dir}")
+    return sorted(epochs.values(), key=lambda s: str(s["meta"].get("timestamp")))
+
+
+def load_history(snapshot_dir: str = None, history_dir: str = None) -> dict:
+    """
+    Epoch history as arrays: epoch_ids, timestamps, cis, contributions
+    {tier: array}, model names, and epoch x model matrices of scores and
+    ranks (NaN where a model is absent), plus each model's latest tier.
+    """
+    summaries = load_summaries(snapshot_dir, history_dir)
+    names = np.unique(np.concatenate([s["names"] for s in summaries])) if summaries else np.array([], dtype=str)
+    scores = np.full((len(summaries), len(names)), np.nan, dtype=np.float32)
+    ranks = np.full((len(summaries), len(names)), np.nan, dtype=np.float32)
+    tiers = np.full(len(names), "", dtype=object)
+    for row, summary in enumerate(summaries):
+        columns = np.searchsorted(names, summary["names"])
+        scores[row, columns] = summary["scores"]
+        ranks[row, columns] = summary["ranks"]
+        tiers[columns] = summary["tiers"]
+    metas = [s["meta"] for s in summaries]
+    return {
+        "epoch_ids": [m["epoch_id"] for m in metas],
+        "timestamps": [m.get("timestamp") for m in metas],
+        "cis": np.array([np.nan if m.get("cis") is None else m["cis"] for m in metas], dtype=np.float64),
+        "contributions": {tier: np.array([m["tiers"].get(tier, 0.0) for m in metas])
+                          for tier in TIER_WEIGHTS},
+        "names": names,
+        "tiers": tiers,
+        "scores": scores,
+        "ranks": ranks,
+    }
@@ -1,31 +1,310 @@
 import os
 import subprocess
 import json
+import base64
+import hashlib
+import threading
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+from ..config import IPFS_API_URL
 
-def upload_to_ipfs(filepath: str) -> str:
+# Layout parameters matching `ipfs add --cid-version=1 --raw-leaves`
+CHUNK_SIZE = 262144   # default size-262144 chunker
+MAX_LINKS = 174       # balanced layout fan-out
+
+CODEC_RAW = 0x55
+CODEC_DAG_PB = 0x70
+MULTIHASH_SHA2_256 = 0x12
+
+UNIXFS_DIRECTORY = 1
+UNIXFS_FILE = 2
+
+
+def _varint(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _pb_varint(field: int, value: int) -> bytes:
+    return _varint(field << 3) + _varint(value)
+
+
+def _pb_bytes(field: int, data: bytes) -> bytes:
+    return _varint((field << 3) | 2) + _varint(len(data)) + data
+
+
+def _cid(codec: int, block: bytes) -> bytes:
+    """Binary CIDv1 for a block with sha2-256."""
+    digest = hashlib.sha256(block).digest()
+    return _varint(1) + _varint(codec) + bytes([MULTIHASH_SHA2_256, len(digest)]) + digest
+
+
+def cid_to_str(cid: bytes) -> str:
+    """Multibase base32 (lowercase, unpadded) string form of a CIDv1."""
+    return "b" + base64.b32encode(cid).decode("ascii").lower().rstrip("=")
+
+
+def _unixfs(kind: int, filesize: int = None, blocksizes=()) -> bytes:
+    data = _pb_varint(1, kind)
+    if filesize is not None:
+        data += _pb_varint(3, filesize)
+    for size in blocksizes:
+        data += _pb_varint(4, size)
+    return data
+
+
+def _dag_pb_node(links, data: bytes) -> bytes:
+    """Encode a dag-pb node; links are (cid, name, tsize) and precede Data."""
+    out = b""
+    for cid, name, tsize in links:
+        link = _pb_bytes(1, cid) + _pb_bytes(2, name.encode("utf-8")) + _pb_varint(3, tsize)
+        out += _pb_bytes(2, link)
+    return out + _pb_bytes(1, data)
+
+
+def _build_file_dag(leaves):
+    """
+    Combine raw leaves (cid, size) into a balanced UnixFS file DAG.
+    Returns (cid, filesize, tsize) of the root.
+    """
+    if not leaves:
+        leaves = [(_cid(CODEC_RAW, b""), 0)]
+    # Each level entry is (cid, filesize, tsize); raw leaves have tsize == size
+    level = [(cid, size, size) for cid, size in leaves]
+    if len(level) == 1:
+        return level[0]
+
+    while len(level) > 1:
+        parents = []
+        for i in range(0, len(level), MAX_LINKS):
+            children = level[i:i + MAX_LINKS]
+            sizes = [child[1] for child in children]
+            node = _dag_pb_node(
+                [(cid, "", tsize) for cid, _, tsize in children],
+                _unixfs(UNIXFS_FILE, sum(sizes), sizes),
+            )
+            tsize = len(node) + sum(child[2] for child in children)
+            parents.append((_cid(CODEC_DAG_PB, node), sum(sizes), tsize))
+        level = parents
+    return level[0]
+
+
+def _file_root(path: str):
+    leaves = []
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            leaves.append((_cid(CODEC_RAW, chunk), len(chunk)))
+    return _build_file_dag(leaves)
+
+
+def _directory_root(entries):
+    """entries: list of (name, path). Returns (cid, tsize) of the directory node."""
+    links = []
+    for name, path in sorted(entries, key=lambda e: e[0].encode("utf-8")):
+        cid, tsize = _path_root(path)
+        links.append((cid, name, tsize))
+    node = _dag_pb_node(links, _unixfs(UNIXFS_DIRECTORY))
+    return _cid(CODEC_DAG_PB, node), len(node) + sum(link[2] for link in links)
+
+
+def _path_root(path: str):
+    if os.path.isdir(path):
+        entries = [(name, os.path.join(path, name)) for name in os.listdir(path)]
+        return _directory_root(entries)
+    cid, _, tsize = _file_root(path)
+    return cid, tsize
+
+
+def cid_from_str(cid: str) -> bytes:
+    """Binary CIDv1 from its base32 string form (inverse of cid_to_str)."""
+    body = cid[1:].upper()
+    return base64.b32decode(body + "=" * (-len(body) % 8))
+
+
+def hash_file(filepath: str, on_chunk=None) -> dict:
     """
-    Upload a file to IPFS using either ipfshttpclient or command line.
-    Returns IPFS hash (CID).
-    For testing, you can mock this or skip.
+    SHA-256, CID and sizes of a file in one streaming read. on_chunk, if
+    given, also sees every chunk (e.g. to hash decompressed content).
+    tsize is what a directory link to the file records.
     """
+    digest = hashlib.sha256()
+    leaves = []
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+            leaves.append((_cid(CODEC_RAW, chunk), len(chunk)))
+            if on_chunk is not None:
+                on_chunk(chunk)
+    cid, size, tsize = _build_file_dag(leaves)
+    return {"sha256": digest.hexdigest(), "cid": cid_to_str(cid), "bytes": size, "tsize": tsize}
+
+
+def directory_cid(links) -> tuple:
+    """
+    (CID, tsize) of a directory from already hashed entries: links are
+    (name, CID string, tsize), as _directory_root builds from paths.
+    """
+    entries = sorted(links, key=lambda link: link[0].encode("utf-8"))
+    node = _dag_pb_node([(cid_from_str(cid), name, tsize) for name, cid, tsize in entries],
+                        _unixfs(UNIXFS_DIRECTORY))
+    return cid_to_str(_cid(CODEC_DAG_PB, node)), len(node) + sum(link[2] for link in entries)
+
+
+def compute_cid(data: bytes) -> str:
+    """Return the CIDv1 that IPFS would assign to a file with these bytes."""
+    leaves = [
+        (_cid(CODEC_RAW, data[i:i + CHUNK_SIZE]), len(data[i:i + CHUNK_SIZE]))
+        for i in range(0, len(data), CHUNK_SIZE)
+    ]
+    return cid_to_str(_build_file_dag(leaves)[0])
+
+
+def compute_file_cid(filepath: str) -> str:
+    """Return the CIDv1 of a file (or directory), streaming it in chunks."""
+    return cid_to_str(_path_root(filepath)[0])
+
+
+def compute_directory_cid(paths) -> str:
+    """CID of the directory `ipfs add -w` would build around these paths."""
+    entries = [(os.path.basename(os.path.normpath(p)), p) for p in paths]
+    return cid_to_str(_directory_root(entries)[0])
+
+
+def _multipart_entries(paths):
+    """Yield (relative name, path) for every file and directory under paths."""
+    for path in paths:
+        base = os.path.basename(os.path.normpath(path))
+        yield base, path
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                rel_root = os.path.join(base, os.path.relpath(root, path))
+                for name in dirs:
+                    yield os.path.normpath(os.path.join(rel_root, name)), os.path.join(root, name)
+                for name in sorted(files):
+                    yield os.path.normpath(os.path.join(rel_root, name)), os.path.join(root, name)
+
+
+def add_directory(paths, api_url: str = None, timeout: float = 120) -> str:
+    """
+    Add all paths to an IPFS node as one wrapped directory and pin it.
+    Tries the node's HTTP API first, then the `ipfs` CLI.
+    Returns the root CID reported by the node.
+    """
+    import requests
+
+    api_url = (api_url or IPFS_API_URL).rstrip("/")
+    params = {
+        "wrap-with-directory": "true",
+        "cid-version": "1",
+        "raw-leaves": "true",
+        "pin": "true",
+    }
     try:
-        # Try using ipfshttpclient
-        import ipfshttpclient
-        client = ipfshttpclient.connect()
-        res = client.add(filepath)
-        return res["Hash"]
-    except ImportError:
-        # Fallback to command line
+        handles = []
+        files = []
         try:
-            result = subprocess.run(["ipfs", "add", "-Q", filepath], capture_output=True, text=True)
-            if result.returncode == 0:
-                return result.stdout.strip()
-            else:
-                print("⚠️ IPFS upload failed (command returned non-zero exit code).")
-                return "QmMockHash_IPFS_Failed"
-        except FileNotFoundError:
-            print("⚠️ IPFS CLI not found. Skipping upload.")
-            return "QmMockHash_IPFS_Not_Found"
-        except Exception as e:
-            print(f"⚠️ IPFS upload error: {e}")
-            return "QmMockHash_Error"
\ No newline at end of file
+            for name, path in _multipart_entries(paths):
+                if os.path.isdir(path):
+                    files.append(("file", (quote(name, safe=""), b"", "application/x-directory")))
+                else:
+                    fh = open(path, "rb")
+                    handles.append(fh)
+                    files.append(("file", (quote(name, safe=""), fh, "application/octet-stream")))
+            response = requests.post(f"{api_url}/api/v0/add", params=params,
+                                     files=files, timeout=timeout)
+        finally:
+            for fh in handles:
+                fh.close()
+        if response.status_code == 200:
+            # Newline-delimited JSON; the wrapping directory has an empty name
+            for line in response.text.splitlines():
+                entry = json.loads(line)
+                if entry.get("Name", "") == "":
+                    return entry["Hash"]
+        print(f"⚠️ IPFS API returned status {response.status_code}")
+    except requests.RequestException as e:
+        print(f"⚠️ IPFS API unavailable ({type(e).__name__}), trying CLI")
+
+    cmd = ["ipfs", "add", "-Q", "-r", "-w", "--cid-version=1", "--raw-leaves", "--pin=true"]
+    result = subprocess.run(cmd + list(paths), capture_output=True, text=True, timeout=timeout)
+    if result.returncode != 0:
+        raise RuntimeError(f"ipfs add failed: {result.stderr.strip()}")
+    return result.stdout.strip()
+
+
+class IPFSPublisher:
+    """
+    Pins epoch artifacts on a background worker so the upload overlaps
+    with the rest of the run. CIDs are computed locally up front.
+    """
+
+    def __init__(self, api_url: str = None):
+        self.api_url = api_url or IPFS_API_URL
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ipfs-publish")
+        self._futures = []
+        self._lock = threading.Lock()
+
+    def publish(self, paths, on_done=None):
+        """
+        Schedule a batched directory add of paths. Returns the locally
+        computed root CID immediately; on_done(expected, pinned_cid or None)
+        runs on the worker when the add finishes.
+        """
+        paths = [p for p in paths if p and os.path.exists(p)]
+        expected = compute_directory_cid(paths)
+
+        def _run():
+            try:
+                pinned = add_directory(paths, self.api_url)
+                if pinned != expected:
+                    print(f"⚠️ IPFS node returned {pinned}, expected {expected}")
+                else:
+                    print(f"📌 Pinned {len(paths)} artifact(s) under {pinned}")
+            except Exception as e:
+                print(f"⚠️ IPFS pin skipped: {e}")
+                pinned = None
+            if on_done is not None:
+                on_done(expected, pinned)
+            return pinned
+
+        with self._lock:
+            self._futures.append(self._executor.submit(_run))
+        return expected
+
+    def wait(self, timeout: float = None):
+        """Wait for outstanding uploads; returns the pinned root CIDs."""
+        with self._lock:
+            futures = list(self._futures)
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result(timeout=timeout))
+            except Exception as e:
+                print(f"⚠️ IPFS upload did not finish: {type(e).__name__}")
+                results.append(None)
+        self._executor.shutdown(wait=False)
+        return results
+
+
+def upload_to_ipfs(filepath: str) -> str:
+    """
+    Upload a file to IPFS and return its CID.
+    The CID is computed locally, so it is returned even without a node.
+    """
+    cid = compute_file_cid(filepath)
+    try:
+        add_directory([filepath])
+    except Exception as e:
+        print(f"⚠️ IPFS upload skipped: {e}")
+    return cid
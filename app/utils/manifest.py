@@ -0,0 +1,43 @@
+import os
+import json
+import threading
+from ..config import MANIFEST_PATH
+
+_lock = threading.Lock()
+
+
+def record_epoch(epoch_id: str, **fields):
+    """
+    Append an entry for an epoch to the manifest.
+    The manifest is an append-only JSON-lines log; later entries for the
+    same epoch update earlier ones when loaded.
+    """
+    entry = {"epoch_id": epoch_id, **fields}
+    line = json.dumps(entry, sort_keys=True, default=str)
+    with _lock:
+        os.makedirs(os.path.dirname(MANIFEST_PATH) or ".", exist_ok=True)
+        with open(MANIFEST_PATH, "a") as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+    return entry
+
+
+def load_manifest(path: str = None) -> dict:
+    """Return {epoch_id: merged entry} in the order epochs were first recorded."""
+    path = path or MANIFEST_PATH
+    epochs = {}
+    if not os.path.exists(path):
+        return epochs
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A torn trailing line from an interrupted run
+                continue
+            epochs.setdefault(entry["epoch_id"], {}).update(entry)
+    return epochs
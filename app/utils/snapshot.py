@@ -1,20 +1,160 @@
 import os
+import gzip
 import json
+import zlib
+import tempfile
 from datetime import datetime
-from ..config import SNAPSHOT_DIR
+from ..config import SNAPSHOT_DIR, DIST_DIR, LATEST_POINTER_PATH
 
-def save_snapshot(data, epoch_id: str, timestamp: str = None):
-    """Save snapshot JSON to epochs/ folder."""
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# mkstemp creates 0600 files; published files are readable by everyone.
+# An explicit mode, since reading the umask means setting it process-wide.
+FILE_MODE = 0o644
+
+
+def atomic_write(filepath: str, data):
+    """
+    Write via a temp file in the same directory, fsync, then rename into
+    place. data is bytes or an iterable of byte chunks.
+    """
+    directory = os.path.dirname(filepath) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(filepath))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            os.fchmod(f.fileno(), FILE_MODE)
+            for chunk in ((data,) if isinstance(data, bytes) else data):
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, filepath)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    # Persist the rename itself
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    except OSError:
+        pass
+
+
+def save_snapshot(data, epoch_id: str, timestamp: str = None, snapshot_dir: str = None):
+    """Save snapshot JSON to epochs/ folder (or snapshot_dir)."""
     if timestamp is None:
         timestamp = datetime.utcnow().isoformat() + "Z"
-    
+
     # Sanitize timestamp for use in filename (replace colons with hyphens)
     safe_timestamp = timestamp.replace(":", "-")
 
     filename = f"{epoch_id}_{safe_timestamp}.json"
-    filepath = os.path.join(SNAPSHOT_DIR, filename)
-    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
-    with open(filepath, 'w') as f:
-        json.dump(data, f, indent=2, default=str)
+    filepath = os.path.join(snapshot_dir or SNAPSHOT_DIR, filename)
+    atomic_write(filepath, json.dumps(data, indent=2, default=str).encode("utf-8"))
     print(f"Snapshot saved to {filepath}")
-    return filepath
\ No newline at end of file
+    return filepath
+
+
+def _read_blocks(filepath: str, size: int = 1 << 20):
+    with open(filepath, "rb") as f:
+        yield from iter(lambda: f.read(size), b"")
+
+
+def _compressed(blocks, compressor):
+    for block in blocks:
+        out = compressor.compress(block)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def write_variants(data, filepath: str) -> dict:
+    """
+    Write minified, gzip and (if zstandard is installed) zstd variants of a
+    snapshot to DIST_DIR. Returns {variant: path relative to SNAPSHOT_DIR}.
+    """
+    stem = os.path.splitext(os.path.basename(filepath))[0]
+    minified = json.dumps(data, separators=(",", ":"), default=str).encode("utf-8")
+    variants = {
+        "min": (f"{stem}.min.json", minified),
+        "gzip": (f"{stem}.min.json.gz", gzip.compress(minified, compresslevel=9, mtime=0)),
+    }
+    if zstandard is not None:
+        variants["zstd"] = (f"{stem}.min.json.zst", zstandard.ZstdCompressor(level=19).compress(minified))
+    return _write_dist(variants)
+
+
+def write_file_variants(filepath: str) -> dict:
+    """
+    Compress a snapshot file already in canonical form (see app.streaming)
+    block by block, without loading it. No separate min variant is needed.
+    """
+    stem = os.path.splitext(os.path.basename(filepath))[0]
+    variants = {
+        # wbits=31 writes a gzip container with mtime 0, as gzip.compress(mtime=0) does
+        "gzip": (f"{stem}.json.gz", _compressed(_read_blocks(filepath), zlib.compressobj(9, zlib.DEFLATED, 31))),
+    }
+    if zstandard is not None:
+        variants["zstd"] = (f"{stem}.json.zst",
+                            _compressed(_read_blocks(filepath), zstandard.ZstdCompressor(level=19).compressobj()))
+    return _write_dist(variants)
+
+
+def _write_dist(variants: dict) -> dict:
+    """Write {name: (filename, body)} into DIST_DIR; returns paths relative to SNAPSHOT_DIR."""
+    written = {}
+    for name, (filename, body) in variants.items():
+        path = os.path.join(DIST_DIR, filename)
+        atomic_write(path, body)
+        written[name] = os.path.relpath(path, SNAPSHOT_DIR)
+    return written
+
+
+def update_latest_pointer(data, filepath: str, **fields) -> str:
+    """Point epochs/latest.json at a published snapshot instead of copying it."""
+    pointer = {
+        "epoch_id": data.get("epoch_id"),
+        "timestamp": data.get("timestamp"),
+        "cis": data.get("cis"),
+        "snapshot": os.path.relpath(filepath, SNAPSHOT_DIR),
+        **fields,
+    }
+    atomic_write(LATEST_POINTER_PATH, json.dumps(pointer, indent=2, default=str).encode("utf-8"))
+    return LATEST_POINTER_PATH
+
+
+def publish_snapshot(data, filepath: str, streamed: bool = False, **fields) -> dict:
+    """
+    Publish a saved snapshot: write precompressed variants, then move the
+    latest pointer. Extra fields (sha256, cid, ...) go into the pointer.
+    With streamed=True, data is only the summary and variants come from the file.
+    """
+    variants = write_file_variants(filepath) if streamed else write_variants(data, filepath)
+    update_latest_pointer(data, filepath, variants=variants, **fields)
+    sizes = ", ".join(
+        f"{name} {os.path.getsize(os.path.join(SNAPSHOT_DIR, path)):,} B"
+        for name, path in variants.items()
+    )
+    print(f"Published variants: {sizes}")
+    return variants
+
+
+def resolve_latest(snapshot_dir: str = None) -> str:
+    """Return the path of the latest snapshot, following the pointer file."""
+    snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+    pointer_path = os.path.join(snapshot_dir, os.path.basename(LATEST_POINTER_PATH))
+    if not os.path.exists(pointer_path):
+        return None
+    with open(pointer_path, "r") as f:
+        pointer = json.load(f)
+    if "snapshot" in pointer:
+        return os.path.join(snapshot_dir, pointer["snapshot"])
+    # Legacy latest.json holding a full copy of the snapshot
+    return pointer_path
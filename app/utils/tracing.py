@@ -0,0 +1,157 @@
+"""
+Lightweight spans and counters for pipeline stages and HTTP calls.
+
+Disabled unless AIGI_TRACE is set; span() then returns a shared no-op
+object. When enabled, export() writes JSON lines (<path>.jsonl) and a
+Chrome trace-event file (<path>.trace.json) for chrome://tracing or
+Perfetto.
+"""
+
+import os
+import json
+import time
+import threading
+from ..config import TRACE_PATH
+
+_state = {"enabled": bool(TRACE_PATH), "path": TRACE_PATH}
+_events = []
+_counters = {}
+_thread_ids = {}
+_lock = threading.Lock()
+_origin = time.perf_counter()
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+def _tid() -> int:
+    ident = threading.get_ident()
+    tid = _thread_ids.get(ident)
+    if tid is None:
+        with _lock:
+            tid = _thread_ids.setdefault(ident, len(_thread_ids) + 1)
+    return tid
+
+
+class Span:
+    __slots__ = ("name", "category", "attrs", "start")
+
+    def __init__(self, name: str, category: str, attrs: dict):
+        self.name = name
+        self.category = category
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        _events.append({
+            "name": self.name,
+            "cat": self.category,
+            "ts": (self.start - _origin) * 1e6,
+            "dur": (end - self.start) * 1e6,
+            "tid": _tid(),
+            "args": self.attrs,
+        })
+        return False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+def enabled() -> bool:
+    return _state["enabled"]
+
+
+def enable(path: str):
+    _state["enabled"] = True
+    _state["path"] = path
+
+
+def span(name: str, category: str = "stage", **attrs):
+    """Context manager timing a block; attrs are attached to the event."""
+    if not _state["enabled"]:
+        return NULL_SPAN
+    return Span(name, category, attrs)
+
+
+def count(name: str, value: float = 1):
+    """Increment a named counter (e.g. rate-limit waits)."""
+    if not _state["enabled"]:
+        return
+    with _lock:
+        total = _counters.get(name, 0) + value
+        _counters[name] = total
+    _events.append({
+        "name": name,
+        "cat": "counter",
+        "ph": "C",
+        "ts": (time.perf_counter() - _origin) * 1e6,
+        "tid": _tid(),
+        "args": {name: total},
+    })
+
+
+def counters() -> dict:
+    return dict(_counters)
+
+
+def export(path: str = None):
+    """Write collected events; returns the written paths or None when disabled."""
+    path = path or _state["path"]
+    if not _state["enabled"] or not path:
+        return None
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    events = list(_events)
+    pid = os.getpid()
+
+    jsonl_path = f"{path}.jsonl"
+    with open(jsonl_path, "w") as f:
+        for event in events:
+            if event.get("ph") == "C":
+                continue
+            f.write(json.dumps({
+                "name": event["name"],
+                "category": event["cat"],
+                "start_us": round(event["ts"], 1),
+                "duration_us": round(event["dur"], 1),
+                "thread": event["tid"],
+                **event["args"],
+            }, default=str) + "\n")
+        f.write(json.dumps({"name": "counters", "category": "summary", **_counters}) + "\n")
+
+    chrome_path = f"{path}.trace.json"
+    trace_events = []
+    for event in events:
+        trace_events.append({
+            "name": event["name"],
+            "cat": event["cat"],
+            "ph": event.get("ph", "X"),
+            "ts": event["ts"],
+            **({"dur": event["dur"]} if "dur" in event else {}),
+            "pid": pid,
+            "tid": event["tid"],
+            "args": event["args"],
+        })
+    with open(chrome_path, "w") as f:
+        json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f, default=str)
+
+    print(f"🧭 Trace written to {jsonl_path} and {chrome_path}")
+    return jsonl_path, chrome_path
@@ -0,0 +1 @@
+# Benchmarks for the AIGI Index Engine (not part of the app package)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Measure CLI start-up: wall time of short commands and per-module import cost.
+
+    python -m bench.imports
+    python -m bench.imports --runs 20 --output bench/results/imports.json
+
+Each command runs in a fresh interpreter from the repository root; the
+median of --runs is reported. The heaviest imports of `aigi latest` come
+from python -X importtime.
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+import subprocess
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "bench", "results")
+AIGI = os.path.join(ROOT, "aigi")
+
+COMMANDS = {
+    "python -c pass": [sys.executable, "-c", "pass"],
+    "import app.config": [sys.executable, "-c", "import app.config"],
+    "aigi --help": [sys.executable, AIGI, "--help"],
+    "aigi latest": [sys.executable, AIGI, "latest"],
+    "import app.main": [sys.executable, "-c", "import app.main"],
+}
+
+
+def time_command(argv: list, runs: int) -> dict:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(argv, cwd=ROOT, capture_output=True)
+        times.append(time.perf_counter() - start)
+    return {
+        "median_ms": round(statistics.median(times) * 1000, 2),
+        "min_ms": round(min(times) * 1000, 2),
+        "exit_code": result.returncode,
+    }
+
+
+def import_profile(argv: list, top: int = 10) -> list:
+    """Heaviest top-level imports (cumulative microseconds) from -X importtime."""
+    result = subprocess.run([argv[0], "-X", "importtime"] + argv[1:], cwd=ROOT,
+                            capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented under their parent
+        if not name[1:].startswith(" "):
+            rows.append({"module": name.strip(), "cumulative_us": int(cumulative)})
+    return sorted(rows, key=lambda r: r["cumulative_us"], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CLI start-up and import time")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10, help="Imports to list for aigi latest")
+    parser.add_argument("--output", default=None, help="Results file (default bench/results/imports-<ts>.json)")
+    args = parser.parse_args()
+
+    report = {
+        "created": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "runs": args.runs,
+        "commands": {},
+    }
+    for label, argv in COMMANDS.items():
+        report["commands"][label] = result = time_command(argv, args.runs)
+        failed = "  ❌ exit %d" % result["exit_code"] if result["exit_code"] else ""
+        print(f"    {label:<20} {result['median_ms']:9.1f} ms (min {result['min_ms']:.1f}){failed}")
+
+    report["aigi_latest_imports"] = import_profile(COMMANDS["aigi latest"], args.top)
+    print("\n  Heaviest imports for aigi latest:")
+    for row in report["aigi_latest_imports"]:
+        print(f"    {row['module']:<32} {row['cumulative_us'] / 1000:8.2f} ms")
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"imports-{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Time and memory-profile every pipeline stage on synthetic registries.
+
+    python -m bench.pipeline --sizes 1000,10000,100000
+    python -m bench.pipeline --sizes 1000000 --no-memory
+    python -m bench.pipeline --compare bench/results/<old>.json
+
+Results are written as JSON (one file per run) so runs on different
+commits can be compared stage by stage.
+"""
+
+import io
+import os
+import sys
+import gc
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+import contextlib
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from app.main import merge_dataframes, normalize_all
+from app.scoring.intelligence import compute_intelligence_score
+from app.scoring.adoption import compute_adoption_score
+from app.scoring.momentum import compute_momentum_score
+from app.scoring.cis import compute_model_score, compute_cis
+from app.utils.hashing import hash_dataset
+from app.utils import snapshot as snapshot_module
+from bench.synthetic import generate_registry, generate_sources
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+SNAPSHOT_COLUMNS = ["name", "tier", "intelligence_score", "adoption_score",
+                    "momentum_score", "model_score"]
+
+
+def _stages(registry, current, previous, out_dir):
+    """Yield (stage name, callable) pairs; each callable feeds the next via state."""
+    state = {}
+
+    def merge():
+        state["df"] = merge_dataframes(registry, current, previous)
+
+    def normalize():
+        state["df"] = normalize_all(state["df"])
+
+    def intelligence():
+        state["df"]["intelligence_score"] = compute_intelligence_score(state["df"])
+
+    def adoption():
+        state["df"]["adoption_score"] = compute_adoption_score(state["df"])
+
+    def momentum():
+        state["df"]["momentum_score"] = compute_momentum_score(state["df"])
+
+    def model_score():
+        state["df"]["model_score"] = state["df"].apply(compute_model_score, axis=1)
+
+    def cis():
+        state["cis"] = compute_cis(state["df"])
+
+    def build_snapshot():
+        state["snapshot"] = {
+            "epoch_id": "bench",
+            "timestamp": "2026-01-01T00:00:00Z",
+            "cis": state["cis"],
+            "models": state["df"][SNAPSHOT_COLUMNS].to_dict(orient="records"),
+            "engine_version": "bench",
+        }
+
+    def save_snapshot():
+        snapshot_module.SNAPSHOT_DIR = out_dir
+        state["path"] = snapshot_module.save_snapshot(state["snapshot"], "bench", "2026-01-01T00:00:00Z")
+
+    def hash_snapshot():
+        state["hash"] = hash_dataset(state["snapshot"])
+
+    return state, [
+        ("merge_dataframes", merge),
+        ("normalize_all", normalize),
+        ("compute_intelligence_score", intelligence),
+        ("compute_adoption_score", adoption),
+        ("compute_momentum_score", momentum),
+        ("compute_model_score", model_score),
+        ("compute_cis", cis),
+        ("build_snapshot", build_snapshot),
+        ("save_snapshot", save_snapshot),
+        ("hash_dataset", hash_snapshot),
+    ]
+
+
+def run_size(n: int, seed: int, memory: bool) -> dict:
+    registry = generate_registry(n, seed)
+    current, previous = generate_sources(registry, seed)
+    original_dir = snapshot_module.SNAPSHOT_DIR
+    results = {}
+    with tempfile.TemporaryDirectory() as out_dir:
+        passes = [False, True] if memory else [False]
+        for traced in passes:
+            state, stages = _stages(registry, current, previous, out_dir)
+            for name, func in stages:
+                gc.collect()
+                if traced:
+                    tracemalloc.start()
+                start = time.perf_counter()
+                # Stages print progress; keep the benchmark output readable
+                with contextlib.redirect_stdout(io.StringIO()):
+                    func()
+                elapsed = time.perf_counter() - start
+                entry = results.setdefault(name, {})
+                if traced:
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    entry["peak_bytes"] = peak
+                else:
+                    entry["seconds"] = elapsed
+        snapshot_module.SNAPSHOT_DIR = original_dir
+    return {
+        "models": n,
+        "rows": int(len(state["df"])),
+        "cis": state["cis"],
+        "snapshot_sha256": state["hash"],
+        "stages": results,
+        "total_seconds": sum(stage["seconds"] for stage in results.values()),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(old_path: str, new: dict):
+    with open(old_path, "r") as f:
+        old = json.load(f)
+    old_runs = {run["models"]: run for run in old["runs"]}
+    print(f"\nComparing against {old.get('commit')} ({old_path})")
+    for run in new["runs"]:
+        base = old_runs.get(run["models"])
+        if base is None:
+            continue
+        print(f"\n  {run['models']:,} models")
+        for stage, values in run["stages"].items():
+            before = base["stages"].get(stage, {}).get("seconds")
+            if not before:
+                continue
+            ratio = values["seconds"] / before
+            flag = "  ⚠️" if ratio > 1.2 else ""
+            print(f"    {stage:<28} {before:9.4f}s -> {values['seconds']:9.4f}s  x{ratio:5.2f}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pipeline stages on synthetic data")
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="Comma-separated registry sizes (e.g. 1000,10000,100000,1000000)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--output", default=None, help="Results file (default bench/results/<commit>.json)")
+    parser.add_argument("--compare", default=None, help="Previous results file to compare against")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    report = {
+        "commit": _git_commit(),
+        "created": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "seed": args.seed,
+        "runs": [],
+    }
+
+    for n in sizes:
+        print(f"⏱️  {n:,} models...")
+        run = run_size(n, args.seed, memory=not args.no_memory)
+        report["runs"].append(run)
+        for stage, values in run["stages"].items():
+            peak = values.get("peak_bytes")
+            peak_text = f"{peak / 2**20:9.1f} MiB" if peak is not None else ""
+            print(f"    {stage:<28} {values['seconds']:9.4f}s {peak_text}")
+        print(f"    {'total':<28} {run['total_seconds']:9.4f}s")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['commit']}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Results written to {output}")
+
+    if args.compare:
+        compare(args.compare, report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Seeded synthetic registries and source frames for benchmarking.
+
+The data mimics what the live fetchers return: partial coverage per
+source, NaNs, duplicate model names, names unknown to the registry and
+dict-valued junk cells.
+"""
+
+import numpy as np
+import pandas as pd
+
+TIERS = np.array(["A", "B", "C"])
+TIER_SHARES = [0.1, 0.3, 0.6]
+ORGS = ["meta-llama", "mistralai", "Qwen", "deepseek-ai", "google", "microsoft",
+        "01-ai", "zai-org", "MiniMaxAI", "moonshotai", "tiiuae", "bigscience"]
+
+
+def generate_registry(n: int, seed: int = 42, duplicate_rate: float = 0.005) -> list:
+    """Return a registry list like app/models_registry.json with n entries."""
+    rng = np.random.default_rng(seed)
+    names = np.array([f"model-{i}" for i in range(n)], dtype=object)
+    # Re-use earlier names to create duplicates
+    dup_count = int(n * duplicate_rate)
+    if dup_count and n > 1:
+        dup_at = rng.choice(np.arange(1, n), size=dup_count, replace=False)
+        names[dup_at] = names[rng.integers(0, dup_at)]
+
+    tiers = rng.choice(TIERS, size=n, p=TIER_SHARES)
+    orgs = rng.choice(ORGS, size=n)
+    has_hf = rng.random(n) < 0.6
+    has_gh = rng.random(n) < 0.5
+    has_paper = rng.random(n) < 0.3
+
+    registry = []
+    for i in range(n):
+        name = names[i]
+        registry.append({
+            "name": name,
+            "tier": tiers[i],
+            "arena_id": name,
+            "hf_repo": f"{orgs[i]}/{name}" if has_hf[i] else None,
+            "github_repo": f"{orgs[i]}/{name}-src" if has_gh[i] else None,
+            "paper_id": f"arxiv:24{i % 12 + 1:02d}.{i % 100000:05d}" if has_paper[i] else None,
+        })
+    return registry
+
+
+def _frame(rng, names, column, values, coverage, junk_rate, extra_names=0):
+    """Sample a (model, column) frame covering part of names."""
+    names = np.asarray(names, dtype=object)
+    mask = rng.random(len(names)) < coverage
+    models = list(names[mask])
+    vals = list(np.asarray(values)[mask].astype(float))
+
+    # Rows for models that are not in the registry
+    models += [f"unknown-{i}" for i in range(extra_names)]
+    vals += list(rng.random(extra_names) * 100)
+
+    # Duplicate a few rows, as scraped leaderboards sometimes do
+    if models:
+        dup_idx = rng.integers(0, len(models), size=max(1, len(models) // 500))
+        models += [models[i] for i in dup_idx]
+        vals += [vals[i] for i in dup_idx]
+
+    values = pd.Series(vals, dtype=object)
+    values[rng.random(len(values)) < 0.02] = np.nan
+    junk = rng.random(len(values)) < junk_rate
+    for i in np.flatnonzero(junk):
+        values.iat[i] = {"error": "rate limited", "retry": int(i)}
+    return pd.DataFrame({"model": models, column: values})
+
+
+def generate_sources(registry: list, seed: int = 42, junk_rate: float = 0.001):
+    """Return (current, previous) dicts shaped like main.fetch_all_data()."""
+    rng = np.random.default_rng(seed + 1)
+    names = [m["name"] for m in registry]
+    n = len(names)
+    extra = max(1, n // 100)
+    has_hf = np.array([m["hf_repo"] is not None for m in registry])
+    has_gh = np.array([m["github_repo"] is not None for m in registry])
+
+    elo = rng.normal(1150, 80, n)
+    mmlu = np.clip(rng.normal(70, 10, n), 0, 100)
+    gsm8k = np.clip(rng.normal(75, 12, n), 0, 100)
+    humaneval = np.clip(rng.normal(60, 15, n), 0, 100)
+    downloads = np.where(has_hf, rng.lognormal(9, 2.5, n).round(), 0)
+    github = np.where(has_gh, rng.lognormal(7, 2, n), 0)
+    citations = rng.poisson(30, n) * (rng.random(n) < 0.5)
+
+    current = {
+        "arena": _frame(rng, names, "elo", elo, 0.2, junk_rate, extra),
+        "mmlu": _frame(rng, names, "mmlu", mmlu, 0.1, junk_rate, extra),
+        "gsm8k": _frame(rng, names, "gsm8k", gsm8k, 0.1, junk_rate, extra),
+        "humaneval": _frame(rng, names, "humaneval", humaneval, 0.1, junk_rate, extra),
+        "downloads": _frame(rng, names, "downloads", downloads, 1.0, junk_rate),
+        "github": _frame(rng, names, "github", github, 0.5, junk_rate),
+        "citations": _frame(rng, names, "citation_velocity", citations, 1.0, junk_rate),
+    }
+    previous = {}
+    for key in ("arena", "mmlu", "gsm8k", "humaneval", "downloads", "citations"):
+        frame = current[key].copy()
+        col = frame.columns[1]
+        numeric = pd.to_numeric(frame[col], errors="coerce")
+        frame[col] = (numeric * rng.uniform(0.9, 1.0, len(frame))).astype(object)
+        previous[key] = frame
+    return current, previous
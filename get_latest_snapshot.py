@@ -8,31 +8,47 @@ import os
 import json
 from pathlib import Path
 
+def find_latest_file(epochs_dir: Path):
+    """Resolve the latest snapshot via epochs/latest.json, falling back to mtime."""
+    pointer_path = epochs_dir / "latest.json"
+    pointer = {}
+    if pointer_path.exists():
+        with open(pointer_path, 'r') as f:
+            pointer = json.load(f)
+        if "snapshot" in pointer:
+            return epochs_dir / pointer["snapshot"], pointer
+
+    # No pointer (or a legacy full copy): newest snapshot by modification time
+    json_files = sorted(
+        (p for p in epochs_dir.glob("*.json") if p.name != "latest.json" and not p.name.startswith(".")),
+        key=os.path.getmtime, reverse=True
+    )
+    return (json_files[0] if json_files else None), pointer
+
 def get_latest_snapshot():
     """Get the latest snapshot file and its metadata."""
     epochs_dir = Path("epochs")
-    
+
     if not epochs_dir.exists():
         return {"error": "epochs directory not found"}
-    
-    # Get all JSON files sorted by modification time
-    json_files = sorted(epochs_dir.glob("*.json"), key=os.path.getmtime, reverse=True)
-    
-    if not json_files:
+
+    latest_file, pointer = find_latest_file(epochs_dir)
+
+    if latest_file is None:
         return {"error": "No snapshot files found"}
-    
-    latest_file = json_files[0]
-    
+
+    latest_file = latest_file.relative_to(epochs_dir.parent) if latest_file.is_absolute() else latest_file
+
     # Read the snapshot
     with open(latest_file, 'r') as f:
         snapshot_data = json.load(f)
-    
+
     # Generate URLs
     repo = "KudzayiKing/aigi-index-engine"
     branch = "main"
     raw_url = f"https://raw.githubusercontent.com/{repo}/{branch}/{latest_file}"
-    
-    return {
+
+    result = {
         "filename": latest_file.name,
         "path": str(latest_file),
         "raw_url": raw_url,
@@ -43,6 +59,16 @@ def get_latest_snapshot():
         "engine_version": snapshot_data.get("engine_version")
     }
 
+    if pointer.get("cid"):
+        result["ipfs_cid"] = pointer["cid"]
+    if pointer.get("sha256"):
+        result["sha256"] = pointer["sha256"]
+    # Smaller downloads for pollers
+    for name, path in pointer.get("variants", {}).items():
+        result[f"{name}_url"] = f"https://raw.githubusercontent.com/{repo}/{branch}/epochs/{path}"
+
+    return result
+
 if __name__ == "__main__":
     result = get_latest_snapshot()
     print(json.dumps(result, indent=2))
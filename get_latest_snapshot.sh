@@ -4,8 +4,13 @@
 REPO="KudzayiKing/aigi-index-engine"
 BRANCH="main"
 
-# Get the latest snapshot filename
-LATEST_FILE=$(ls -t epochs/*.json | head -n 1)
+# Resolve the latest snapshot through the epochs/latest.json pointer
+LATEST_FILE=$(python3 -c 'import json; p = json.load(open("epochs/latest.json")); print("epochs/" + p["snapshot"])' 2>/dev/null)
+
+# Fall back to the newest snapshot file
+if [ -z "$LATEST_FILE" ]; then
+    LATEST_FILE=$(ls -t epochs/*.json 2>/dev/null | grep -v '/latest.json$' | head -n 1)
+fi
 
 if [ -z "$LATEST_FILE" ]; then
     echo "Error: No snapshot files found"
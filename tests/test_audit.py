@@ -0,0 +1,107 @@
+"""
+Integrity audit: an epoch published to a temp directory audits clean; a
+flipped snapshot byte and an altered raw record are reported and fail the
+audit.
+"""
+
+import os
+import gzip
+import json
+import socket
+
+import pandas as pd
+import pytest
+
+from app import audit
+from app.data_sources import archive
+from app.main import compute_snapshot, publish_epoch
+from app.utils import ipfs
+from app.utils.hashing import hash_dataset
+from app.utils.snapshot import save_snapshot
+
+EPOCH_ID = "2099-01"
+TIMESTAMP = "2099-01-01T00:00:00Z"
+REGISTRY = [{"name": f"model-{i}", "tier": "ABC"[i % 3]} for i in range(6)]
+
+
+@pytest.fixture
+def published(tmp_path, monkeypatch) -> dict:
+    """Snapshot path and raw record paths of one epoch published under tmp_path/epochs."""
+    monkeypatch.chdir(tmp_path)
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        closed_port = s.getsockname()[1]
+    # No IPFS node: the pin is skipped, CIDs are computed locally
+    monkeypatch.setattr(ipfs, "IPFS_API_URL", f"http://127.0.0.1:{closed_port}")
+
+    names = [m["name"] for m in REGISTRY]
+    current = {
+        "arena": pd.DataFrame({"model": names, "elo": [1000.0 + 40 * i for i in range(6)]}),
+        "github": pd.DataFrame({"model": names, "github": [2.5 * i for i in range(6)]}),
+    }
+    archive.set_mode("record", EPOCH_ID)
+    try:
+        archive.record("registry", REGISTRY)
+        records = {source: archive.record(source, frame) for source, frame in current.items()}
+        snapshot = compute_snapshot(REGISTRY, current, {"arena": current["arena"]}, EPOCH_ID, TIMESTAMP)
+        snapshot_hash = hash_dataset(snapshot)
+        archive.write_index(EPOCH_ID, TIMESTAMP, snapshot_sha256=snapshot_hash)
+        path = save_snapshot(snapshot, EPOCH_ID, TIMESTAMP)
+        publish_epoch(snapshot, path, snapshot_hash, EPOCH_ID)
+    finally:
+        archive.set_mode("off", EPOCH_ID)
+    raw_dir = os.path.join("epochs", "raw", EPOCH_ID)
+    return {"snapshot": path, "records": {s: os.path.join(raw_dir, f"{d}.json.gz") for s, d in records.items()}}
+
+
+def run(workers: int = 1) -> dict:
+    return audit.Audit("epochs", os.path.join("epochs", "raw"), workers=workers).run()
+
+
+def problems(report: dict) -> set:
+    return {(f["path"], f["problem"]) for f in report["findings"]}
+
+
+def test_published_epoch_audits_clean(published, capsys):
+    report = run()
+    assert report["ok"] and report["findings"] == []
+    assert report["epochs"] == 1 and report["raw_epochs"] == 1
+    # Variants and raw records were read
+    assert report["files"] > 4
+    audit.main(["--dir", "epochs", "--raw-dir", os.path.join("epochs", "raw"), "--workers", "2"])
+    assert "✅ Audited" in capsys.readouterr().out
+
+
+def test_corruption_is_reported(published, capsys):
+    assert run()["ok"]
+
+    # One byte of the snapshot: a digit of the CIS value
+    snapshot = published["snapshot"]
+    with open(snapshot, "rb") as f:
+        body = bytearray(f.read())
+    at = body.index(b'"cis": ') + len(b'"cis": ')
+    body[at] = ord("9") if body[at] != ord("9") else ord("1")
+    with open(snapshot, "wb") as f:
+        f.write(bytes(body))
+
+    # One raw record: still a valid gzip file, with different content
+    record = published["records"]["github"]
+    with gzip.open(record, "rb") as f:
+        payload = json.loads(f.read())
+    payload["frame"]["data"][0][1] = 99.0
+    with open(record, "wb") as f:
+        f.write(gzip.compress(json.dumps(payload).encode("utf-8")))
+
+    report = run(workers=2)
+    assert not report["ok"]
+    found = problems(report)
+    snapshot_rel = os.path.relpath(snapshot, "epochs")
+    assert (snapshot_rel, "sha256 mismatch") in found
+    assert (snapshot_rel, "cid mismatch") in found
+    assert (os.path.relpath(record, "epochs"), "content mismatch") in found
+
+    with pytest.raises(SystemExit) as exit_info:
+        audit.main(["--dir", "epochs", "--raw-dir", os.path.join("epochs", "raw"), "--workers", "1"])
+    assert exit_info.value.code != 0
+    out = capsys.readouterr().out
+    assert "sha256 mismatch" in out and "content mismatch" in out
@@ -0,0 +1,78 @@
+"""
+Fetch cache single-flight: concurrent callers for one key, in threads or
+separate processes, share a single fetch.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+import subprocess
+
+from app.utils import cache
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_threads_share_one_fetch(tmp_path):
+    calls = []
+    start = threading.Barrier(4)
+    results = [None] * 4
+
+    def fetch():
+        calls.append(threading.get_ident())
+        time.sleep(0.2)
+        return {"scores": [1, 2, 3]}
+
+    def caller(i):
+        start.wait()
+        results[i] = cache.get_or_fetch("shared-key", fetch, cache_dir=str(tmp_path))
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert results == [{"scores": [1, 2, 3]}] * 4
+    assert cache.load("shared-key", cache_dir=str(tmp_path)) == {"scores": [1, 2, 3]}
+
+
+# Each process appends to a log when it runs fetch(), then prints the value it got
+CALLER = """
+import sys, time
+from app.utils import cache
+cache_dir, log = sys.argv[1], sys.argv[2]
+def fetch():
+    with open(log, "a") as f:
+        f.write("fetched\\n")
+    time.sleep(0.5)
+    return {"value": 42}
+print(cache.get_or_fetch("process-key", fetch, cache_dir=cache_dir))
+"""
+
+
+def test_processes_share_one_fetch(tmp_path):
+    log = tmp_path / "fetches.log"
+    cache_dir = tmp_path / "cache"
+    procs = [subprocess.Popen([sys.executable, "-c", CALLER, str(cache_dir), str(log)], cwd=ROOT,
+                              stdout=subprocess.PIPE, text=True) for _ in range(3)]
+    outputs = [p.communicate(timeout=60)[0].strip() for p in procs]
+    assert all(p.returncode == 0 for p in procs)
+    assert log.read_text() == "fetched\n"
+    assert outputs == ["{'value': 42}"] * 3
+    with open(cache_dir / "process-key.json") as f:
+        assert json.load(f)["value"] == {"value": 42}
+
+
+def test_empty_result_is_not_stored(tmp_path):
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return []
+
+    for _ in range(2):
+        assert cache.get_or_fetch("empty", fetch, cache_dir=str(tmp_path)) == []
+    assert len(calls) == 2
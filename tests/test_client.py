@@ -0,0 +1,168 @@
+"""
+OracleClient against local stand-in servers: the read API (app.serving)
+and a static file host serving a published epochs/ layout.
+"""
+
+import os
+import json
+import functools
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.client import OracleClient, VerificationError
+from app.serving.server import make_server
+from app.serving.store import SnapshotStore
+from app.utils.hashing import hash_dataset
+from app.utils.snapshot import save_snapshot, publish_snapshot
+
+SNAPSHOT = {
+    "epoch_id": "2099-01",
+    "timestamp": "2099-01-01T00:00:00Z",
+    "cis": 7.2174,
+    "models": [
+        {"name": "model-a", "tier": "A", "model_score": 0.91},
+        {"name": "model-b", "tier": "B", "model_score": 0.42},
+    ],
+    "engine_version": "1.0.0",
+}
+SHA256 = hash_dataset(SNAPSHOT)
+
+
+class FileHost(SimpleHTTPRequestHandler):
+    """Static host (Last-Modified / If-Modified-Since, no ETag) that logs each response."""
+
+    log = []
+
+    def send_response(self, code, message=None):
+        self.log.append((self.path, code))
+        super().send_response(code, message)
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+@pytest.fixture
+def published(tmp_path, monkeypatch):
+    """A published epochs/ layout (snapshot, dist variants, latest.json pointer) under tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    path = save_snapshot(SNAPSHOT, SNAPSHOT["epoch_id"], SNAPSHOT["timestamp"])
+    publish_snapshot(SNAPSHOT, path, sha256=SHA256)
+    return tmp_path
+
+
+@pytest.fixture
+def file_host(published):
+    FileHost.log = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(FileHost, directory=str(published)))
+    yield _serve(server)
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def read_api(published):
+    store = SnapshotStore(str(published / "epochs"), str(published / "epochs" / "manifest.jsonl"))
+    store.load()
+    server = make_server(store, "127.0.0.1", 0)
+    yield _serve(server)
+    server.shutdown()
+    server.server_close()
+
+
+class CountingSession:
+    """requests.Session wrapper recording the status of every response."""
+
+    def __init__(self):
+        import requests
+        self.session = requests.Session()
+        self.statuses = []
+
+    def get(self, *args, **kwargs):
+        response = self.session.get(*args, **kwargs)
+        self.statuses.append(response.status_code)
+        return response
+
+
+def _client(base_url, cache_dir, layout, session=None):
+    return OracleClient(base_url, str(cache_dir), layout=layout, max_age=0, session=session)
+
+
+def test_api_revalidates_with_304(read_api, tmp_path):
+    session = CountingSession()
+    client = _client(read_api, tmp_path / "cache", "api", session)
+    first = client.refresh()
+    assert first.sha256 == SHA256
+    assert first.model("model-a")["model_score"] == 0.91
+    assert client.refresh() is first
+    assert session.statuses == [200, 304]
+
+    # A new process reuses the validators and the verified body on disk
+    session = CountingSession()
+    again = _client(read_api, tmp_path / "cache", "api", session).refresh()
+    assert again.sha256 == SHA256 and again.cis == SNAPSHOT["cis"]
+    assert session.statuses == [304]
+
+
+def test_corrupt_cache_entry_is_refetched(read_api, tmp_path):
+    cache_dir = tmp_path / "cache"
+    _client(read_api, cache_dir, "api").refresh()
+    entry = cache_dir / "snapshots" / f"{SHA256}.json"
+    tampered = dict(SNAPSHOT, cis=99.0)
+    entry.write_text(json.dumps(tampered))
+
+    session = CountingSession()
+    snapshot = _client(read_api, cache_dir, "api", session).refresh()
+    assert snapshot.sha256 == SHA256 and snapshot.cis == SNAPSHOT["cis"]
+    # 304 for the stale validators, then one unconditional download
+    assert session.statuses == [304, 200]
+    assert hash_dataset(json.loads(entry.read_text())) == SHA256
+
+
+def test_files_layout_downloads_gzip_variant(file_host, published, tmp_path):
+    client = _client(file_host, tmp_path / "cache", "files")
+    snapshot = client.refresh()
+    assert snapshot.sha256 == SHA256
+    assert snapshot.epoch_id == SNAPSHOT["epoch_id"]
+
+    pointer = json.loads((published / "epochs" / "latest.json").read_text())
+    gzip_path = f"/epochs/{pointer['variants']['gzip']}"
+    assert gzip_path.endswith(".min.json.gz")
+    assert FileHost.log == [("/epochs/latest.json", 200), (gzip_path, 200)]
+
+    # Unchanged pointer: one conditional request, no download
+    FileHost.log = []
+    assert client.refresh().sha256 == SHA256
+    assert FileHost.log == [("/epochs/latest.json", 304)]
+
+
+def test_files_layout_reuses_cached_hash(file_host, published, tmp_path):
+    cache_dir = tmp_path / "cache"
+    _client(file_host, cache_dir, "files").refresh()
+    # The pointer changes (new Last-Modified) but names a hash already in the cache
+    latest = published / "epochs" / "latest.json"
+    pointer = json.loads(latest.read_text())
+    latest.write_text(json.dumps(dict(pointer, note="republished")))
+    os.utime(latest, (0, os.stat(latest).st_mtime + 5))
+
+    FileHost.log = []
+    assert _client(file_host, cache_dir, "files").refresh().sha256 == SHA256
+    assert [path for path, _ in FileHost.log] == ["/epochs/latest.json"]
+
+
+def test_hash_mismatch_raises(file_host, published, tmp_path):
+    latest = published / "epochs" / "latest.json"
+    pointer = json.loads(latest.read_text())
+    latest.write_text(json.dumps(dict(pointer, sha256="0" * 64)))
+
+    cache_dir = tmp_path / "cache"
+    with pytest.raises(VerificationError):
+        _client(file_host, cache_dir, "files").refresh()
+    assert not (cache_dir / "snapshots").exists() or not os.listdir(cache_dir / "snapshots")
@@ -0,0 +1,149 @@
+"""
+Server-sent events: ring-buffer replay from a Last-Event-ID, a reset when
+the missed events already left the buffer, and subscribers that hang up
+being dropped.
+"""
+
+import socket
+import threading
+
+import pytest
+
+from app.serving import server as api
+from app.serving.events import Broadcaster, RESET_FRAME
+from app.serving.server import SnapshotRequestHandler, make_server
+from app.serving.store import SnapshotStore
+from app.utils.snapshot import save_snapshot
+
+
+def frame(event_id: int, event: str = "epoch", cis: float = None) -> bytes:
+    cis = event_id if cis is None else cis
+    return f'id: {event_id}\nevent: {event}\ndata: {{"cis":{cis}}}\n\n'.encode("utf-8")
+
+
+def publish(broadcaster: Broadcaster, count: int):
+    for _ in range(count):
+        broadcaster.publish("epoch", {"cis": broadcaster.head + 1})
+
+
+def test_replay_from_cursor():
+    events = Broadcaster(size=4)
+    publish(events, 3)
+    assert events.read(1, timeout=0) == ([frame(2), frame(3)], 3, False)
+    assert events.read(0, timeout=0) == ([frame(1), frame(2), frame(3)], 3, False)
+    # Nothing newer: waits out the timeout
+    assert events.read(3, timeout=0.05) == ([], 3, False)
+
+
+def test_evicted_events_are_reported_missed():
+    events = Broadcaster(size=4)
+    publish(events, 6)
+    # Events 2 and 3 have left the buffer (it holds 3..6)
+    frames, cursor, missed = events.read(1, timeout=0)
+    assert frames == [frame(3), frame(4), frame(5), frame(6)] and cursor == 6 and missed
+    assert events.read(2, timeout=0)[2] is False
+    # An id from before a restart (ahead of this run) also resets
+    assert events.read(50, timeout=0) == ([], 6, True)
+
+
+def test_read_wakes_on_publish_and_close():
+    events = Broadcaster()
+    results = []
+    reader = threading.Thread(target=lambda: results.append(events.read(0, timeout=10)))
+    reader.start()
+    events.publish("provisional", {"cis": 7.5})
+    reader.join(5)
+    assert results == [([frame(1, "provisional", 7.5)], 1, False)]
+
+    waiter = threading.Thread(target=events.read, args=(1, 10))
+    waiter.start()
+    events.close()
+    waiter.join(5)
+    assert not waiter.is_alive()
+
+
+class TrackedHandler(SnapshotRequestHandler):
+    """Counts event streams that are still being served."""
+
+    streams = 0
+    ended = threading.Event()
+    lock = threading.Lock()
+
+    def _stream_events(self):
+        with TrackedHandler.lock:
+            TrackedHandler.streams += 1
+        try:
+            super()._stream_events()
+        finally:
+            with TrackedHandler.lock:
+                TrackedHandler.streams -= 1
+            TrackedHandler.ended.set()
+
+
+@pytest.fixture
+def feed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(api, "SSE_KEEPALIVE", 0.1)
+    data = {"epoch_id": "2099-01", "timestamp": "2099-01-01T00:00:00Z", "cis": 7.0, "models": [],
+            "engine_version": "1.0.0"}
+    save_snapshot(data, data["epoch_id"], data["timestamp"])
+    store = SnapshotStore(str(tmp_path / "epochs"), str(tmp_path / "epochs" / "manifest.jsonl"))
+    store.load()
+    events = Broadcaster(size=4)
+    TrackedHandler.streams = 0
+    TrackedHandler.ended.clear()
+    server = make_server(store, "127.0.0.1", 0, handler=TrackedHandler, events=events)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield events, server.server_address[1]
+    events.close()
+    server.shutdown()
+    server.server_close()
+
+
+def subscribe(port: int, last_event_id: int = None) -> socket.socket:
+    sock = socket.create_connection(("127.0.0.1", port), timeout=10)
+    headers = f"Last-Event-ID: {last_event_id}\r\n" if last_event_id is not None else ""
+    sock.sendall(f"GET /events HTTP/1.1\r\nHost: test\r\n{headers}\r\n".encode("ascii"))
+    return sock
+
+
+def read_until(sock: socket.socket, expected: bytes) -> bytes:
+    received = b""
+    while expected not in received:
+        chunk = sock.recv(65536)
+        assert chunk, received
+        received += chunk
+    return received
+
+
+def test_stream_replays_after_last_event_id(feed):
+    events, port = feed
+    publish(events, 3)
+    with subscribe(port, last_event_id=1) as sock:
+        received = read_until(sock, frame(3))
+        body = received.split(b"\r\n\r\n", 1)[1]
+        assert body.startswith(b"retry: 5000\n\n" + frame(2) + frame(3))
+        # Live events follow the replay
+        events.publish("epoch", {"cis": 4})
+        read_until(sock, frame(4))
+
+
+def test_stream_resets_when_events_were_evicted(feed):
+    events, port = feed
+    publish(events, 6)
+    with subscribe(port, last_event_id=1) as sock:
+        received = read_until(sock, frame(6))
+        assert RESET_FRAME + frame(3) in received
+
+
+def test_disconnected_subscriber_is_dropped(feed):
+    events, port = feed
+    sock = subscribe(port)
+    read_until(sock, b"retry: 5000\n\n")
+    assert TrackedHandler.streams == 1
+    sock.close()
+    # The next keepalive or event write fails and the stream ends
+    publish(events, 1)
+    assert TrackedHandler.ended.wait(10)
+    assert TrackedHandler.streams == 0
@@ -0,0 +1,149 @@
+"""
+HostController wait accounting (only an acquire that blocked reports time
+waited), the per-host circuit breaker, and splitting each host's limits
+between processes that fetch at once.
+"""
+
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.data_sources import http_client
+from app.data_sources.http_client import CircuitBreaker, CircuitOpen, HostController
+
+
+def test_free_slot_reports_no_wait():
+    controller = HostController("example.test", max_limit=4)
+    for _ in range(20):
+        assert controller.acquire() == 0.0
+        controller.cancel()
+
+
+def test_blocked_acquire_reports_wait():
+    controller = HostController("example.test", max_limit=1)
+    assert controller.acquire() == 0.0
+    # The only slot is taken until another thread gives it back
+    timer = threading.Timer(0.05, controller.cancel)
+    timer.start()
+    waited = controller.acquire()
+    timer.join()
+    assert waited >= 0.04
+
+    controller.cancel()
+    controller.not_before = time.monotonic() + 0.05
+    assert controller.acquire() >= 0.04
+
+
+def test_circuit_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("example.test", failures=3, cooldown=60)
+    for _ in range(2):
+        breaker.allow()
+        breaker.record(False)
+    # A success in between resets the count
+    breaker.record(True)
+    for _ in range(2):
+        breaker.record(False)
+    breaker.allow()
+    breaker.record(False)
+    with pytest.raises(CircuitOpen):
+        breaker.allow()
+
+
+def test_half_open_trial():
+    breaker = CircuitBreaker("example.test", failures=1, cooldown=0.05)
+    breaker.record(False)
+    with pytest.raises(CircuitOpen):
+        breaker.allow()
+    time.sleep(0.06)
+    # One trial request after the cooldown; others are still refused
+    breaker.allow()
+    with pytest.raises(CircuitOpen):
+        breaker.allow()
+    # A failed trial opens the circuit for another cooldown
+    breaker.record(False)
+    with pytest.raises(CircuitOpen):
+        breaker.allow()
+    time.sleep(0.06)
+    breaker.allow()
+    breaker.record(True)
+    for _ in range(3):
+        breaker.allow()
+
+
+def test_open_circuit_skips_the_request():
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests_seen.append(self.path)
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host = f"127.0.0.1:{server.server_address[1]}"
+        assert http_client.get(f"http://{host}/first").status_code == 200
+        breaker = http_client.controller_for(host).breaker
+        for _ in range(breaker.threshold):
+            breaker.record(False)
+        with pytest.raises(CircuitOpen):
+            http_client.get(f"http://{host}/second")
+        assert requests_seen == ["/first"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class QuotaResponse:
+    """Just the rate-limit headers of a GitHub response."""
+
+    status_code = 200
+
+    def __init__(self, limit: int, remaining: int, reset_in: float):
+        self.headers = {"X-RateLimit-Limit": str(limit), "X-RateLimit-Remaining": str(remaining),
+                        "X-RateLimit-Reset": str(time.time() + reset_in)}
+
+
+@pytest.fixture
+def share(monkeypatch):
+    monkeypatch.setattr(http_client, "HTTP_MAX_CONCURRENCY", 16)
+    monkeypatch.setattr(http_client, "HTTP_QUOTA_RESERVE", 0.1)
+    yield http_client.set_share
+    http_client.set_share(1)
+
+
+def test_share_splits_concurrency(share):
+    inherited = http_client.controller_for("shared.test")
+    share(4)
+    controller = http_client.controller_for("shared.test")
+    # Controllers from before the split are not reused
+    assert controller is not inherited
+    assert controller.max_limit == 4
+    share(32)
+    assert http_client.controller_for("shared.test").max_limit == 1
+
+
+def test_share_paces_its_part_of_the_quota(share):
+    alone = HostController("quota.test")
+    alone.acquire()
+    alone.release(QuotaResponse(limit=1000, remaining=80, reset_in=60))
+    assert alone.interval == pytest.approx(60 / 80, rel=0.05)
+
+    share(4)
+    shard = http_client.controller_for("quota.test")
+    # Each of 4 processes owns 50 of the 200 left, above its reserve of 25
+    shard.acquire()
+    shard.release(QuotaResponse(limit=1000, remaining=200, reset_in=60))
+    assert shard.interval == 0.0
+    shard.acquire()
+    shard.release(QuotaResponse(limit=1000, remaining=80, reset_in=60))
+    # Four processes each spacing requests by this send 80 in 60s, as one process would
+    assert shard.interval == pytest.approx(60 / 20, rel=0.05)
@@ -0,0 +1,199 @@
+"""
+Local CID computation against `ipfs add --cid-version=1 --raw-leaves`.
+
+The pinned CIDs are the ones kubo reports for these inputs. Multi-chunk
+files and nested directories are compared with the `ipfs` CLI when it is
+installed (the test workflow installs kubo).
+"""
+
+import os
+import json
+import random
+import shutil
+import socket
+import subprocess
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, unquote
+
+import pytest
+
+from app.utils import ipfs
+
+needs_ipfs = pytest.mark.skipif(shutil.which("ipfs") is None, reason="ipfs CLI not installed")
+
+EMPTY_FILE = "bafkreihdwdcefgh4dqkjv67uzcmw7ojee6xedzdetojuzjevtenxquvyku"
+HELLO_WORLD = "bafkreide5semuafsnds3ugrvm6fbwuyw2ijpj43gwjdxemstjkfozi37hq"
+EMPTY_DIRECTORY = "bafybeiczsscdsbs7ffqz55asqdf3smv6klcw3gofszvwlyarci47bgf354"
+
+
+def _random_bytes(size: int, seed: int = 0) -> bytes:
+    return random.Random(seed).randbytes(size)
+
+
+def _ipfs_add(*args) -> str:
+    cmd = ["ipfs", "add", "-Q", "--only-hash", "--cid-version=1", "--raw-leaves", *args]
+    return subprocess.run(cmd, capture_output=True, text=True, check=True).stdout.strip()
+
+
+@pytest.fixture
+def nested(tmp_path):
+    root = tmp_path / "epoch"
+    (root / "dist" / "deep").mkdir(parents=True)
+    (root / "empty").mkdir()
+    (root / "snapshot.json").write_bytes(b'{"cis": 7.2174}\n')
+    (root / "dist" / "snapshot.min.json").write_bytes(b'{"cis":7.2174}')
+    (root / "dist" / "deep" / "blob.bin").write_bytes(_random_bytes(3 * ipfs.CHUNK_SIZE + 17, seed=1))
+    (root / "dist" / "époque.txt").write_bytes(b"non-ascii name\n")
+    return root
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty"
+    path.write_bytes(b"")
+    assert ipfs.compute_cid(b"") == EMPTY_FILE
+    assert ipfs.compute_file_cid(str(path)) == EMPTY_FILE
+    assert ipfs.hash_file(str(path))["cid"] == EMPTY_FILE
+
+
+def test_single_chunk_file(tmp_path):
+    path = tmp_path / "hello"
+    path.write_bytes(b"Hello world")
+    assert ipfs.compute_cid(b"Hello world") == HELLO_WORLD
+    assert ipfs.compute_file_cid(str(path)) == HELLO_WORLD
+
+
+def test_full_chunk_is_one_raw_leaf():
+    data = _random_bytes(ipfs.CHUNK_SIZE)
+    assert ipfs.compute_cid(data).startswith("bafkrei")
+    assert ipfs.compute_cid(data + b"x").startswith("bafybei")
+
+
+def test_empty_directory(tmp_path):
+    (tmp_path / "empty").mkdir()
+    assert ipfs.compute_file_cid(str(tmp_path / "empty")) == EMPTY_DIRECTORY
+
+
+def test_streaming_matches_in_memory(tmp_path):
+    # 175 leaves: one more than a node holds, so the root is two levels deep
+    data = _random_bytes((ipfs.MAX_LINKS + 1) * ipfs.CHUNK_SIZE - 5)
+    path = tmp_path / "big.bin"
+    path.write_bytes(data)
+    info = ipfs.hash_file(str(path))
+    assert info["bytes"] == len(data)
+    assert info["cid"] == ipfs.compute_cid(data) == ipfs.compute_file_cid(str(path))
+    assert info["tsize"] > len(data)
+
+
+def test_directory_cid_from_links(nested):
+    paths = sorted(str(p) for p in nested.iterdir())
+    links = []
+    for path in paths:
+        cid, tsize = ipfs._path_root(path)
+        links.append((os.path.basename(path), ipfs.cid_to_str(cid), tsize))
+    assert ipfs.directory_cid(links)[0] == ipfs.compute_directory_cid(paths)
+
+
+@needs_ipfs
+@pytest.mark.parametrize("size", [0, 11, ipfs.CHUNK_SIZE, ipfs.CHUNK_SIZE + 1,
+                                  ipfs.MAX_LINKS * ipfs.CHUNK_SIZE,
+                                  (ipfs.MAX_LINKS + 1) * ipfs.CHUNK_SIZE + 3])
+def test_file_matches_ipfs_cli(tmp_path, size):
+    path = tmp_path / "file.bin"
+    path.write_bytes(_random_bytes(size, seed=size))
+    assert ipfs.compute_file_cid(str(path)) == _ipfs_add(str(path))
+
+
+@needs_ipfs
+def test_nested_directory_matches_ipfs_cli(nested):
+    assert ipfs.compute_file_cid(str(nested)) == _ipfs_add("-r", str(nested))
+    paths = [str(nested / "snapshot.json"), str(nested / "dist")]
+    assert ipfs.compute_directory_cid(paths) == _ipfs_add("-r", "-w", *paths)
+
+
+# -- add_directory against a stand-in node ------------------------------------
+
+class StandInNode(BaseHTTPRequestHandler):
+    """Answers /api/v0/add like a node: one NDJSON line per entry, wrapper last."""
+
+    requests = []
+    root = "bafybeistandinwrapperdirectory"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        url = urlparse(self.path)
+        names = [unquote(part.split(b'"', 1)[0].decode()) for part in body.split(b'filename="')[1:]]
+        self.requests.append({"path": url.path, "params": parse_qs(url.query), "names": names})
+        lines = [{"Name": name, "Hash": f"bafk{i}", "Size": "1"} for i, name in enumerate(names)]
+        lines.append({"Name": "", "Hash": self.root, "Size": "1"})
+        payload = "\n".join(json.dumps(line) for line in lines).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def node():
+    StandInNode.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInNode)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_add_directory_posts_one_batch(node, nested):
+    paths = [str(nested / "snapshot.json"), str(nested / "dist")]
+    assert ipfs.add_directory(paths, node) == StandInNode.root
+
+    (request,) = StandInNode.requests
+    assert request["path"] == "/api/v0/add"
+    assert request["params"] == {"wrap-with-directory": ["true"], "cid-version": ["1"],
+                                 "raw-leaves": ["true"], "pin": ["true"]}
+    assert request["names"] == [
+        "snapshot.json",
+        "dist",
+        "dist/deep",
+        "dist/snapshot.min.json",
+        "dist/époque.txt",
+        "dist/deep/blob.bin",
+    ]
+
+
+def test_publisher_reports_pinned_root(node, nested):
+    paths = [str(nested / "snapshot.json")]
+    StandInNode.root = ipfs.compute_directory_cid(paths)
+    done = []
+    publisher = ipfs.IPFSPublisher(node)
+    expected = publisher.publish(paths, on_done=lambda *result: done.append(result))
+    assert publisher.wait(timeout=10) == [expected]
+    assert done == [(expected, expected)]
+
+
+@pytest.fixture
+def fake_cli(tmp_path, monkeypatch):
+    """An `ipfs` executable on PATH that logs its arguments and prints a CID."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    log = tmp_path / "ipfs-args"
+    script = bin_dir / "ipfs"
+    script.write_text(f'#!/bin/sh\nprintf "%s\\n" "$@" > "{log}"\necho bafybeifromthecli\n')
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    return log
+
+
+def test_add_directory_falls_back_to_cli(fake_cli, nested):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        closed = f"http://127.0.0.1:{s.getsockname()[1]}"
+    paths = [str(nested / "snapshot.json"), str(nested / "dist")]
+    assert ipfs.add_directory(paths, closed, timeout=5) == "bafybeifromthecli"
+    assert fake_cli.read_text().split("\n")[:-1] == [
+        "add", "-Q", "-r", "-w", "--cid-version=1", "--raw-leaves", "--pin=true", *paths,
+    ]
@@ -0,0 +1,38 @@
+"""
+Leaderboard files match registry models by hf_repo or name, ignoring case,
+in Parquet (filter in the scan) and CSV alike.
+"""
+
+import pandas as pd
+import pytest
+
+from app.data_sources.leaderboards import extract_scores, registry_keys
+
+REGISTRY = [
+    {"name": "llama-3-8b", "hf_repo": "meta-llama/Meta-Llama-3-8B"},
+    {"name": "Mistral-7B", "hf_repo": None},
+    {"name": "gpt-4", "hf_repo": "None"},
+]
+COLUMNS = {"model": "fullname", "mmlu": "MMLU"}
+ROWS = pd.DataFrame({
+    # Each model spelled in a case other than the registry's; two revisions of one
+    "fullname": ["META-LLAMA/meta-llama-3-8b", "Meta-Llama/Meta-Llama-3-8B", "mistral-7b",
+                 "GPT-4", "someone/unrelated"],
+    "MMLU": [66.1, 68.4, 62.5, 86.4, 10.0],
+    "GSM8K": [79.6, 80.0, 52.2, 92.0, 5.0],
+})
+EXPECTED = {"mmlu": [["Mistral-7B", 62.5], ["gpt-4", 86.4], ["llama-3-8b", 68.4]]}
+
+
+def test_parquet_matches_any_case(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "results.parquet"
+    # One row per row group, so the filter runs on every group
+    ROWS.to_parquet(path, row_group_size=1)
+    assert extract_scores(str(path), COLUMNS, registry_keys(REGISTRY)) == EXPECTED
+
+
+def test_csv_matches_any_case(tmp_path):
+    path = tmp_path / "results.csv"
+    ROWS.to_csv(path, index=False)
+    assert extract_scores(str(path), COLUMNS, registry_keys(REGISTRY)) == EXPECTED
@@ -0,0 +1,92 @@
+"""
+Paper resolution cache: a model is searched once, including when the
+search finds no paper, until the entry is invalidated or expires.
+"""
+
+import json
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+
+from app.data_sources import citations, papers
+
+
+class StandInSearch(BaseHTTPRequestHandler):
+    """/graph/v1/paper/search: a technical report for known models, nothing for others."""
+
+    queries = []
+    known = {"model-a"}
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)["query"][0]
+        self.queries.append(query)
+        data = [{"paperId": f"id-{query}", "title": f"{query}: Technical Report", "year": 2024}] \
+            if query in self.known else []
+        payload = json.dumps({"data": data}).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def search(monkeypatch):
+    StandInSearch.queries = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInSearch)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(citations, "SEMANTIC_SCHOLAR_API_URL", f"http://127.0.0.1:{server.server_address[1]}")
+    yield StandInSearch.queries
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def cache_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "paper_resolutions.json")
+    load, save = papers.load_cache, papers.save_cache
+    # The default path is bound at import; point it at tmp_path
+    monkeypatch.setattr(papers, "load_cache", lambda cache_path=path: load(cache_path))
+    monkeypatch.setattr(papers, "save_cache", lambda entries, cache_path=path: save(entries, cache_path))
+    return path
+
+
+REGISTRY = [{"name": "model-a"}, {"name": "model-b"}, {"name": "model-c", "paper_id": "arxiv:2303.08774"}]
+
+
+def test_second_resolve_makes_no_search(search, cache_path):
+    first = citations.resolve_papers(REGISTRY, {})
+    assert first == {"model-a": "id-model-a", "model-c": "arXiv:2303.08774"}
+    assert sorted(search) == ["model-a", "model-b"]
+
+    search.clear()
+    assert citations.resolve_papers(REGISTRY, {}) == first
+    assert search == []
+    # model-b is cached as having no paper, not as a failed search
+    assert papers.load_cache()["model-b"]["paper_id"] is None
+
+
+def test_negative_entry_expires(search, cache_path, monkeypatch):
+    citations.resolve_papers(REGISTRY, {})
+    monkeypatch.setattr(papers, "PAPER_NEGATIVE_MAX_AGE", 3600)
+    cache = papers.load_cache()
+    stale = (datetime.utcnow() - timedelta(hours=2)).isoformat() + "Z"
+    papers.save_cache({"model-b": dict(cache["model-b"], resolved_at=stale)})
+
+    search.clear()
+    citations.resolve_papers(REGISTRY, {})
+    assert search == ["model-b"]
+
+
+def test_invalidated_entry_is_searched(search, cache_path):
+    citations.resolve_papers(REGISTRY, {})
+    papers.invalidate(["model-b"], path=cache_path)
+    search.clear()
+    citations.resolve_papers(REGISTRY, {})
+    assert search == ["model-b"]
@@ -0,0 +1,129 @@
+"""
+The execution modes must publish the same snapshot: single process,
+sharded (AIGI_SHARDS) and streamed (AIGI_STREAMING) runs of one epoch
+against the mock APIs, with and without sub-indices, each replayed from
+its own raw archive.
+
+Every run is a separate `python -m app.main` process, since settings are
+read from the environment at import time.
+"""
+
+import os
+import sys
+import json
+import socket
+import threading
+import subprocess
+
+import pytest
+
+from app.config import MODELS_REGISTRY_PATH
+from app.data_sources.mock_server import Fixtures, MockAPIServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INDICES_PATH = os.path.join(ROOT, "app", "indices.json")
+EPOCH_ID = "2099-01"
+TIMESTAMP = "2099-01-01T00:00:00Z"
+# Variables that would change the run under test
+CLEARED = ("AIGI_SHARDS", "AIGI_SHARD_WORKERS", "AIGI_STREAMING", "AIGI_STREAM_CHUNK_SIZE",
+           "AIGI_INDICES_PATH", "AIGI_TRACE", "RAW_ARCHIVE_MODE", "REPLAY_EPOCH_ID")
+
+
+@pytest.fixture(scope="module")
+def mock_api():
+    with open(os.path.join(ROOT, MODELS_REGISTRY_PATH), "r") as f:
+        registry = json.load(f)
+    # Every run fetches again; no GitHub quota runs out across them
+    server = MockAPIServer(("127.0.0.1", 0), Fixtures(registry, 42), github_quota=10 ** 6,
+                           github_auth_quota=10 ** 6)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.base_url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(scope="module")
+def closed_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _run(workdir, env: dict) -> str:
+    result = subprocess.run([sys.executable, "-m", "app.main"], cwd=workdir, env=env,
+                            capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stdout[-3000:] + result.stderr[-3000:]
+    return result.stdout
+
+
+def run_epoch(tmp_path_factory, mock_api, closed_port, name: str, **settings) -> dict:
+    """Run one epoch in a fresh directory; returns its recorded hash, snapshot and replay output."""
+    workdir = tmp_path_factory.mktemp(name)
+    env = {key: value for key, value in os.environ.items() if key not in CLEARED}
+    env.update({
+        "PYTHONPATH": ROOT,
+        "HF_BASE_URL": mock_api, "GITHUB_API_URL": mock_api,
+        "SEMANTIC_SCHOLAR_API_URL": mock_api, "PWC_BASE_URL": mock_api,
+        "MODELS_REGISTRY_PATH": os.path.join(ROOT, MODELS_REGISTRY_PATH),
+        "AIGI_CACHE_DIR": str(workdir / "cache"),
+        "IPFS_API_URL": f"http://127.0.0.1:{closed_port}", "IPFS_PUBLISH_TIMEOUT": "1",
+        "EPOCH_ID": EPOCH_ID, "SNAPSHOT_TIMESTAMP": TIMESTAMP,
+    })
+    env.update(settings)
+    _run(workdir, env)
+
+    with open(workdir / "epochs" / "raw" / EPOCH_ID / "index.json", "r") as f:
+        index = json.load(f)
+    with open(workdir / "epochs" / "latest.json", "r") as f:
+        pointer = json.load(f)
+    with open(workdir / "epochs" / pointer["snapshot"], "r") as f:
+        snapshot = json.load(f)
+    replay = _run(workdir, dict(env, RAW_ARCHIVE_MODE="replay"))
+    return {"sha256": index["snapshot_sha256"], "snapshot": snapshot, "replay": replay}
+
+
+@pytest.fixture(scope="module")
+def single(tmp_path_factory, mock_api, closed_port):
+    return run_epoch(tmp_path_factory, mock_api, closed_port, "single")
+
+
+def _same_models(a: dict, b: dict):
+    assert [m["name"] for m in a["models"]] == [m["name"] for m in b["models"]]
+    for x, y in zip(a["models"], b["models"]):
+        assert x == y, x["name"]
+
+
+def test_single_process_replays(single):
+    assert "✅ Replay matches" in single["replay"]
+    assert len(single["snapshot"]["models"]) > 0
+
+
+def test_sharded_matches_single_process(tmp_path_factory, mock_api, closed_port, single):
+    sharded = run_epoch(tmp_path_factory, mock_api, closed_port, "sharded", AIGI_SHARDS="4")
+    _same_models(sharded["snapshot"], single["snapshot"])
+    assert sharded["snapshot"]["cis"] == single["snapshot"]["cis"]
+    assert sharded["sha256"] == single["sha256"]
+    assert "✅ Replay matches" in sharded["replay"]
+
+
+def test_streamed_matches_single_process(tmp_path_factory, mock_api, closed_port, single):
+    # A chunk much smaller than the registry, so every stage spans several chunks
+    streamed = run_epoch(tmp_path_factory, mock_api, closed_port, "streamed",
+                         AIGI_STREAMING="1", AIGI_STREAM_CHUNK_SIZE="7")
+    _same_models(streamed["snapshot"], single["snapshot"])
+    assert streamed["snapshot"]["cis"] == single["snapshot"]["cis"]
+    assert streamed["sha256"] == single["sha256"]
+    assert "✅ Replay matches" in streamed["replay"]
+
+
+def test_streamed_indices_match_single_process(tmp_path_factory, mock_api, closed_port):
+    single = run_epoch(tmp_path_factory, mock_api, closed_port, "single-indices",
+                       AIGI_INDICES_PATH=INDICES_PATH)
+    streamed = run_epoch(tmp_path_factory, mock_api, closed_port, "streamed-indices",
+                         AIGI_INDICES_PATH=INDICES_PATH, AIGI_STREAMING="1", AIGI_STREAM_CHUNK_SIZE="7")
+    assert len(single["snapshot"]["indices"]) > 1
+    assert streamed["snapshot"]["indices"] == single["snapshot"]["indices"]
+    assert streamed["sha256"] == single["sha256"]
+    assert "✅ Replay matches" in single["replay"]
+    assert "✅ Replay matches" in streamed["replay"]
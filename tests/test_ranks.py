@@ -0,0 +1,144 @@
+"""
+RankIndex against pandas: competition ranks (rank(method="min")) overall
+and per tier with ties and missing scores, percentiles, rank ranges, and
+movers up and down against a previous epoch.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.scoring.ranks import RankIndex
+
+
+def epoch(seed: int, n: int = 300, missing: int = 20) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        "name": [f"model-{i:03d}" for i in range(n)],
+        "tier": rng.choice(list("ABC"), n),
+        # One decimal makes plenty of ties
+        "model_score": np.round(rng.uniform(0, 20, n), 1),
+    })
+    frame.loc[rng.choice(n, missing, replace=False), "model_score"] = np.nan
+    return frame
+
+
+def index_of(frame: pd.DataFrame, previous: RankIndex = None) -> RankIndex:
+    return RankIndex.build(frame["name"], frame["tier"], frame["model_score"], previous,
+                           {"epoch_id": frame.attrs.get("epoch_id")})
+
+
+def expected_ranks(frame: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame({
+        "rank": frame["model_score"].rank(method="min", ascending=False).fillna(0).astype(int),
+        "tier_rank": frame.groupby("tier")["model_score"].rank(method="min", ascending=False)
+                          .fillna(0).astype(int),
+    })
+
+
+@pytest.fixture
+def current() -> pd.DataFrame:
+    return epoch(1)
+
+
+@pytest.fixture
+def previous() -> pd.DataFrame:
+    frame = epoch(2)
+    # Some models are new this epoch, one is gone
+    frame = frame.drop(index=range(10)).reset_index(drop=True)
+    frame.loc[len(frame)] = {"name": "retired", "tier": "A", "model_score": 19.9}
+    frame.attrs["epoch_id"] = "2099-01"
+    return frame
+
+
+def test_ranks_match_pandas(current):
+    index = index_of(current)
+    expected = expected_ranks(current)
+    assert np.array_equal(index.rank, expected["rank"])
+    assert np.array_equal(index.tier_rank, expected["tier_rank"])
+    # Unranked models are left out of the orders
+    assert len(index.order) == current["model_score"].notna().sum()
+    ranked = current["model_score"].iloc[index.order]
+    assert ranked.is_monotonic_decreasing
+
+
+def test_tier_views_match_pandas(current):
+    index = index_of(current)
+    expected = expected_ranks(current)
+    for tier, group in current.groupby("tier"):
+        group = group.dropna(subset=["model_score"])
+        top = index.top(len(group) + 5, tier=tier)
+        assert [e["tier"] for e in top] == [tier] * len(group)
+        assert [e["model_score"] for e in top] == sorted(group["model_score"], reverse=True)
+        in_range = index.rank_range(3, 7, tier=tier)
+        assert sorted(e["name"] for e in in_range) == \
+            sorted(group["name"][expected["tier_rank"][group.index].between(3, 7)])
+    assert index.top(5, tier="Z") == []
+
+
+def test_rank_range_includes_ties(current):
+    index = index_of(current)
+    expected = expected_ranks(current)
+    entries = index.rank_range(10, 20)
+    assert sorted(e["name"] for e in entries) == sorted(current["name"][expected["rank"].between(10, 20)])
+    assert len(index.rank_range(10, 20, limit=3)) == 3
+
+
+def test_percentile_matches_pandas(current):
+    index = index_of(current)
+    scores = current["model_score"]
+    # Models scoring strictly lower, among the other ranked models
+    lower = scores.rank(method="min") - 1
+    tier_lower = current.groupby("tier")["model_score"].rank(method="min") - 1
+    tier_size = current.groupby("tier")["model_score"].transform("count")
+    for row in range(len(current)):
+        name = current["name"][row]
+        if np.isnan(scores[row]):
+            assert index.percentile(name) is None and index.percentile(name, tier=True) is None
+            continue
+        assert index.percentile(name) == pytest.approx(100 * lower[row] / (scores.count() - 1))
+        assert index.percentile(name, tier=True) == pytest.approx(100 * tier_lower[row] / (tier_size[row] - 1))
+    assert index.percentile("no-such-model") is None
+
+
+def test_movers_against_previous_epoch(current, previous):
+    before = index_of(previous)
+    index = index_of(current, before)
+    assert index.meta["previous_epoch_id"] == "2099-01"
+
+    ranks = expected_ranks(current)["rank"]
+    prev_ranks = dict(zip(previous["name"], expected_ranks(previous)["rank"]))
+    moves = pd.DataFrame({"name": current["name"], "rank": ranks,
+                          "prev_rank": current["name"].map(prev_ranks).fillna(0).astype(int)})
+    assert np.array_equal(index.prev_rank, moves["prev_rank"])
+    both = moves[(moves["rank"] > 0) & (moves["prev_rank"] > 0)].copy()
+    both["gained"] = both["prev_rank"] - both["rank"]
+    # Most places gained first, ties by current rank
+    ordered = both.sort_values(["gained", "rank"], ascending=[False, True], kind="stable")
+    up = ordered[ordered["gained"] > 0]
+    down = ordered[ordered["gained"] < 0].iloc[::-1]
+
+    gainers = index.movers(k=len(current))
+    assert [e["name"] for e in gainers] == list(up["name"])
+    assert [e["rank_change"] for e in gainers] == list(up["gained"])
+    losers = index.movers(k=len(current), down=True)
+    assert [e["name"] for e in losers] == list(down["name"])
+    assert [e["rank_change"] for e in losers] == list(down["gained"])
+    assert len(index.movers(k=5)) == 5 and len(index.movers(k=5, down=True)) == 5
+
+    # New models have no previous rank; a retired one is simply gone
+    new = index.lookup("model-000")
+    assert new["prev_rank"] is None and new["rank_change"] is None
+    assert index.lookup("retired") is None
+
+
+def test_saved_index_answers_the_same(current, previous, tmp_path):
+    index = index_of(current, index_of(previous))
+    path = tmp_path / "ranks.npz"
+    path.write_bytes(index.to_bytes())
+    loaded = RankIndex.load(str(path))
+    assert loaded.meta == index.meta
+    for name in ("model-005", "model-123", "model-299"):
+        assert loaded.lookup(name) == index.lookup(name)
+    assert loaded.movers(10) == index.movers(10)
+    assert loaded.top(10, tier="B") == index.top(10, tier="B")
@@ -0,0 +1,75 @@
+"""
+History report building blocks: LTTB downsampling keeps the endpoints and
+extrema and returns threshold points; per-tier contributions sum to the
+snapshot's CIS, also when some model scores are missing.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.report import lttb, downsample
+from app.scoring.cis import compute_cis
+from app.utils.history import tier_contributions, summarize
+
+
+def series(n: int = 1000, seed: int = 3):
+    rng = np.random.default_rng(seed)
+    x = np.arange(n, dtype=np.float64) * 86400e3
+    y = np.cumsum(rng.normal(0, 1, n))
+    y[137] = y.max() + 50
+    y[611] = y.min() - 50
+    return x, y
+
+
+@pytest.mark.parametrize("threshold", [3, 10, 50, 333])
+def test_lttb_keeps_endpoints_and_extrema(threshold):
+    x, y = series()
+    keep = lttb(x, y[None, :], threshold)[0]
+    assert len(keep) == threshold
+    assert keep[0] == 0 and keep[-1] == len(x) - 1
+    assert np.all(np.diff(keep) > 0)
+    if threshold > 3:
+        assert 137 in keep and 611 in keep
+    kept_x, kept_y = downsample(x, y, threshold)
+    assert np.array_equal(kept_x, x[keep]) and np.array_equal(kept_y, y[keep])
+
+
+def test_lttb_rows_and_short_series():
+    x, y = series()
+    # A model absent from most epochs
+    absent = np.full(len(x), np.nan)
+    absent[:40] = 1.0
+    keep = lttb(x, np.vstack([y, -y, absent]), 20)
+    assert keep.shape == (3, 20)
+    assert keep[2, 0] == 0 and keep[2, -1] == len(x) - 1
+    # Each row is downsampled on its own: the spike is a peak of one and a dip of the other
+    assert {137, 611} <= set(keep[0]) and {137, 611} <= set(keep[1])
+    assert np.array_equal(keep[0], lttb(x, y[None, :], 20)[0])
+    # Fewer points than the threshold: everything is kept
+    assert np.array_equal(lttb(x[:10], y[None, :10], 20)[0], np.arange(10))
+
+
+def snapshot(scores: list, tiers: str) -> dict:
+    df = pd.DataFrame({"name": [f"model-{i}" for i in range(len(scores))], "tier": list(tiers),
+                       "model_score": scores})
+    return {"epoch_id": "2099-01", "cis": compute_cis(df),
+            "models": [{"name": n, "tier": t, "model_score": None if np.isnan(s) else s}
+                       for n, t, s in zip(df["name"], df["tier"], df["model_score"])]}
+
+
+@pytest.mark.parametrize("scores, tiers", [
+    ([61.2, 55.0, 40.1, 38.7, 20.0, 12.5], "AABBCC"),
+    # A missing score still counts towards its tier's size, as in compute_cis
+    ([61.2, np.nan, 40.1, 38.7, np.nan, 12.5], "AABBCC"),
+    # Tiers without a weight do not contribute
+    ([61.2, 55.0, 40.1, 9.9], "ABCX"),
+    ([np.nan, 30.0, 20.0], "ABB"),
+])
+def test_tier_contributions_sum_to_cis(scores, tiers):
+    data = snapshot(scores, tiers)
+    contributions = tier_contributions(np.array(list(tiers)), np.array(scores, dtype=np.float64))
+    assert sum(contributions.values()) == pytest.approx(data["cis"], rel=1e-12)
+    meta = summarize(data)["meta"]
+    assert meta["tiers"] == contributions
+    assert sum(meta["tiers"].values()) == pytest.approx(meta["cis"], rel=1e-12)
@@ -0,0 +1,191 @@
+"""
+@guarded: degraded fetches against a stand-in API (some requests failed)
+are filled from the last known good value; missed deadlines, errors and
+failed parts fall back to it; the watchdog ends an overrunning epoch.
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import threading
+import subprocess
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+from app.data_sources import http_client, resilience
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODELS = ["model-a", "model-b", "model-c", "model-d"]
+
+
+class StandInAPI(BaseHTTPRequestHandler):
+    """GET /value/<model>: 200 {"value": ...}, or 403 for models in failing."""
+
+    values = {}
+    failing = set()
+
+    def do_GET(self):
+        model = self.path.rsplit("/", 1)[-1]
+        code, body = (403, {"message": "forbidden"}) if model in self.failing else \
+            (200, {"value": self.values[model]})
+        payload = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api():
+    StandInAPI.values = {}
+    StandInAPI.failing = set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInAPI)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def epoch(tmp_path, monkeypatch):
+    monkeypatch.setattr(resilience, "LAST_GOOD_DIR", str(tmp_path / "last-good"))
+    resilience.begin_epoch(0)
+    yield
+    resilience.end_epoch()
+
+
+def fetcher(base_url):
+    """A fetch_* in the style of the real fetchers: failed lookups are left out."""
+    @resilience.guarded("stand-in")
+    def fetch_values(models):
+        def one(model):
+            response = http_client.get(f"{base_url}/value/{model}")
+            return response.json()["value"] if response.status_code == 200 else None
+        values = http_client.parallel_map(one, models)
+        return pd.DataFrame([{"model": m, "stand-in": v} for m, v in zip(models, values) if v is not None],
+                            columns=["model", "stand-in"])
+    return fetch_values
+
+
+def _values_of(frame: pd.DataFrame, column: str) -> dict:
+    return dict(zip(frame["model"], frame[column]))
+
+
+def _values(frame: pd.DataFrame) -> dict:
+    return _values_of(frame, "stand-in")
+
+
+def test_partial_failure_fills_from_last_good(api, epoch):
+    fetch = fetcher(api)
+    StandInAPI.values = {m: float(i) for i, m in enumerate(MODELS)}
+    assert _values(fetch(MODELS)) == {"model-a": 0.0, "model-b": 1.0, "model-c": 2.0, "model-d": 3.0}
+    assert resilience.stale_sources() == {}
+
+    StandInAPI.values = {m: 10.0 + i for i, m in enumerate(MODELS)}
+    StandInAPI.failing = {"model-b", "model-d"}
+    resilience.begin_epoch(0)
+    result = fetch(MODELS)
+    # Fresh where the request succeeded, the last good value elsewhere; never a zero
+    assert _values(result) == {"model-a": 10.0, "model-b": 1.0, "model-c": 12.0, "model-d": 3.0}
+    entry = resilience.stale_sources()["stand-in"]
+    assert entry["failed_requests"] == 2
+    assert entry["filled_models"] == 2
+    assert entry["age_seconds"] is not None
+    assert _values(resilience.load_last_good("stand-in")[0]) == _values(result)
+
+
+def test_partial_failure_without_last_good(api, epoch):
+    StandInAPI.values = {m: 1.0 for m in MODELS}
+    StandInAPI.failing = {"model-c"}
+    result = fetcher(api)(MODELS)
+    assert sorted(result["model"]) == ["model-a", "model-b", "model-d"]
+    entry = resilience.stale_sources()["stand-in"]
+    assert entry["failed_requests"] == 1 and entry["filled_models"] == 0
+    assert entry["fetched_at"] is None
+
+
+def write_last_good(name: str, value, hours_old: float):
+    """A last known good entry fetched hours_old hours ago."""
+    resilience.save_last_good(name, value)
+    path = resilience._last_good_path(name)
+    with gzip.open(path, "rb") as f:
+        entry = json.loads(f.read())
+    entry["fetched_at"] = (datetime.utcnow() - timedelta(hours=hours_old)).isoformat() + "Z"
+    with open(path, "wb") as f:
+        f.write(gzip.compress(json.dumps(entry).encode("utf-8")))
+
+
+def frame(values: dict, column: str = "slow") -> pd.DataFrame:
+    return pd.DataFrame({"model": list(values), column: list(values.values())})
+
+
+def test_missed_deadline_falls_back_and_revalidates(epoch, monkeypatch):
+    monkeypatch.setattr(resilience, "SOURCE_DEADLINE", 0.2)
+    write_last_good("slow", frame({"model-a": 1.0}), hours_old=2)
+    finish = threading.Event()
+
+    @resilience.guarded("slow")
+    def fetch_slow():
+        finish.wait(10)
+        return frame({"model-a": 5.0})
+
+    result = fetch_slow()
+    assert _values_of(result, "slow") == {"model-a": 1.0}
+    entry = resilience.stale_sources()["slow"]
+    assert entry["reason"] == "missed deadline"
+    assert 7100 < entry["age_seconds"] < 7300
+
+    # The fetch keeps running and refreshes the last good value when it completes
+    finish.set()
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        if _values_of(resilience.load_last_good("slow")[0], "slow") == {"model-a": 5.0}:
+            break
+        time.sleep(0.02)
+    assert _values_of(resilience.load_last_good("slow")[0], "slow") == {"model-a": 5.0}
+
+
+def test_failed_fetch_falls_back(epoch):
+    write_last_good("broken", frame({"model-a": 2.0}, "broken"), hours_old=1)
+
+    @resilience.guarded("broken")
+    def fetch_broken():
+        raise ValueError("upstream changed its format")
+
+    assert _values_of(fetch_broken(), "broken") == {"model-a": 2.0}
+    assert resilience.stale_sources()["broken"]["reason"] == "ValueError: upstream changed its format"
+
+
+def test_parts_fall_back_on_their_own(epoch):
+    write_last_good("multi.mmlu", frame({"model-a": 70.0}, "mmlu"), hours_old=1)
+    write_last_good("multi.gsm8k", frame({"model-a": 50.0}, "gsm8k"), hours_old=1)
+
+    @resilience.guarded("multi", parts=("mmlu", "gsm8k"))
+    def fetch_multi():
+        # The gsm8k scrape failed
+        return {"mmlu": frame({"model-a": 71.0}, "mmlu"), "gsm8k": None}
+
+    result = fetch_multi()
+    assert _values_of(result["mmlu"], "mmlu") == {"model-a": 71.0}
+    assert _values_of(result["gsm8k"], "gsm8k") == {"model-a": 50.0}
+    assert list(resilience.stale_sources()) == ["multi.gsm8k"]
+    # The fresh part became the new last good value
+    assert _values_of(resilience.load_last_good("multi.mmlu")[0], "mmlu") == {"model-a": 71.0}
+
+
+def test_watchdog_ends_an_overrunning_epoch():
+    code = "import time\nfrom app.data_sources import resilience\nresilience.begin_epoch(0.3)\ntime.sleep(30)\n"
+    started = time.time()
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=30)
+    assert result.returncode == 124
+    assert "exceeded its 0s budget" in result.stdout
+    assert time.time() - started < 20
@@ -0,0 +1,113 @@
+"""
+Incremental rescoring in the refresh scheduler: refreshing one source
+recomputes only the columns that depend on it, and the result matches a
+full compute_snapshot of the same inputs.
+"""
+
+import pandas as pd
+import pytest
+
+from app import scheduler
+from app.main import compute_snapshot
+from app.scheduler import MetricStore
+
+REGISTRY = [{"name": f"model-{i}", "tier": "ABC"[i % 3]} for i in range(9)]
+NAMES = [m["name"] for m in REGISTRY]
+
+
+def column(name: str, values: list, names: list = NAMES) -> pd.DataFrame:
+    return pd.DataFrame({"model": names, name: values})
+
+
+def sources() -> dict:
+    # Some models are missing from some sources, as with the real APIs
+    return {
+        "arena": column("elo", [1000 + 25 * i for i in range(9)]),
+        "benchmarks": {
+            "mmlu": column("mmlu", [50 + 4 * i for i in range(9)]),
+            "gsm8k": column("gsm8k", [40 + 5 * i for i in range(8)], NAMES[:8]),
+            "humaneval": column("humaneval", [30 + 6 * i for i in range(9)]),
+        },
+        "downloads": pd.DataFrame({"model": NAMES[1:], "downloads": [10 ** i for i in range(1, 9)],
+                                   "downloads_all_time": [10 ** (i + 1) for i in range(1, 9)]}),
+        "github": column("github", [3.0 * i for i in range(9)]),
+        "citations": column("citation_velocity", [7.0 * (i % 4) for i in range(9)]),
+    }
+
+
+@pytest.fixture
+def store() -> MetricStore:
+    store = MetricStore(REGISTRY)
+    for source, value in sources().items():
+        store.set_source(source, value)
+    store.rebuild()
+    return store
+
+
+@pytest.fixture
+def recorded(monkeypatch) -> dict:
+    """Columns normalized and sub-scores computed during an update."""
+    calls = {"normalized": [], "scored": []}
+    normalize = scheduler.normalize
+
+    def recording_normalize(series):
+        calls["normalized"].append(series.name)
+        return normalize(series)
+    monkeypatch.setattr(scheduler, "normalize", recording_normalize)
+
+    for name, (func, inputs) in list(scheduler.SUB_SCORES.items()):
+        def recording(df, name=name, func=func):
+            calls["scored"].append(name)
+            return func(df)
+        monkeypatch.setitem(scheduler.SUB_SCORES, name, (recording, inputs))
+    return calls
+
+
+def full(store: MetricStore) -> dict:
+    return compute_snapshot(store.registry, store.current, store.previous(), "2099-01", "2099-01-01T00:00:00Z")
+
+
+def assert_matches_full(store: MetricStore):
+    expected = full(store)
+    pd.testing.assert_frame_equal(pd.DataFrame(store.models()), pd.DataFrame(expected["models"]))
+    assert store.cis() == pytest.approx(expected["cis"], rel=1e-12)
+
+
+def test_github_refresh_recomputes_only_adoption(store, recorded):
+    before = store.df.copy()
+    metrics = store.set_source("github", column("github", [30.0 - 2 * i for i in range(9)]))
+    store.update(metrics)
+
+    assert recorded["normalized"] == ["github"]
+    assert recorded["scored"] == ["adoption_score"]
+    for unchanged in ("arena_norm", "mmlu_norm", "downloads_norm", "intelligence_score", "momentum_score"):
+        pd.testing.assert_series_equal(store.df[unchanged], before[unchanged])
+    assert not store.df["adoption_score"].equals(before["adoption_score"])
+    assert_matches_full(store)
+
+
+def test_benchmark_refresh_recomputes_intelligence_and_momentum(store, recorded):
+    benchmarks = sources()["benchmarks"]
+    benchmarks["mmlu"] = column("mmlu", [90 - 3 * i for i in range(9)])
+    store.update(store.set_source("benchmarks", benchmarks))
+
+    assert sorted(recorded["normalized"]) == ["benchmark_delta", "gsm8k", "humaneval", "mmlu"]
+    assert recorded["scored"] == ["intelligence_score", "momentum_score"]
+    assert_matches_full(store)
+
+
+def test_downloads_refresh_replaces_extra_column(store):
+    downloads = sources()["downloads"]
+    downloads["downloads_all_time"] = downloads["downloads_all_time"] * 3
+    store.update(store.set_source("downloads", downloads))
+    assert store.df["downloads_all_time"].tolist()[1:] == downloads["downloads_all_time"].tolist()
+    assert_matches_full(store)
+
+
+def test_duplicate_models_rebuild_in_full(store, recorded):
+    github = column("github", [1.0] * 10, NAMES + ["model-0"])
+    store.update(store.set_source("github", github))
+    # merge_dataframes multiplies the duplicated model's rows
+    assert len(store.df) == len(REGISTRY) + 1
+    assert recorded["scored"] == []
+    assert_matches_full(store)
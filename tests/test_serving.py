@@ -0,0 +1,137 @@
+"""
+Read API (app.serving): routes, ETag revalidation, content negotiation
+and hot reload against snapshots published to a temp directory.
+"""
+
+import gzip
+import json
+import threading
+import http.client
+
+import pytest
+
+from app.serving.server import make_server
+from app.serving.store import SnapshotStore, brotli
+from app.utils.hashing import hash_dataset
+from app.utils.snapshot import save_snapshot
+
+
+def snapshot(epoch_id: str, cis: float) -> dict:
+    return {
+        "epoch_id": epoch_id,
+        "timestamp": f"{epoch_id}-01T00:00:00Z",
+        "cis": cis,
+        "models": [
+            {"name": "model-a", "tier": "A", "model_score": 0.91},
+            {"name": "model b/v2", "tier": "B", "model_score": 0.42},
+        ],
+        "engine_version": "1.0.0",
+    }
+
+
+FIRST = snapshot("2099-01", 7.1)
+SECOND = snapshot("2099-02", 7.2)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for data in (FIRST, SECOND):
+        save_snapshot(data, data["epoch_id"], data["timestamp"])
+    store = SnapshotStore(str(tmp_path / "epochs"), str(tmp_path / "epochs" / "manifest.jsonl"))
+    store.load()
+    return store
+
+
+@pytest.fixture
+def api(store):
+    server = make_server(store, "127.0.0.1", 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def get(port: int, path: str, **headers):
+    """(status, headers, raw body) without any client-side decoding."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        conn.request("GET", path, headers=headers)
+        response = conn.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        conn.close()
+
+
+def test_routes(api):
+    status, headers, body = get(api, "/latest")
+    assert status == 200 and json.loads(body) == SECOND
+    assert headers["Cache-Control"] == "no-cache"
+    assert json.loads(get(api, "/epochs")[2]) == ["2099-01", "2099-02"]
+
+    status, headers, body = get(api, "/epochs/2099-01")
+    assert status == 200 and json.loads(body) == FIRST
+    assert "immutable" in headers["Cache-Control"]
+
+    model = json.loads(get(api, "/models/model%20b%2Fv2")[2])
+    assert model["epoch_id"] == "2099-02" and model["model"]["model_score"] == 0.42
+    history = json.loads(get(api, "/cis/history")[2])
+    assert [h["cis"] for h in history] == [7.1, 7.2]
+    assert get(api, "/epochs/2098-12")[0] == 404
+    assert get(api, "/nothing")[0] == 404
+
+
+def test_dataset_hash_header(api):
+    _, headers, body = get(api, "/epochs/2099-01")
+    assert headers["X-Dataset-SHA256"] == hash_dataset(FIRST)
+    assert hash_dataset(json.loads(body)) == hash_dataset(FIRST)
+    # Only snapshots carry a dataset hash
+    assert "X-Dataset-SHA256" not in get(api, "/epochs")[1]
+
+
+def test_if_none_match_revalidates(api):
+    status, headers, _ = get(api, "/latest")
+    etag = headers["ETag"]
+    status, headers, body = get(api, "/latest", **{"If-None-Match": etag})
+    assert status == 304 and body == b"" and headers["ETag"] == etag
+    assert get(api, "/latest", **{"If-None-Match": f"W/{etag}"})[0] == 304
+    assert get(api, "/latest", **{"If-None-Match": f'"other", {etag}'})[0] == 304
+    assert get(api, "/latest", **{"If-None-Match": '"other"'})[0] == 200
+    # The gzip representation has its own ETag, and either validates
+    _, gz_headers, _ = get(api, "/latest", **{"Accept-Encoding": "gzip"})
+    assert gz_headers["ETag"] != etag
+    assert get(api, "/latest", **{"If-None-Match": gz_headers["ETag"]})[0] == 304
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, "identity"),
+    ("gzip", "gzip"),
+    ("gzip, deflate", "gzip"),
+    ("gzip;q=0", "identity"),
+    ("gzip; q=0.0, identity", "identity"),
+    ("br, gzip", "br"),
+    ("br;q=0, gzip", "gzip"),
+    ("br;q=0, gzip;q=0", "identity"),
+    ("*", "br"),
+])
+def test_content_negotiation(api, accept, expected):
+    if expected == "br" and brotli is None:
+        expected = "gzip"
+    headers = {"Accept-Encoding": accept} if accept else {}
+    status, headers, body = get(api, "/latest", **headers)
+    assert status == 200
+    assert headers.get("Content-Encoding", "identity") == expected
+    assert headers["Vary"] == "Accept-Encoding"
+    decoded = {"identity": lambda b: b, "gzip": gzip.decompress,
+               "br": brotli.decompress if brotli else None}[expected](body)
+    assert json.loads(decoded) == SECOND
+
+
+def test_reload_on_new_snapshot(api, store, tmp_path):
+    assert not store.reload_if_changed()
+    third = snapshot("2099-03", 7.3)
+    save_snapshot(third, third["epoch_id"], third["timestamp"], snapshot_dir=str(tmp_path / "epochs"))
+    assert store.reload_if_changed()
+    assert json.loads(get(api, "/latest")[2]) == third
+    assert json.loads(get(api, "/epochs")[2]) == ["2099-01", "2099-02", "2099-03"]
@@ -0,0 +1,132 @@
+"""
+Snapshot publishing: variants decode to the same dataset, latest.json
+moves only once everything it names is written, and atomic_write never
+exposes a partial file.
+"""
+
+import os
+import gzip
+import json
+
+import pytest
+
+from app.utils import snapshot as snap
+from app.utils.hashing import hash_dataset
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DATA = {
+    "epoch_id": "2099-01",
+    "timestamp": "2099-01-01T00:00:00Z",
+    "cis": 7.2174,
+    "models": [{"name": f"model-{i}", "tier": "ABC"[i % 3], "model_score": i / 7} for i in range(50)],
+    "engine_version": "1.0.0",
+}
+
+
+def decode(path: str) -> dict:
+    with open(path, "rb") as f:
+        body = f.read()
+    if path.endswith(".gz"):
+        body = gzip.decompress(body)
+    elif path.endswith(".zst"):
+        # Streamed frames carry no content size; decode as a stream
+        body = zstandard.ZstdDecompressor().decompressobj().decompress(body)
+    return json.loads(body)
+
+
+def read_pointer() -> dict:
+    with open(snap.LATEST_POINTER_PATH, "r") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def epochs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path / "epochs"
+
+
+def test_variants_decode_to_same_dataset(epochs):
+    path = snap.save_snapshot(DATA, DATA["epoch_id"], DATA["timestamp"])
+    variants = snap.publish_snapshot(DATA, path, sha256=hash_dataset(DATA))
+    assert set(variants) == {"min", "gzip"} | ({"zstd"} if zstandard else set())
+    for relative in variants.values():
+        assert hash_dataset(decode(os.path.join(snap.SNAPSHOT_DIR, relative))) == hash_dataset(DATA)
+    pointer = read_pointer()
+    assert pointer["variants"] == variants and pointer["sha256"] == hash_dataset(DATA)
+    assert snap.resolve_latest() == path
+
+
+def test_streamed_variants_decode_to_same_dataset(epochs):
+    # A streamed snapshot file is already canonical JSON
+    path = os.path.join(snap.SNAPSHOT_DIR, "2099-01_streamed.json")
+    snap.atomic_write(path, json.dumps(DATA, sort_keys=True).encode("utf-8"))
+    variants = snap.publish_snapshot({"epoch_id": "2099-01"}, path, streamed=True)
+    for relative in variants.values():
+        assert hash_dataset(decode(os.path.join(snap.SNAPSHOT_DIR, relative))) == hash_dataset(DATA)
+
+
+def test_pointer_moves_after_variants_are_written(epochs, monkeypatch):
+    first = snap.save_snapshot(DATA, "2099-01", DATA["timestamp"])
+    snap.publish_snapshot(DATA, first)
+    second_data = dict(DATA, epoch_id="2099-02", cis=8.0)
+    second = snap.save_snapshot(second_data, "2099-02", "2099-02-01T00:00:00Z")
+
+    write = snap.atomic_write
+    order = []
+
+    def checked_write(path, data):
+        if os.path.basename(path) == "latest.json":
+            # Everything the new pointer names is already complete on disk
+            pointer = json.loads(data)
+            assert decode(os.path.join(snap.SNAPSHOT_DIR, pointer["snapshot"])) == second_data
+            for relative in pointer["variants"].values():
+                assert decode(os.path.join(snap.SNAPSHOT_DIR, relative)) == second_data
+        else:
+            # Until then, readers still see the first epoch
+            assert snap.resolve_latest() == first
+        order.append(os.path.basename(path))
+        return write(path, data)
+
+    monkeypatch.setattr(snap, "atomic_write", checked_write)
+    snap.publish_snapshot(second_data, second)
+    assert order[-1] == "latest.json" and len(order) > 1
+    assert snap.resolve_latest() == second
+
+
+def test_failed_publish_keeps_previous_pointer(epochs, monkeypatch):
+    first = snap.save_snapshot(DATA, "2099-01", DATA["timestamp"])
+    snap.publish_snapshot(DATA, first)
+    before = read_pointer()
+    second = snap.save_snapshot(dict(DATA, epoch_id="2099-02"), "2099-02", "2099-02-01T00:00:00Z")
+
+    def broken(variants):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(snap, "_write_dist", broken)
+    with pytest.raises(OSError):
+        snap.publish_snapshot(dict(DATA, epoch_id="2099-02"), second)
+    assert read_pointer() == before
+
+
+def test_failed_write_keeps_previous_file(tmp_path):
+    path = str(tmp_path / "out" / "snapshot.json")
+    snap.atomic_write(path, b'{"version": 1}')
+
+    def chunks():
+        yield b'{"version": '
+        # Mid-write, the target still holds the previous content
+        with open(path, "rb") as f:
+            assert f.read() == b'{"version": 1}'
+        raise OSError("connection lost")
+
+    with pytest.raises(OSError):
+        snap.atomic_write(path, chunks())
+    with open(path, "rb") as f:
+        assert f.read() == b'{"version": 1}'
+    # No temp file is left behind
+    assert os.listdir(tmp_path / "out") == ["snapshot.json"]
+    assert oct(os.stat(path).st_mode & 0o777) == oct(snap.FILE_MODE)
@@ -0,0 +1,121 @@
+"""
+Tracing: JSON-lines and Chrome trace-event export, the shared no-op span
+when tracing is disabled, and the cache attribute on fetch spans.
+"""
+
+import json
+import time
+import threading
+
+import pytest
+
+from app.utils import cache, tracing
+
+
+@pytest.fixture
+def traced(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "_events", [])
+    monkeypatch.setattr(tracing, "_counters", {})
+    monkeypatch.setitem(tracing._state, "enabled", True)
+    monkeypatch.setitem(tracing._state, "path", str(tmp_path / "trace" / "run"))
+    return tmp_path / "trace" / "run"
+
+
+@pytest.fixture
+def untraced(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "_events", [])
+    monkeypatch.setattr(tracing, "_counters", {})
+    monkeypatch.setitem(tracing._state, "enabled", False)
+    monkeypatch.setitem(tracing._state, "path", str(tmp_path / "trace" / "run"))
+    return tmp_path / "trace" / "run"
+
+
+def read_jsonl(path) -> list:
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_export_writes_jsonl_and_chrome_trace(traced):
+    with tracing.span("score", models=3) as span:
+        span.set(cis=7.2)
+        tracing.count("rate_limit_wait", 2)
+
+    def fetch():
+        with tracing.span("fetch github", "http"):
+            pass
+
+    worker = threading.Thread(target=fetch)
+    worker.start()
+    worker.join()
+    with pytest.raises(ValueError):
+        with tracing.span("broken"):
+            raise ValueError("boom")
+    tracing.count("rate_limit_wait")
+
+    jsonl_path, chrome_path = tracing.export()
+    assert (jsonl_path, chrome_path) == (f"{traced}.jsonl", f"{traced}.trace.json")
+
+    lines = read_jsonl(jsonl_path)
+    assert [line["name"] for line in lines] == ["score", "fetch github", "broken", "counters"]
+    score, fetch, broken, summary = lines
+    assert score["category"] == "stage" and score["models"] == 3 and score["cis"] == 7.2
+    assert score["duration_us"] >= 0 and fetch["category"] == "http"
+    assert fetch["thread"] != score["thread"]
+    assert broken["error"] == "ValueError"
+    assert summary == {"name": "counters", "category": "summary", "rate_limit_wait": 3}
+
+    with open(chrome_path) as f:
+        trace = json.load(f)
+    assert trace["displayTimeUnit"] == "ms"
+    events = trace["traceEvents"]
+    spans = [e for e in events if e["ph"] == "X"]
+    counters = [e for e in events if e["ph"] == "C"]
+    assert [e["name"] for e in spans] == ["score", "fetch github", "broken"]
+    assert all("dur" in e and "pid" in e for e in spans)
+    # Counter events carry the running total
+    assert [e["args"]["rate_limit_wait"] for e in counters] == [2, 3]
+    assert all("dur" not in e for e in counters)
+
+
+def test_disabled_tracing_is_a_no_op(untraced):
+    span = tracing.span("score", models=3)
+    assert span is tracing.NULL_SPAN
+    with span as inner:
+        inner.set(cis=7.2)
+    tracing.count("rate_limit_wait")
+    assert tracing._events == [] and tracing.counters() == {}
+    assert tracing.export() is None
+    assert not untraced.parent.exists()
+
+
+def test_cache_span_records_hit_miss_and_shared(traced, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    cache.get_or_fetch("papers", lambda: {"ids": [1]}, cache_dir=cache_dir)
+    cache.get_or_fetch("papers", lambda: {"ids": [2]}, cache_dir=cache_dir)
+
+    # A caller that waits on the lock finds the value fetched meanwhile
+    inside = threading.Event()
+    release = threading.Event()
+
+    def slow_fetch():
+        inside.set()
+        release.wait(10)
+        return {"ids": [3]}
+
+    first = threading.Thread(target=cache.get_or_fetch, args=("citations", slow_fetch), kwargs={"cache_dir": cache_dir})
+    first.start()
+    inside.wait(10)
+    second = threading.Thread(target=cache.get_or_fetch, args=("citations", slow_fetch), kwargs={"cache_dir": cache_dir})
+    second.start()
+    # Give the second caller time to find nothing cached and block on the lock
+    time.sleep(0.2)
+    release.set()
+    first.join()
+    second.join()
+
+    spans = [e for e in tracing._events if e["cat"] == "cache"]
+    assert [(e["name"], e["args"]["cache"]) for e in spans] == [
+        ("cache papers", "miss"), ("cache papers", "hit"),
+        ("cache citations", "miss"), ("cache citations", "shared"),
+    ]
+    assert all(e["args"]["key"] == e["name"].split()[1] for e in spans)